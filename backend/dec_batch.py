@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batch Processing of DEC Disk Images
+===================================
+
+Detect, list and extract many images in one interpreter:
+
+    from dec_batch import run_batch
+    run_batch("archive/", "extracted", jobs=8)
+
+Images come from a directory (searched recursively) or a glob pattern.
+Every image gets its own output tree under the output root, mirroring its
+path relative to the batch source, and a record in the combined manifest
+``<output>/manifest.jsonl``. Records are appended as each image finishes,
+so an interrupted batch resumes where it stopped: images whose last record
+succeeded, and whose size and modification time are unchanged, are skipped.
+Unlike the single-image CLIs, images no filesystem probe recognises are
+recorded as errors instead of being read as RT-11.
+"""
+
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+_backend_dir = Path(__file__).resolve().parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from dec_extract import VOLUME_TYPES, VolumeError, open_image
+from utils.extract_scheduler import default_workers
+from utils.fs_detect import detect
+
+MANIFEST_NAME = "manifest.jsonl"
+IMAGE_EXTENSIONS = {".dsk", ".img", ".raw", ".rx01", ".rx02", ".rl01", ".rl02", ".rk05"}
+
+
+def find_images(source: Union[str, Path]) -> Tuple[Path, List[Path]]:
+    """
+    Images of a batch source and the base directory their paths are relative to
+
+    Args:
+        source: Directory (searched recursively for IMAGE_EXTENSIONS) or glob pattern
+
+    Returns:
+        (base directory, sorted list of absolute image paths)
+    """
+    path = Path(source)
+    if path.is_dir():
+        base = path.resolve()
+        images = sorted(p for p in base.rglob("*")
+                        if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+        return base, images
+
+    images = sorted(Path(p) for p in glob.glob(str(source), recursive=True) if os.path.isfile(p))
+    if not images:
+        return path.parent, []
+    base = Path(os.path.commonpath([str(p.parent.resolve()) for p in images]))
+    return base, [p.resolve() for p in images]
+
+
+def _fingerprint(image: Path) -> Dict[str, float]:
+    stat = image.stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_manifest(manifest_path: Union[str, Path]) -> Dict[str, dict]:
+    """Last record per image in a manifest (a missing manifest is empty)"""
+    records: Dict[str, dict] = {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue    # Line cut short by an interrupted run
+                if isinstance(record, dict) and "image" in record:
+                    records[record["image"]] = record
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _is_done(record: Optional[dict], image: Path, list_only: bool) -> bool:
+    if not record or record.get("status") != "ok":
+        return False
+    if record.get("mode") != ("list" if list_only else "extract"):
+        return False
+    fingerprint = _fingerprint(image)
+    return record.get("size") == fingerprint["size"] and record.get("mtime") == fingerprint["mtime"]
+
+
+def process_image(image: Path, output_dir: Path, list_only: bool = False,
+                  fs_type: Optional[str] = None) -> dict:
+    """
+    Detect, list and (unless list_only) extract one image
+
+    Returns:
+        Manifest record for the image
+    """
+    started = time.time()
+    record = {"image": str(image), "output": str(output_dir),
+              "mode": "list" if list_only else "extract", **_fingerprint(image)}
+    try:
+        if fs_type is None:
+            # Unlike open_image, a batch does not guess RT-11 for unrecognised images
+            results = detect(image, fs_types=VOLUME_TYPES)
+            if not results:
+                raise VolumeError("No supported filesystem detected")
+            fs_type = results[0].fs_type
+            record["description"] = results[0].description
+        record["filesystem"] = fs_type
+        with open_image(image, fs_type) as volume:
+            if list_only:
+                entries = volume.entries()
+                record["entries"] = [entry.to_dict() for entry in entries]
+                record["files"] = sum(1 for entry in entries if not entry.is_dir)
+                record["bytes"] = sum(entry.size for entry in entries if not entry.is_dir)
+            else:
+                extracted = volume.extract_all(output_dir)
+                written = [(entry, path) for entry, path in extracted if not entry.is_dir]
+                record["files"] = sum(1 for _, path in written if path is not None)
+                record["failed"] = sum(1 for _, path in written if path is None)
+                record["bytes"] = sum(entry.size for entry, path in written if path is not None)
+        record["status"] = "ok" if not record.get("failed") else "partial"
+    except (VolumeError, ValueError, OSError) as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["seconds"] = round(time.time() - started, 3)
+    return record
+
+
+def run_batch(source: Union[str, Path], output_root: Union[str, Path], jobs: Optional[int] = None,
+              list_only: bool = False, fs_type: Optional[str] = None, resume: bool = True,
+              progress: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    """
+    Process every image of a batch source on a shared thread pool
+
+    Args:
+        source: Directory or glob pattern
+        output_root: Root of the per-image output trees and of the manifest
+        jobs: Images processed concurrently (default: one per core)
+        list_only: Record listings in the manifest without extracting
+        fs_type: Force one filesystem type for every image
+        resume: Skip images already processed successfully per the manifest
+        progress: Called with each manifest record as it is written
+
+    Returns:
+        Manifest records of the images processed in this run, in image order
+    """
+    output_root = Path(output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_root / MANIFEST_NAME
+
+    base, images = find_images(source)
+    previous = load_manifest(manifest_path) if resume else {}
+    pending = [image for image in images
+               if not _is_done(previous.get(str(image)), image, list_only)]
+
+    lock = threading.Lock()
+    manifest = open(manifest_path, "a", encoding="utf-8")
+
+    def work(image: Path) -> dict:
+        try:
+            relative = image.resolve().relative_to(base.resolve())
+        except ValueError:
+            relative = Path(image.name)
+        record = process_image(image, output_root / relative, list_only, fs_type)
+        with lock:
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            if progress:
+                progress(record)
+        return record
+
+    try:
+        workers = jobs if jobs and jobs > 0 else default_workers()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending) or 1))) as pool:
+            return list(pool.map(work, pending))
+    finally:
+        manifest.close()
+
+
+def iter_summary(records: List[dict]) -> Iterator[str]:
+    """Human-readable lines for a list of manifest records"""
+    for record in records:
+        name = record["image"]
+        if record["status"] == "error":
+            yield f"[ERROR] {name}: {record.get('error', 'unknown error')}"
+        else:
+            failed = f", {record['failed']} failed" if record.get("failed") else ""
+            yield (f"[{record['status'].upper()}] {name}: {record.get('filesystem', '?')}, "
+                   f"{record.get('files', 0)} files, {record.get('bytes', 0):,} bytes{failed}")
+
+
+def main_batch(source: str, output_root: str, jobs: Optional[int] = None,
+               list_only: bool = False, fs_type: Optional[str] = None) -> int:
+    """Command-line front end shared by the extractor CLIs; returns an exit code"""
+    base, images = find_images(source)
+    if not images:
+        print(f"No disk images found in: {source}")
+        return 1
+
+    print(f"Batch: {len(images)} images from {source} -> {output_root}")
+    records = run_batch(source, output_root, jobs, list_only, fs_type,
+                        progress=lambda record: print(next(iter_summary([record])), flush=True))
+    skipped = len(images) - len(records)
+    errors = sum(1 for record in records if record["status"] != "ok")
+
+    print(f"\nProcessed {len(records)} images ({skipped} already done, {errors} with errors)")
+    print(f"Manifest: {Path(output_root) / MANIFEST_NAME}")
+    return 0 if errors == 0 else 1
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+DEC Extract - In-Process Extraction API
+=======================================
+
+A single importable entry point for every supported filesystem (RT-11,
+Unix V6 and ODS-1), for front ends that would otherwise spawn the
+rt11extract CLI and scrape its output:
+
+    from dec_extract import open_image
+
+    with open_image("disk.dsk") as volume:
+        for entry in volume.entries():
+            print(entry.path, entry.size, entry.date)
+        volume.extract_all("extracted")
+
+The image is mapped once and parsed once per Volume; entries are plain
+dataclasses and file contents are streamed in bounded chunks. Parsed
+catalogs are kept in a persistent cache (utils/catalog_cache.py), so
+reopening an image that was already listed skips detection and parsing.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from importlib.machinery import SourceFileLoader
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+_backend_dir = Path(__file__).resolve().parent
+if str(_backend_dir) not in sys.path:
+    sys.path.insert(0, str(_backend_dir))
+
+from utils.block_device import BlockDevice, DEFAULT_BLOCK_SIZE, DEFAULT_CHUNK_SIZE
+from utils.catalog_cache import CatalogCache, image_fingerprint
+from utils.extract_manifest import ManifestWriter
+from utils.extract_scheduler import unique_path
+from utils.fs_detect import detect
+
+BLOCK_SIZE = DEFAULT_BLOCK_SIZE
+
+# Scripts are loaded once even when several threads open volumes at the same time
+_load_lock = threading.RLock()
+
+
+class VolumeError(Exception):
+    """Raised when an image cannot be opened or parsed"""
+    pass
+
+
+@dataclass
+class Entry:
+    """A file or directory on a volume"""
+    name: str                      # Name as stored on the volume (e.g. "RSX11.SYS;1")
+    path: str                      # Relative path used for extraction (e.g. "001054/RSX11.SYS")
+    size: int                      # Size in bytes
+    blocks: int                    # Size in 512-byte blocks
+    date: Optional[str] = None     # Creation/modification date, YYYY-MM-DD
+    dates: Dict[str, str] = field(default_factory=dict)  # Every known date ("created", "modified", ...)
+    file_type: str = ""            # Human-readable type, empty if unknown
+    status: str = "permanent"      # Filesystem status (RT-11: permanent, tentative, ...)
+    is_dir: bool = False
+    extents: List[Tuple[int, int]] = field(default_factory=list)  # (start_block, count) runs
+    inode: Optional[int] = None    # File identity on filesystems with hard links (Unix)
+    handle: Any = field(default=None, repr=False, compare=False)  # Engine-specific record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable form, without the engine handle"""
+        data = {
+            'name': self.name,
+            'path': self.path,
+            'type': 'directory' if self.is_dir else 'file',
+            'size': self.size,
+            'blocks': self.blocks,
+            'dates': self.dates,
+            'status': self.status,
+            'file_type': self.file_type,
+            'extents': [list(run) for run in self.extents],
+        }
+        if self.inode is not None:
+            data['inode'] = self.inode
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Entry':
+        """Entry from to_dict() output (plus 'date'), without an engine handle"""
+        return cls(
+            name=data['name'],
+            path=data['path'],
+            size=data['size'],
+            blocks=data['blocks'],
+            date=data.get('date'),
+            dates=data.get('dates', {}),
+            file_type=data.get('file_type', ""),
+            status=data.get('status', "permanent"),
+            is_dir=data.get('type') == 'directory',
+            extents=[tuple(run) for run in data.get('extents', [])],
+            inode=data.get('inode'),
+        )
+
+
+def _load_script(name: str):
+    """Import one of the extension-less scripts in backend/extractors as a module"""
+    with _load_lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        script = _backend_dir / "extractors" / name
+        if not script.is_file():
+            raise VolumeError(f"Extractor script not found: {script}")
+        loader = SourceFileLoader(name, str(script))
+        spec = importlib.util.spec_from_loader(name, loader)
+        module = importlib.util.module_from_spec(spec)
+        # Registered before executing so dataclasses can resolve the module
+        sys.modules[name] = module
+        try:
+            loader.exec_module(module)
+        except Exception:
+            del sys.modules[name]
+            raise
+        return module
+
+
+class Volume:
+    """A parsed disk image; subclasses provide the filesystem specifics"""
+
+    filesystem = "unknown"
+    description = "Unknown"
+    catalog_version = 1    # Bump when parsing changes, to invalidate cached catalogs
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._entries: Optional[List[Entry]] = None
+        self._cache: Optional[CatalogCache] = None
+        self._fingerprint: Optional[str] = None
+        self.from_cache = False
+
+    def __enter__(self) -> 'Volume':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the image"""
+        pass
+
+    def iter_entries(self) -> Iterator[Entry]:
+        """Files and directories as they are discovered (cached for later calls)"""
+        if self._entries is not None:
+            yield from self._entries
+            return
+        entries = []
+        for entry in self._scan():
+            entries.append(entry)
+            yield entry
+        self._entries = entries
+        if self._cache is not None:
+            self._cache.store(self._fingerprint, self.filesystem, self.catalog_version,
+                              [dict(entry.to_dict(), date=entry.date) for entry in entries])
+
+    def _use_catalog(self, cache: CatalogCache, fingerprint: str,
+                     record: Optional[Dict[str, Any]]) -> None:
+        """Take entries from a cached catalog record, or store the catalog once scanned"""
+        self._fingerprint = fingerprint
+        if (record is not None and record.get('fs_type') == self.filesystem
+                and record.get('version') == self.catalog_version):
+            self._entries = [Entry.from_dict(data) for data in record['entries']]
+            self.from_cache = True
+        else:
+            self._cache = cache
+
+    def _handle(self, entry: Entry) -> Any:
+        """
+        Engine record of an entry
+
+        Entries loaded from the catalog cache have none; the first call
+        rescans the volume and attaches the records to every cached entry.
+        """
+        if entry.handle is None:
+            handles = {scanned.path: scanned.handle for scanned in self._scan()}
+            for cached in self._entries or ():
+                cached.handle = handles.get(cached.path)
+            if entry.handle is None:
+                raise VolumeError(f"Entry no longer on volume: {entry.path}")
+        return entry.handle
+
+    def entries(self) -> List[Entry]:
+        """All files and directories, parsed once and cached"""
+        if self._entries is None:
+            for _ in self.iter_entries():
+                pass
+        return self._entries
+
+    def files(self) -> List[Entry]:
+        """Regular files only"""
+        return [entry for entry in self.entries() if not entry.is_dir]
+
+    def _scan(self) -> Iterator[Entry]:
+        """Generator of entries in discovery order"""
+        raise NotImplementedError
+
+    def iter_file_chunks(self, entry: Entry, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+        """Stream the contents of a file in chunks of at most chunk_size bytes"""
+        raise NotImplementedError
+
+    def read_file(self, entry: Entry) -> bytes:
+        """Whole contents of a file (prefer iter_file_chunks for large files)"""
+        return b"".join(bytes(chunk) for chunk in self.iter_file_chunks(entry))
+
+    def read_range(self, entry: Entry, offset: int, size: int) -> bytes:
+        """Up to size bytes of a file starting at offset, streamed through iter_file_chunks"""
+        end = offset + size
+        pieces = []
+        position = 0
+        for chunk in self.iter_file_chunks(entry):
+            chunk_end = position + len(chunk)
+            if chunk_end > offset:
+                pieces.append(bytes(chunk[max(0, offset - position):end - position]))
+            position = chunk_end
+            if position >= end:
+                break
+        return b"".join(pieces)
+
+    def extract(self, entry: Entry, output_dir: Union[str, Path]) -> Path:
+        """
+        Write one entry below output_dir, keeping its relative path
+
+        Args:
+            entry: File or directory to extract
+            output_dir: Destination root
+
+        Returns:
+            Path of the extracted file or directory
+        """
+        target = Path(output_dir) / entry.path
+        if entry.is_dir:
+            target.mkdir(parents=True, exist_ok=True)
+            return target
+        self._write(entry, target)
+        return target
+
+    def _write(self, entry: Entry, target: Path) -> None:
+        """Copy a file's data to target and give it the entry's date"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'wb') as f:
+            for chunk in self.iter_file_chunks(entry):
+                f.write(chunk)
+
+        # Original date as modification time, as the RT-11 CLI does
+        if entry.date:
+            try:
+                timestamp = datetime.strptime(entry.date, '%Y-%m-%d').timestamp()
+                os.utime(target, (timestamp, timestamp))
+            except (ValueError, OSError, OverflowError):
+                pass
+
+    def extract_all(self, output_dir: Union[str, Path]) -> List[Tuple[Entry, Optional[Path]]]:
+        """
+        Extract every entry below output_dir
+
+        A file with several names (same Entry.inode) is written once; the
+        other names are created with os.link, or recorded as references in
+        the extraction manifest where the destination has no hard links.
+        Files whose paths collide get a _N suffix, as the CLIs do.
+
+        Returns:
+            (entry, path) pairs; path is None for files that could not be read
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        results = []
+        taken: set = set()
+        written: Dict[int, Path] = {}
+        manifest = None
+        try:
+            for entry in self.entries():
+                if entry.is_dir:
+                    try:
+                        results.append((entry, self.extract(entry, output_path)))
+                    except OSError:
+                        results.append((entry, None))
+                    continue
+
+                target = unique_path(output_path / entry.path, taken, check_disk=False)
+                first = written.get(entry.inode) if entry.inode is not None else None
+                if first is None:
+                    try:
+                        self._write(entry, target)
+                    except (VolumeError, ValueError, OSError):
+                        results.append((entry, None))
+                        continue
+                    if entry.inode is not None:
+                        written[entry.inode] = target
+                    results.append((entry, target))
+                    continue
+
+                try:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    if target.exists():
+                        target.unlink()
+                    os.link(first, target)
+                    results.append((entry, target))
+                except OSError as e:
+                    if manifest is None:
+                        manifest = ManifestWriter(output_path, self.path, self.filesystem, append=True)
+                    manifest.add({'path': target.relative_to(output_path).as_posix(),
+                                  'link_to': first.relative_to(output_path).as_posix(),
+                                  'inode': entry.inode, 'error': str(e)})
+                    results.append((entry, first))
+        finally:
+            if manifest is not None:
+                manifest.close()
+        return results
+
+
+class RT11Volume(Volume):
+    """RT-11 volume, parsed with the same directory scan as the rt11extract CLI"""
+
+    filesystem = "rt11"
+    description = "RT-11"
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(path)
+        self._rt11 = _load_script("rt11extract_universal")
+        self.device = BlockDevice(self.path, BLOCK_SIZE)
+
+    def close(self) -> None:
+        self.device.close()
+
+    def _scan(self) -> Iterator[Entry]:
+        files = self._rt11._scan_rt11_directory(self.device, verbose=False)
+
+        # Remove duplicates by filename (keep first occurrence), as the CLI does
+        unique_files: Dict[str, Dict[str, Any]] = {}
+        for file_info in files:
+            unique_files.setdefault(file_info['filename'].upper(), file_info)
+        final_files = list(unique_files.values())
+
+        for file_info in sorted(final_files, key=lambda x: (x['segment'], x['offset'])):
+            filename = file_info['filename']
+            start_block = file_info['file_start_block']
+            ext = filename.rsplit('.', 1)[1].upper() if '.' in filename else ''
+            category = self._rt11.FileType.__members__.get(ext)
+            date = file_info['creation_date']
+            yield Entry(
+                name=filename,
+                path=filename,
+                size=file_info['size_bytes'],
+                blocks=file_info['size_blocks'],
+                date=date,
+                dates={'created': date} if date else {},
+                file_type=category.value if category else "",
+                status=file_info['file_type'],
+                extents=[(start_block, file_info['size_blocks'])],
+                handle=file_info,
+            )
+
+    def iter_file_chunks(self, entry: Entry, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+        start_block = entry.extents[0][0]
+        # Files running past the end of the image are truncated, not padded
+        length = max(0, min(entry.size, self.device.size - start_block * BLOCK_SIZE))
+        return self.device.iter_runs(entry.extents, length, chunk_size)
+
+
+class UnixVolume(Volume):
+    """Unix V6 volume, walked from the root directory"""
+
+    filesystem = "unix"
+    description = "Unix PDP-11"
+    catalog_version = 3    # Entries carry their inode number (hard links)
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(path)
+        from filesystems.unix_pdp11_extractor import UnixV6FileSystem
+        try:
+            self.fs = UnixV6FileSystem(str(self.path))
+        except ValueError as e:
+            raise VolumeError(str(e))
+
+    def close(self) -> None:
+        self.fs.close()
+
+    def _scan(self) -> Iterator[Entry]:
+        for walked in self.fs.walk("/", sort=False):
+            inode = walked.inode
+            if walked.error is not None or inode is None:
+                # Unreadable inode, or a directory whose listing failed
+                continue
+
+            path = walked.path.lstrip('/')
+            modtime = inode.get_unix_time()
+            date = modtime.strftime('%Y-%m-%d') if modtime else None
+            dates = {'modified': modtime.strftime('%Y-%m-%d %H:%M:%S')} if modtime else {}
+
+            if inode.is_dir():
+                yield Entry(name=walked.name, path=path, size=0, blocks=0, date=date, dates=dates,
+                            file_type="Directory", is_dir=True, handle=inode)
+                continue
+
+            try:
+                extents = self.fs.extent_map(inode)
+            except ValueError:
+                extents = []
+            yield Entry(
+                name=walked.name,
+                path=path,
+                size=inode.size,
+                blocks=(inode.size + BLOCK_SIZE - 1) // BLOCK_SIZE,
+                date=date,
+                dates=dates,
+                file_type="Executable" if inode.flag & 0o111 else "Regular File",
+                extents=extents,
+                inode=walked.inode_num,
+                handle=inode,
+            )
+
+    def iter_file_chunks(self, entry: Entry, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+        if entry.handle is None and (entry.extents or entry.size == 0):
+            # Cached entry: its extents are the coalesced block list of the inode
+            if entry.extents and max(start + count for start, count in entry.extents) > self.fs.device.block_count:
+                raise VolumeError(f"Block beyond image size in {entry.path}")
+            return self.fs.device.iter_runs(entry.extents, entry.size, chunk_size)
+        return self.fs.iter_file_chunks(self._handle(entry), chunk_size)
+
+
+class ODS1Volume(Volume):
+    """ODS-1 (Files-11) volume, laid out like the ODS-1 extractor's output"""
+
+    filesystem = "ods1"
+    description = "RSX-11 (ODS-1)"
+    catalog_version = 6    # Versions of a file get the CLI's _N output names
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(path)
+        from filesystems.ods1_extractor_v2 import ODS1Extractor, Files11Exception
+        self._error = Files11Exception
+        self.extractor = ODS1Extractor(str(self.path))
+        try:
+            valid = self.extractor.parse_home_block()
+        except Files11Exception as e:
+            self.close()
+            raise VolumeError(str(e))
+        if not valid:
+            self.close()
+            raise VolumeError("Invalid or missing ODS-1 home block")
+
+    def close(self) -> None:
+        self.extractor.close()
+
+    def _scan(self) -> Iterator[Entry]:
+        ods1 = self.extractor
+        # Directory placement depends on every directory header, so the
+        # header scan completes before the first entry is produced
+        headers = ods1.scan_for_file_headers(verbose=False)
+        directories, files = ods1.classify_headers(headers)
+
+        for dir_name in directories.values():
+            yield Entry(name=dir_name, path=dir_name, size=0, blocks=0,
+                        file_type="Directory", is_dir=True)
+
+        # Several versions of a file share a safe name: later ones get a _N
+        # suffix, in the same order as the CLI's extraction
+        taken: set = set()
+        for header in files:
+            display_name, safe_name = ods1.file_names(header)
+            dir_name = ods1.directory_for(header, directories)
+            try:
+                extents = ods1.extent_map(header)
+            except self._error:
+                extents = []
+            size = ods1._file_size_bytes(header)
+            if size is None:
+                size = sum(count for _, count in extents) * BLOCK_SIZE
+            dates = {}
+            for kind, value in (('created', header.creation_date),
+                                ('revised', header.revision_date),
+                                ('expires', header.expiration_date)):
+                formatted = ods1.format_date(value) if value else "N/A"
+                if formatted != "N/A":
+                    dates[kind] = formatted
+            yield Entry(
+                name=display_name,
+                path=unique_path(Path(dir_name or "") / safe_name, taken, check_disk=False).as_posix(),
+                size=size,
+                blocks=(size + BLOCK_SIZE - 1) // BLOCK_SIZE,
+                date=dates.get('created'),
+                dates=dates,
+                file_type=ods1.get_file_type(header.filetype),
+                extents=extents,
+                handle=header,
+            )
+
+    def iter_file_chunks(self, entry: Entry, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+        if entry.handle is None and entry.extents:
+            # Cached entry mapped by retrieval pointers
+            return self.extractor.device.iter_runs(entry.extents, entry.size, chunk_size)
+        try:
+            return self.extractor.iter_file_chunks(self._handle(entry), chunk_size)
+        except self._error as e:
+            raise VolumeError(str(e))
+
+
+VOLUME_TYPES = {
+    "rt11": RT11Volume,
+    "unix": UnixVolume,
+    "ods1": ODS1Volume,
+}
+
+
+def detect_filesystem(path: Union[str, Path]) -> str:
+    """
+    Filesystem type of an image, best-ranked among the supported volume types
+
+    Images no probe recognises are treated as RT-11, like the rt11extract CLI does.
+    """
+    results = detect(path, fs_types=VOLUME_TYPES)
+    return results[0].fs_type if results else "rt11"
+
+
+def write_jsonl(volume: Volume, stream=None) -> int:
+    """
+    Stream one JSON object per entry, as each one is discovered
+
+    Every line is flushed immediately so consumers can start work before
+    the listing finishes.
+
+    Args:
+        volume: Open volume to list
+        stream: Text stream to write to (default: stdout)
+
+    A reader that closes the pipe early (``| head``) ends the listing
+    quietly instead of raising.
+
+    Returns:
+        Number of entries written
+    """
+    stream = stream or sys.stdout
+    count = 0
+    try:
+        for entry in volume.iter_entries():
+            stream.write(json.dumps(entry.to_dict()) + "\n")
+            stream.flush()
+            count += 1
+    except BrokenPipeError:
+        if stream is sys.stdout:
+            # Python flushes stdout again at exit; point it at devnull so that
+            # flush does not raise a second time
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+    return count
+
+
+def open_image(path: Union[str, Path], fs_type: Optional[str] = None,
+               cache: Union[bool, CatalogCache] = True) -> Volume:
+    """
+    Open a disk image for in-process listing and extraction
+
+    Args:
+        path: Disk image file
+        fs_type: Force 'rt11', 'unix' or 'ods1' instead of auto-detecting
+        cache: Use the persistent catalog cache (True: default location,
+               False: always parse, or a CatalogCache instance)
+
+    Returns:
+        Volume for the image (use as a context manager to release it)
+
+    Raises:
+        VolumeError: If the image is missing or cannot be parsed
+    """
+    if not os.path.exists(path):
+        raise VolumeError(f"Image not found: {path}")
+
+    record = None
+    if cache is True:
+        cache = CatalogCache()
+    if cache and cache.enabled:
+        fingerprint = image_fingerprint(path)
+        record = cache.load(fingerprint)
+    else:
+        cache = None
+
+    if fs_type is None:
+        if record is not None and record.get('fs_type') in VOLUME_TYPES:
+            fs_type = record['fs_type']
+        else:
+            fs_type = detect_filesystem(path)
+    volume_type = VOLUME_TYPES.get(fs_type)
+    if volume_type is None:
+        raise VolumeError(f"Unsupported filesystem type: {fs_type}")
+    volume = volume_type(path)
+    if cache is not None:
+        volume._use_catalog(cache, fingerprint, record)
+    return volume
@@ -25,126 +25,32 @@ filesystems_dir = backend_dir / 'filesystems'
 sys.path.insert(0, str(filesystems_dir))
 sys.path.insert(0, str(backend_dir))  # Add backend to path
 
-# Import detection functions from each extractor
 from utils.bundle_paths import get_rt11extract_path
+from utils.fs_detect import detect_filesystem
 
-def detect_rt11_filesystem(path):
-    """Detect RT-11 filesystem using CLI extractor"""
-    try:
-        # Use helper to find path
-        rt11extract_path = get_rt11extract_path()
-        
-        # Convert path to absolute path to avoid working directory issues
-        abs_path = os.path.abspath(path)
-        cmd = [str(rt11extract_path), abs_path, '-l']
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Debug output
-        # print(f"DEBUG: RT-11 cmd: {cmd}")
-        # print(f"DEBUG: RT-11 returncode: {result.returncode}")
-        # print(f"DEBUG: RT-11 stdout: {result.stdout[:200]}...")
-        # print(f"DEBUG: RT-11 stderr: {result.stderr}")
-        
-        if result.returncode == 0 and 'RT-11 Directory Listing' in result.stdout:
-            # Count files
-            lines = result.stdout.split('\n')
-            file_count = 0
-            for line in lines:
-                if line.startswith('Total files:'):
-                    file_count = int(line.split(':')[1].strip())
-                    break
-            
-            if file_count > 0:
-                return True, f"RT-11 filesystem ({file_count} files detected)"
-            else:
-                return True, "RT-11 filesystem detected"
-        else:
-            return False, f"Not an RT-11 filesystem (returncode: {result.returncode})"
-    except FileNotFoundError as e:
-        return False, f"RT-11 extractor (rt11extract) not found: {e}"
-    except Exception as e:
-        return False, f"RT-11 detection failed: {e}"
-
-try:
-    # Try to import unix_pdp11_extractor functions
-    import unix_pdp11_extractor
-    def detect_unix_filesystem(path):
-        return unix_pdp11_extractor.detect_unix_filesystem(path)
-except ImportError:
-    def detect_unix_filesystem(path):
-        return False, "Unix extractor not available"
-
-try:
-    # Try to import ODS-1 extractor functions
-    from ods1_extractor_v2 import ODS1Extractor
-    def detect_ods1_filesystem(path):
-        try:
-            extractor = ODS1Extractor(path)
-            # Try to parse home block
-            if extractor.parse_home_block():
-                # Verify structure level is correct for ODS-1 (0x0101)
-                if extractor.volume_structure_level != 0x0101:
-                    return False, f"Invalid ODS-1 structure level: 0x{extractor.volume_structure_level:04x} (expected 0x0101)"
-                
-                # Additional validation: check if max_files is reasonable
-                if extractor.max_files == 0 or extractor.max_files > 100000:
-                    return False, f"Invalid max_files value: {extractor.max_files}"
-                
-                # Additional validation: check if index file bitmap LBN is reasonable
-                if extractor.index_file_bitmap_lbn > extractor.total_blocks:
-                    return False, f"Index file bitmap LBN ({extractor.index_file_bitmap_lbn}) exceeds disk size ({extractor.total_blocks})"
-                
-                vol_name = extractor.volume_name.strip()
-                if vol_name:
-                    # Check for RSX naming patterns
-                    if "RSX" in vol_name.upper():
-                        return True, f"ODS-1/Files-11 filesystem - RSX-11M+ (Volume: {vol_name})"
-                    else:
-                        return True, f"ODS-1/Files-11 filesystem (Volume: {vol_name})"
-                else:
-                    return True, "ODS-1/Files-11 filesystem (RSX-11 or early VMS) with enhanced TSK support"
-            return False, "Not an ODS-1 filesystem"
-        except Exception as e:
-            return False, f"ODS-1 detection failed: {e}"
-except ImportError:
-    def detect_ods1_filesystem(path):
-        return False, "ODS-1 extractor not available"
+# Extractor script for each detected filesystem type
+EXTRACTOR_SCRIPTS = {
+    'ods1': 'ods1_extractor_v2.py',
+    'rt11': 'rt11_extractor_tu58em.py',
+    'unix': 'unix_pdp11_extractor.py',
+}
 
 def detect_filesystem_type(image_path: str) -> tuple[str, str, str]:
     """
     Detect filesystem type and return (type, description, extractor_command)
     
+    Detection reads a bounded head of the image once and ranks the
+    filesystem probes in utils/fs_detect.py by confidence.
+    
     Returns:
         tuple: (filesystem_type, description, extractor_script)
         
-    filesystem_type can be: 'rt11', 'unix', 'ods1', or 'unknown'
+    filesystem_type can be: 'rt11', 'unix', 'ods1', 'os8', or 'unknown'
     """
-    
-    # Try ODS-1/Files-11 detection first (most specific)
-    try:
-        is_ods1, ods1_desc = detect_ods1_filesystem(image_path)
-        if is_ods1:
-            return 'ods1', ods1_desc, 'ods1_extractor_v2.py'
-    except Exception as e:
-        print(f"ODS-1 detection error: {e}")
-    
-    # Try RT-11 detection
-    try:
-        is_rt11, rt11_desc = detect_rt11_filesystem(image_path)
-        if is_rt11:
-            return 'rt11', rt11_desc, 'rt11_extractor_tu58em.py'
-    except Exception as e:
-        print(f"RT-11 detection error: {e}")
-    
-    # Try Unix detection
-    try:
-        is_unix, unix_desc = detect_unix_filesystem(image_path)
-        if is_unix:
-            return 'unix', unix_desc, 'unix_pdp11_extractor.py'
-    except Exception as e:
-        print(f"Unix detection error: {e}")
-    
-    return 'unknown', 'Unknown or unsupported PDP-11 filesystem', None
+    fs_type, description = detect_filesystem(image_path)
+    if fs_type == 'unknown':
+        return 'unknown', 'Unknown or unsupported PDP-11 filesystem', None
+    return fs_type, description, EXTRACTOR_SCRIPTS.get(fs_type)
 
 def run_extractor(extractor_script: str, image_path: str, args: argparse.Namespace) -> int:
     """Run the appropriate extractor with the given arguments"""
@@ -273,14 +179,9 @@ Examples:
     
     # Force filesystem type if specified
     if args.force_type:
-        extractor_map = {
-            'rt11': 'rt11_extractor_tu58em.py',
-            'unix': 'unix_pdp11_extractor.py',
-            'ods1': 'ods1_extractor_v2.py'
-        }
         fs_type = args.force_type
         description = f"Forced {fs_type.upper()} filesystem"
-        extractor_script = extractor_map[fs_type]
+        extractor_script = EXTRACTOR_SCRIPTS[fs_type]
         
         if args.verbose or args.detect_only:
             print(f"🔧 {description}")
@@ -30,7 +30,7 @@ import time
 import logging
 import subprocess
 import tempfile
-import json
+import shutil
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -42,6 +42,17 @@ except ImportError:
     print("Instálalo con: pip install fusepy")
     sys.exit(1)
 
+# API de extracción en proceso: el catálogo se guarda en caché por huella de la
+# imagen; sin ella (binarios empaquetados) se usa el CLI rt11extract
+_backend_dir = str(Path(__file__).resolve().parent.parent)
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
+try:
+    from dec_extract import open_image, VolumeError
+    from utils.catalog_cache import image_fingerprint
+except ImportError:
+    open_image = None
+
 class RT11FileEntry:
     """Representación simplificada de un archivo RT-11"""
     def __init__(self, filename, file_type, size_blocks, start_block, status=0):
@@ -51,6 +62,7 @@ class RT11FileEntry:
         self.start_block = start_block
         self.status = status
         self.creation_date = None
+        self.size = None  # Tamaño exacto en bytes, si se conoce
         
     @property
     def full_filename(self):
@@ -60,6 +72,8 @@ class RT11FileEntry:
     
     @property
     def size_bytes(self):
+        if self.size is not None:
+            return self.size
         return self.size_blocks * 512
     
     @property
@@ -77,7 +91,11 @@ class RT11ExtractorWrapper:
     def __init__(self, image_path: str):
         self.image_path = Path(image_path)
         self.logger = logging.getLogger('RT11-Extractor')
-        self._file_data_cache = {}  # Cache para datos de archivos
+        self._file_data_cache = {}  # Rutas de los archivos extraídos (nombre -> Path)
+        self._extracted_dir = None  # Directorio de extracción persistente
+        self._volume = None         # Volumen abierto con open_image
+        self._fingerprint = None    # Huella de la imagen cuando se abrió el volumen
+        self._entries = {}          # Entradas del volumen (nombre -> Entry)
         
         # Find rt11extract in different possible locations
         # Handle PyInstaller executable vs script mode
@@ -125,8 +143,8 @@ class RT11ExtractorWrapper:
                 self.logger.info(f"Found rt11extract at: {path}")
                 break
         
-        # Verificar que el extractor existe
-        if not self.rt11extract_path:
+        # Verificar que el extractor existe (solo hace falta sin la API en proceso)
+        if not self.rt11extract_path and open_image is None:
             # Try to find it in PATH as last resort
             import shutil
             system_rt11extract = shutil.which("rt11extract_cli") or shutil.which("rt11extract")
@@ -138,47 +156,105 @@ class RT11ExtractorWrapper:
         
         # Hacer el extractor ejecutable
         try:
-            os.chmod(self.rt11extract_path, 0o755)
+            if self.rt11extract_path:
+                os.chmod(self.rt11extract_path, 0o755)
         except (OSError, PermissionError):
             # Ignore chmod errors for system executables
             pass
         
     def list_files(self) -> List[RT11FileEntry]:
-        """Obtener lista de archivos extrayendo a directorio temporal"""
+        """Obtener lista de archivos (API en proceso, o extrayendo con el CLI)"""
+        if open_image is not None:
+            return self._list_volume()
+        return self._list_extracted()
+    
+    def _list_volume(self) -> List[RT11FileEntry]:
+        """
+        Listar mediante open_image, sin extraer nada
+        
+        El volumen se reabre solo si cambia la huella de la imagen; al
+        reabrirlo, el catálogo en caché evita volver a analizar el directorio.
+        """
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-                
-                # Ejecutar rt11extract para extraer todos los archivos
-                cmd = [str(self.rt11extract_path), str(self.image_path), "-o", str(temp_path)]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-                
-                if result.returncode != 0:
-                    self.logger.error(f"rt11extract falló: {result.stderr}")
-                    return []
-                
-                # Escanear archivos extraídos
-                files = []
-                for file_path in temp_path.iterdir():
-                    if file_path.is_file() and not file_path.name.endswith('.rt11info'):
-                        filename = file_path.name
-                        size_bytes = file_path.stat().st_size
-                        size_blocks = (size_bytes + 511) // 512  # Redondear hacia arriba
-                        
-                        # Separar nombre y extensión
-                        if '.' in filename:
-                            name, ext = filename.rsplit('.', 1)
-                        else:
-                            name, ext = filename, ""
-                        
-                        entry = RT11FileEntry(name, ext, size_blocks, 0)
-                        files.append(entry)
-                        
-                        # Guardar datos del archivo para cache
-                        self._file_data_cache[filename] = file_path.read_bytes()
-                
-                self.logger.info(f"Encontrados {len(files)} archivos")
-                return files
+            fingerprint = image_fingerprint(self.image_path)
+            if self._volume is None or fingerprint != self._fingerprint:
+                volume = open_image(self.image_path)
+                try:
+                    entries = volume.files()
+                except Exception:
+                    volume.close()
+                    raise
+                self.cleanup()
+                self._volume, self._fingerprint = volume, fingerprint
+                # Sistema de archivos plano: solo los archivos del nivel superior
+                self._entries = {entry.path: entry for entry in entries if '/' not in entry.path}
+        except (VolumeError, OSError) as e:
+            self.logger.error(f"Error abriendo la imagen: {e}")
+            return []
+        
+        files = []
+        for path, entry in self._entries.items():
+            # Separar nombre y extensión
+            if '.' in path:
+                name, ext = path.rsplit('.', 1)
+            else:
+                name, ext = path, ""
+            
+            file_entry = RT11FileEntry(name, ext, entry.blocks, entry.extents[0][0] if entry.extents else 0)
+            file_entry.creation_date = entry.date
+            file_entry.size = entry.size
+            files.append(file_entry)
+        
+        self.logger.info(f"Encontrados {len(files)} archivos")
+        return files
+    
+    def _list_extracted(self) -> List[RT11FileEntry]:
+        """Obtener lista de archivos extrayendo a directorio temporal persistente"""
+        try:
+            # Nueva extracción en un directorio persistente; los archivos se leen
+            # por fragmentos desde disco en lugar de guardarse en memoria
+            temp_path = Path(tempfile.mkdtemp(prefix="fuse_rt11_"))
+            
+            # Ejecutar rt11extract para extraer todos los archivos
+            cmd = [str(self.rt11extract_path), str(self.image_path), "-o", str(temp_path)]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            
+            if result.returncode != 0:
+                self.logger.error(f"rt11extract falló: {result.stderr}")
+                shutil.rmtree(temp_path, ignore_errors=True)
+                return []
+            
+            self.cleanup()
+            self._extracted_dir = temp_path
+            
+            # Escanear archivos extraídos (sin el manifiesto de extracción)
+            try:
+                from utils.extract_manifest import is_manifest_file
+            except ImportError:
+                sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+                from utils.extract_manifest import is_manifest_file
+            
+            files = []
+            for file_path in temp_path.iterdir():
+                if file_path.is_file() and not is_manifest_file(file_path):
+                    filename = file_path.name
+                    size_bytes = file_path.stat().st_size
+                    size_blocks = (size_bytes + 511) // 512  # Redondear hacia arriba
+                    
+                    # Separar nombre y extensión
+                    if '.' in filename:
+                        name, ext = filename.rsplit('.', 1)
+                    else:
+                        name, ext = filename, ""
+                    
+                    entry = RT11FileEntry(name, ext, size_blocks, 0)
+                    files.append(entry)
+                    
+                    # Guardar la ruta del archivo para lecturas posteriores
+                    self._file_data_cache[filename] = file_path
+            
+            self.logger.info(f"Encontrados {len(files)} archivos")
+            return files
                 
         except subprocess.TimeoutExpired:
             self.logger.error("rt11extract timeout")
@@ -187,58 +263,43 @@ class RT11ExtractorWrapper:
             self.logger.error(f"Error ejecutando rt11extract: {e}")
             return []
     
-    def _parse_file_list(self, output: str) -> List[RT11FileEntry]:
-        """Parsear la salida de rt11extract para obtener lista de archivos"""
-        files = []
+    def read_file_range(self, filename: str, size: int, offset: int) -> bytes:
+        """Leer un fragmento de un archivo sin cargarlo entero"""
+        if self._volume is not None:
+            entry = self._entries.get(filename)
+            if entry is None:
+                # Buscar con diferentes variaciones del nombre
+                entry = next((entry for name, entry in self._entries.items()
+                              if name.upper() == filename.upper()), None)
+            if entry is None:
+                raise FileNotFoundError(filename)
+            return self._volume.read_range(entry, offset, size)
         
-        # Buscar la sección de archivos en la salida
-        lines = output.split('\n')
-        in_file_list = False
+        file_path = self._file_data_cache.get(filename)
+        if file_path is None:
+            # Buscar con diferentes variaciones del nombre
+            for name, path in self._file_data_cache.items():
+                if name.upper() == filename.upper():
+                    file_path = path
+                    break
         
-        for line in lines:
-            line = line.strip()
-            
-            # Detectar inicio de listado de archivos
-            if "Directory Listing" in line or "files found" in line.lower():
-                in_file_list = True
-                continue
+        if file_path is None or not file_path.is_file():
+            raise FileNotFoundError(filename)
             
-            # Detectar fin de listado
-            if in_file_list and (line.startswith("Summary:") or line.startswith("Extraction")):
-                break
-                
-            # Parsear líneas de archivos
-            if in_file_list and line and not line.startswith('-') and not line.startswith('Filename'):
-                try:
-                    # Formato esperado: filename.ext   type   size   status   start   category
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        full_name = parts[0]
-                        if '.' in full_name:
-                            filename, file_type = full_name.rsplit('.', 1)
-                        else:
-                            filename = full_name
-                            file_type = ""
-                        
-                        # Extraer tamaño (puede estar en KB o bloques)
-                        size_str = parts[2]
-                        if size_str.isdigit():
-                            size_blocks = int(size_str)
-                        else:
-                            # Asumir que está en KB, convertir a bloques
-                            size_kb = int(size_str.replace('KB', '').replace('kb', ''))
-                            size_blocks = (size_kb * 1024) // 512
-                        
-                        # Crear entrada de archivo
-                        entry = RT11FileEntry(filename, file_type, size_blocks, 0)
-                        files.append(entry)
-                        
-                except (ValueError, IndexError) as e:
-                    self.logger.debug(f"No se pudo parsear línea: {line} - {e}")
-                    continue
-        
-        self.logger.info(f"Parseados {len(files)} archivos de la salida de rt11extract")
-        return files
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+    
+    def cleanup(self):
+        """Cerrar el volumen y eliminar el directorio de extracción"""
+        if self._volume is not None:
+            self._volume.close()
+            self._volume = None
+            self._entries = {}
+        if self._extracted_dir is not None:
+            shutil.rmtree(self._extracted_dir, ignore_errors=True)
+            self._extracted_dir = None
+            self._file_data_cache.clear()
     
     def extract_file_data(self, filename: str) -> bytes:
         """Extraer datos de un archivo específico"""
@@ -281,7 +342,6 @@ class RT11FileSystem(LoggingMixIn, Operations):
         self.disk_image_path = disk_image_path
         self.extractor = RT11ExtractorWrapper(disk_image_path)
         self.files_cache: Dict[str, RT11FileEntry] = {}
-        self.file_data_cache: Dict[str, bytes] = {}
         self.last_scan_time = 0
         self.cache_timeout = 30  # Cache por 30 segundos
         
@@ -304,7 +364,6 @@ class RT11FileSystem(LoggingMixIn, Operations):
                 
             self.logger.info("Escaneando archivos RT-11...")
             self.files_cache.clear()
-            self.file_data_cache.clear()
             
             # Obtener lista de archivos
             files = self.extractor.list_files()
@@ -316,10 +375,6 @@ class RT11FileSystem(LoggingMixIn, Operations):
                     safe_filename = self._make_safe_filename(filename)
                     self.files_cache[safe_filename] = file_entry
                     
-                    # Copiar datos del cache del extractor si están disponibles
-                    if filename in self.extractor._file_data_cache:
-                        self.file_data_cache[safe_filename] = self.extractor._file_data_cache[filename]
-                    
             self.last_scan_time = current_time
             self.logger.info(f"Escaneados {len(self.files_cache)} archivos")
             
@@ -335,11 +390,8 @@ class RT11FileSystem(LoggingMixIn, Operations):
         safe_name = safe_name.replace('*', '_STAR_')
         return safe_name.upper()
     
-    def _get_file_data(self, filename: str) -> bytes:
-        """Obtener datos de un archivo, con cache"""
-        if filename in self.file_data_cache:
-            return self.file_data_cache[filename]
-            
+    def _get_file_data(self, filename: str, size: int, offset: int) -> bytes:
+        """Obtener un fragmento de un archivo (memoria acotada por size)"""
         if filename not in self.files_cache:
             raise FuseOSError(errno.ENOENT)
             
@@ -349,13 +401,7 @@ class RT11FileSystem(LoggingMixIn, Operations):
             original_name = original_name.replace('_QUESTION_', '?')
             original_name = original_name.replace('_STAR_', '*')
             
-            data = self.extractor.extract_file_data(original_name)
-            
-            # Cache los datos si el archivo no es muy grande
-            if len(data) < 1024 * 1024:  # 1MB
-                self.file_data_cache[filename] = data
-                
-            return data
+            return self.extractor.read_file_range(original_name, size, offset)
             
         except Exception as e:
             self.logger.error(f"Error extrayendo archivo {filename}: {e}")
@@ -442,11 +488,8 @@ class RT11FileSystem(LoggingMixIn, Operations):
         filename = path[1:]
         
         try:
-            data = self._get_file_data(filename)
-            
-            # Leer fragmento solicitado
-            end = offset + size
-            return data[offset:end]
+            # Leer solo el fragmento solicitado
+            return self._get_file_data(filename, size, offset)
             
         except Exception as e:
             self.logger.error(f"Error leyendo {filename}: {e}")
@@ -492,6 +535,10 @@ class RT11FileSystem(LoggingMixIn, Operations):
                 f_favail=0,
                 f_namemax=255
             )
+    
+    def destroy(self, path):
+        """Limpiar al desmontar"""
+        self.extractor.cleanup()
 
 def check_requirements():
     """Verificar requisitos del sistema"""
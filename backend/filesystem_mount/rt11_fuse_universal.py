@@ -138,26 +138,21 @@ class UniversalExtractorWrapper:
         raise Exception(f"No extractor found. Tried: {[str(p) for p in possible_paths]} and {universal_extractor_path}")
     
     def _detect_filesystem_type(self):
-        """Detectar el tipo de filesystem (RT-11 o Unix)"""
+        """Detectar el tipo de filesystem con el detector común (lectura acotada)"""
         try:
-            # Ejecutar con flag de detección
-            cmd = [str(self.rt11extract_path), str(self.image_path), "-l", "-v"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            try:
+                from utils.fs_detect import detect_filesystem
+            except ImportError:
+                sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+                from utils.fs_detect import detect_filesystem
             
-            if result.returncode == 0:
-                output = result.stdout.lower()
-                if "unix" in output or "directory listing:" in output:
-                    self.filesystem_type = "unix"
-                    self.logger.info("Detected Unix filesystem")
-                elif "rt-11" in output or ".sav" in output or ".bas" in output:
-                    self.filesystem_type = "rt11"
-                    self.logger.info("Detected RT-11 filesystem")
-                else:
-                    self.filesystem_type = "rt11"  # Default
-                    self.logger.info("Unknown filesystem, defaulting to RT-11")
-            else:
+            fs_type, description = detect_filesystem(self.image_path)
+            if fs_type == "unknown":
                 self.filesystem_type = "rt11"  # Default
-                self.logger.warning("Could not detect filesystem type, defaulting to RT-11")
+                self.logger.info("Unknown filesystem, defaulting to RT-11")
+            else:
+                self.filesystem_type = fs_type
+                self.logger.info(f"Detected: {description}")
                 
         except Exception as e:
             self.logger.error(f"Error detecting filesystem: {e}")
@@ -211,6 +206,12 @@ class UniversalExtractorWrapper:
     
     def _scan_extracted_files(self, base_path: Path) -> List[FileEntry]:
         """Escanear archivos extraídos y crear estructura de directorios"""
+        try:
+            from utils.extract_manifest import is_manifest_file
+        except ImportError:
+            sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+            from utils.extract_manifest import is_manifest_file
+        
         files = []
         
         # Agregar directorio raíz
@@ -219,7 +220,8 @@ class UniversalExtractorWrapper:
         
         # Escanear recursivamente
         for item_path in base_path.rglob('*'):
-            if item_path.name.endswith('.rt11info'):
+            # El manifiesto de extracción no es un archivo de la imagen
+            if is_manifest_file(item_path):
                 continue
                 
             # Calcular path relativo
@@ -265,6 +267,21 @@ class UniversalExtractorWrapper:
         
         return None
     
+    def read_file_range(self, path: str, size: int, offset: int) -> Optional[bytes]:
+        """Leer solo el fragmento pedido de un archivo (memoria acotada por size)"""
+        path = path.strip('/')
+        
+        cached_path = self._file_data_cache.get(path)
+        if isinstance(cached_path, Path) and cached_path.is_file():
+            try:
+                with open(cached_path, 'rb') as f:
+                    f.seek(offset)
+                    return f.read(size)
+            except Exception as e:
+                self.logger.error(f"Error reading cached file {path}: {e}")
+        
+        return None
+    
     def cleanup(self):
         """Limpiar archivos temporales"""
         if self._extracted_dir and Path(self._extracted_dir).exists():
@@ -394,14 +411,12 @@ class UniversalFuseFS(LoggingMixIn, Operations):
         if entry.is_dir:
             raise FuseOSError(errno.EISDIR)
         
-        # Obtener datos del archivo
-        data = self.extractor.get_file_data(entry.path)
+        # Leer solo el rango pedido, sin cargar el archivo completo
+        data = self.extractor.read_file_range(entry.path, size, offset)
         if data is None:
             raise FuseOSError(errno.EIO)
         
-        # Aplicar offset y size
-        end = min(offset + size, len(data))
-        return data[offset:end]
+        return data
     
     def open(self, path, flags):
         """Abrir archivo"""
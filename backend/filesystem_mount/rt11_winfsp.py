@@ -71,6 +71,17 @@ except Exception as e:
         print(f"fusepy library not available: {e2}")
         WINFSP_AVAILABLE = False
 
+# In-process extraction API: catalogs are cached by image fingerprint; without
+# it (packaged builds) the RT11Extract CLI is used
+_backend_dir = str(Path(__file__).resolve().parent.parent)
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
+try:
+    from dec_extract import open_image, VolumeError
+    from utils.catalog_cache import image_fingerprint
+except ImportError:
+    open_image = None
+
 class RT11FileEntry:
     """Representation of an RT-11 file"""
     def __init__(self, filename, file_type, size_blocks, start_block, status=0):
@@ -80,6 +91,7 @@ class RT11FileEntry:
         self.start_block = start_block
         self.status = status
         self.creation_date = None
+        self.size = None  # Exact size in bytes, when known
         
     @property
     def full_filename(self):
@@ -89,6 +101,8 @@ class RT11FileEntry:
     
     @property
     def size_bytes(self):
+        if self.size is not None:
+            return self.size
         return self.size_blocks * 512
     
     @property
@@ -135,13 +149,70 @@ class RT11ExtractorWrapper:
         
         self.logger = logging.getLogger('RT11-Extractor')
         self._file_data_cache = {}
+        self._volume = None         # Volume opened with open_image
+        self._fingerprint = None    # Image fingerprint when the volume was opened
+        self._entries = {}          # Volume entries (name -> Entry)
         
-        if not self.rt11extract_path:
+        # The CLI is only needed without the in-process API
+        if not self.rt11extract_path and open_image is None:
             error_msg = f"RT11Extract not found. Searched in: {[str(p) for p in search_paths]}"
             print(error_msg)
             raise Exception(error_msg)
         
     def list_files(self) -> List[RT11FileEntry]:
+        """Get list of files (in-process API, or extracting with the CLI)"""
+        if open_image is not None:
+            return self._list_volume()
+        return self._list_extracted()
+    
+    def _list_volume(self) -> List[RT11FileEntry]:
+        """
+        List through open_image, without extracting anything
+        
+        The volume is only reopened when the image fingerprint changes, and
+        reopening it takes the catalog from the cache instead of reparsing.
+        """
+        try:
+            fingerprint = image_fingerprint(self.image_path)
+            if self._volume is None or fingerprint != self._fingerprint:
+                volume = open_image(self.image_path)
+                try:
+                    entries = volume.files()
+                except Exception:
+                    volume.close()
+                    raise
+                self.cleanup()
+                self._volume, self._fingerprint = volume, fingerprint
+                # Flat filesystem: top-level files only
+                self._entries = {entry.path: entry for entry in entries if '/' not in entry.path}
+        except (VolumeError, OSError) as e:
+            self.logger.error(f"Error opening image: {e}")
+            return []
+        
+        files = []
+        for path, entry in self._entries.items():
+            # Separate name and extension
+            if '.' in path:
+                name, ext = path.rsplit('.', 1)
+            else:
+                name, ext = path, ""
+            
+            file_entry = RT11FileEntry(name, ext, entry.blocks, entry.extents[0][0] if entry.extents else 0)
+            file_entry.creation_date = entry.date
+            file_entry.size = entry.size
+            files.append(file_entry)
+        
+        self.logger.info(f"Found {len(files)} files")
+        return files
+    
+    def cleanup(self):
+        """Close the volume"""
+        if self._volume is not None:
+            self._volume.close()
+            self._volume = None
+            self._entries = {}
+    
+    def _list_extracted(self) -> List[RT11FileEntry]:
         """Get list of files by extracting to temporary directory"""
         try:
             with tempfile.TemporaryDirectory() as temp_dir:
@@ -159,10 +230,16 @@ class RT11ExtractorWrapper:
                     self.logger.error(f"RT11Extract failed: {result.stderr}")
                     return []
                 
-                # Scan extracted files
+                # Scan extracted files (leaving out the extraction manifest)
+                try:
+                    from utils.extract_manifest import is_manifest_file
+                except ImportError:
+                    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+                    from utils.extract_manifest import is_manifest_file
+                
                 files = []
                 for file_path in temp_path.iterdir():
-                    if file_path.is_file() and not file_path.name.endswith('.rt11info'):
+                    if file_path.is_file() and not is_manifest_file(file_path):
                         filename = file_path.name
                         size_bytes = file_path.stat().st_size
                         size_blocks = (size_bytes + 511) // 512
@@ -191,6 +268,18 @@ class RT11ExtractorWrapper:
     
     def extract_file_data(self, filename: str) -> bytes:
         """Extract data for a specific file"""
+        if self._volume is not None:
+            entry = next((entry for name, entry in self._entries.items()
+                          if name.upper() == filename.upper()), None)
+            if entry is None:
+                self.logger.error(f"File {filename} not found on the volume")
+                return b''
+            try:
+                return self._volume.read_file(entry)
+            except (VolumeError, OSError) as e:
+                self.logger.error(f"Error reading {filename}: {e}")
+                return b''
+        
         # Try cache first
         if filename in self._file_data_cache:
             return self._file_data_cache[filename]
@@ -314,8 +403,8 @@ class RT11FileSystemWinFsp(LoggingMixIn, Operations):
             raise FuseOSError(errno.ENOENT)
             
         try:
-            # Convert back to original name
-            original_name = filename.replace('_', '')  # Simple reverse conversion
+            # Original name of the entry the safe name was made from
+            original_name = self.files_cache[filename].full_filename
             data = self.extractor.extract_file_data(original_name)
             
             if len(data) < 1024 * 1024:  # Cache files smaller than 1MB
@@ -450,6 +539,10 @@ class RT11FileSystemWinFsp(LoggingMixIn, Operations):
                 f_favail=0,
                 f_namemax=255
             )
+    
+    def destroy(self, path):
+        """Release the image on unmount"""
+        self.extractor.cleanup()
 
 def check_winfsp_requirements():
     """Check if WinFsp is available on Windows"""
@@ -9,11 +9,39 @@ Supports RSX-11M, RSX-11S, IAS, and early VMS ODS-1 disk images.
 
 import struct
 import os
+import sys
 import argparse
-from typing import Dict, List, Tuple, Optional, NamedTuple
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Optional, NamedTuple
 from dataclasses import dataclass
 from datetime import datetime
 
+try:
+    from utils.block_device import BlockDevice, coalesce_runs, DEFAULT_CHUNK_SIZE
+    from utils.catalog_cache import CatalogCache, image_fingerprint
+    from utils.extract_scheduler import ExtractionJob, ExtractionScheduler, unique_path
+    from utils.radix50 import ODS1_CHARSET, RADIX50_LIMIT, decode_table
+    from utils.log_setup import configure_logging, get_logger
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from utils.block_device import BlockDevice, coalesce_runs, DEFAULT_CHUNK_SIZE
+    from utils.catalog_cache import CatalogCache, image_fingerprint
+    from utils.extract_scheduler import ExtractionJob, ExtractionScheduler, unique_path
+    from utils.radix50 import ODS1_CHARSET, RADIX50_LIMIT, decode_table
+    from utils.log_setup import configure_logging, get_logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Recovery diagnostics go through logging (shown with -v) instead of stdout
+logger = get_logger("ods1")
+
 class Files11Exception(Exception):
     """Exception for Files-11 specific errors."""
     pass
@@ -62,26 +90,54 @@ class FileHeader:
         if self.retrieval_pointers is None:
             self.retrieval_pointers = []
 
+class DirectoryRecord(NamedTuple):
+    """One 16-byte entry of a Files-11 directory file."""
+    file_number: int
+    file_sequence: int
+    relative_volume: int
+    filename: str
+    filetype: str
+    version: int
+
+
+@dataclass
+class DirectoryIndex:
+    """Volume hierarchy read from the MFD and UFD contents, keyed by file number."""
+    directories: Dict[int, str]                 # Directory file number -> output path
+    parents: Dict[int, str]                     # File number -> path of its directory ("" for the MFD)
+    names: Dict[Tuple[str, str, str], Dict[int, int]]   # (directory, name, type) -> version -> file number
+    uics: Dict[str, str]                        # UFD name ("001054") -> directory path
+    headers: Dict[int, FileHeader]              # File number -> header
+
+
+# Directory entry: file ID (number, sequence, RVN), name (3 RADIX-50 words), type, version
+DIRECTORY_RECORD = struct.Struct('<6HHh')
+# File specification such as [1,54]RSX11.SYS;1
+FILE_SPEC = re.compile(r'^\[(\d+),(\d+)\]([^.;]*)(?:\.([^;]*))?(?:;(\d+))?$')
+
+# File header layout, in 16-bit words
+HEADER_WORDS = 256
+HEADER_AREA_WORDS = 23          # Fixed header area; the ident area starts at or after it
+MAP_AREA_WORDS = 5              # Fixed part of the map area, before the retrieval pointers
+# Fixed part of the map area: M.ESQN, M.ERVN, M.EFNU, M.EFSQ, M.CTSZ, M.LBSZ, M.USE, M.MAX
+MAP_AREA = struct.Struct('<BBHHBBBB')
+CHECKSUM_WORD = 255             # H.CKSM: sum of words 0-254
+STRUCTURE_LEVEL = 0x0101
+SCAN_BATCH_BLOCKS = 4096        # Blocks checked per pass of the header pre-filter
+
+
 class Radix50:
     """RADIX-50 encoding/decoding utilities."""
     
     # Standard RADIX-50 character set as used in Files-11
-    CHARSET = " ABCDEFGHIJKLMNOPQRSTUVWXYZ$._0123456789"
+    CHARSET = ODS1_CHARSET
     
     @classmethod
     def decode_word(cls, word: int) -> str:
         """Decode a single 16-bit RADIX-50 word to 3 characters."""
-        if word > 0o174777:  # Beyond valid range
+        if word >= RADIX50_LIMIT:  # Beyond valid range
             return "???"
-            
-        result = ""
-        # Extract 3 characters from word (base 40)
-        for i in range(3):
-            char_index = word % 40
-            word //= 40
-            result = cls.CHARSET[char_index] + result
-            
-        return result
+        return decode_table(cls.CHARSET)[word]
     
     @classmethod
     def decode_filename(cls, word1: int, word2: int, word3: int) -> str:
@@ -99,9 +155,25 @@ class ODS1Extractor:
     
     BLOCK_SIZE = 512
     HOME_BLOCK_LBN = 1
+    INDEX_FILE_NUMBER = 1           # INDEXF.SYS
+    MFD_FILE_NUMBER = 4             # 000000.DIR, the master file directory
+    CONTIGUOUS_HEADERS = 16         # Headers of files 1-16 follow the index bitmap directly
+    HEADER_CACHE_VERSION = 3        # Bump when header parsing changes, to invalidate cached tables
     
-    def __init__(self, disk_image_path: str):
+    def __init__(self, disk_image_path: str, cache: bool = False, recover: bool = False):
+        """
+        Args:
+            disk_image_path: ODS-1 disk image
+            cache: Keep the header table in the on-disk catalog cache, so
+                separate runs (list, then extract) scan the index only once
+            recover: Recovery mode for damaged volumes: headers missing from
+                the index file bitmap are searched for over the whole disk, and
+                files without a usable map are located by the contiguous
+                allocation heuristics (speculative reads)
+        """
         self.disk_path = disk_image_path
+        self.cache = cache
+        self.recover = recover
         self.volume_name = ""
         self.volume_structure_level = 0
         self.index_file_bitmap_size = 0
@@ -117,26 +189,38 @@ class ODS1Extractor:
         self.default_file_extend = 0
         self.volume_creation_date = ""
         
-        # Calculate disk size
-        with open(disk_image_path, 'rb') as f:
-            f.seek(0, 2)
-            self.disk_size = f.tell()
-            self.total_blocks = self.disk_size // self.BLOCK_SIZE
+        # Map the image once; blocks are served as views into the mapping
+        self.device = BlockDevice(disk_image_path, self.BLOCK_SIZE)
+        self.disk_size = self.device.size
+        self.total_blocks = self.device.block_count
+        
+        # Per-instance memos: home block validity, index file map, header table
+        # (extension headers included), directory tree
+        self._home_valid: Optional[bool] = None
+        self._index_map: Optional[Tuple[int, List[Tuple[int, int]], List[int]]] = None
+        self._headers: Optional[List[FileHeader]] = None
+        self._by_number: Optional[Dict[int, FileHeader]] = None
+        self._tree: Optional[Tuple[Dict[int, str], List[FileHeader]]] = None
+        self._index: Optional[DirectoryIndex] = None
     
-    def read_block(self, lbn: int) -> bytes:
+    def close(self):
+        """Release the memory-mapped disk image."""
+        self.device.close()
+    
+    def read_block(self, lbn: int) -> memoryview:
         """Read a logical block from the disk image."""
         if lbn < 0 or lbn >= self.total_blocks:
             raise Files11Exception(f"Invalid LBN {lbn} (disk has {self.total_blocks} blocks)")
             
-        with open(self.disk_path, 'rb') as f:
-            f.seek(lbn * self.BLOCK_SIZE)
-            data = f.read(self.BLOCK_SIZE)
-            if len(data) != self.BLOCK_SIZE:
-                raise Files11Exception(f"Could not read complete block {lbn}")
-            return data
+        return self.device.read_block(lbn)
     
     def parse_home_block(self) -> bool:
-        """Parse the home block (LBN 1) according to Files-11 spec."""
+        """Parse the home block (LBN 1) according to Files-11 spec (once per instance)."""
+        if self._home_valid is None:
+            self._home_valid = self._read_home_block()
+        return self._home_valid
+    
+    def _read_home_block(self) -> bool:
         try:
             data = self.read_block(self.HOME_BLOCK_LBN)
             
@@ -154,7 +238,7 @@ class ODS1Extractor:
             self.volume_structure_level = struct.unpack('<H', data[12:14])[0]
             
             # Volume name (12 bytes, null-padded)
-            vol_name_bytes = data[14:26]
+            vol_name_bytes = bytes(data[14:26])
             self.volume_name = vol_name_bytes.rstrip(b'\x00').decode('ascii', errors='ignore')
             
             self.volume_owner_uic = struct.unpack('<L', data[30:34])[0]
@@ -167,7 +251,7 @@ class ODS1Extractor:
             
             # Volume creation date (14 bytes: "DDMMMYYHHMMSS")
             if len(data) >= 74:
-                vol_date_bytes = data[60:74]
+                vol_date_bytes = bytes(data[60:74])
                 self.volume_creation_date = vol_date_bytes.rstrip(b'\x00').decode('ascii', errors='ignore')
             
             # Validate home block
@@ -182,7 +266,8 @@ class ODS1Extractor:
                 
             # Check structure level (should be 0x0101 for ODS-1)
             if self.volume_structure_level != 0x0101:
-                print(f"Warning: Invalid ODS-1 structure level 0x{self.volume_structure_level:04x} (expected 0x0101)")
+                print(f"Warning: Invalid ODS-1 structure level 0x{self.volume_structure_level:04x} (expected 0x0101)",
+                      file=sys.stderr)
                 return False  # Reject if structure level is not ODS-1
                 
             return True
@@ -236,14 +321,9 @@ class ODS1Extractor:
             if ident_offset > 0 and ident_offset * 2 + 46 <= len(data):
                 ident_start = ident_offset * 2
                 
-                # File name (3 RADIX-50 words = 9 characters)
-                name_word1 = struct.unpack('<H', data[ident_start:ident_start + 2])[0]
-                name_word2 = struct.unpack('<H', data[ident_start + 2:ident_start + 4])[0]
-                name_word3 = struct.unpack('<H', data[ident_start + 4:ident_start + 6])[0]
+                # File name (3 RADIX-50 words = 9 characters) and type (1 word = 3 characters)
+                name_word1, name_word2, name_word3, type_word = struct.unpack_from('<4H', data, ident_start)
                 header.filename = Radix50.decode_filename(name_word1, name_word2, name_word3)
-                
-                # File type (1 RADIX-50 word = 3 characters)
-                type_word = struct.unpack('<H', data[ident_start + 6:ident_start + 8])[0]
                 header.filetype = Radix50.decode_filetype(type_word)
                 
                 # Version number
@@ -253,71 +333,33 @@ class ODS1Extractor:
                 header.revision_number = struct.unpack('<H', data[ident_start + 10:ident_start + 12])[0]
                 
                 # Dates and times (7-byte ASCII strings)
-                header.revision_date = data[ident_start + 12:ident_start + 19].decode('ascii', errors='ignore').rstrip('\x00')
-                header.revision_time = data[ident_start + 19:ident_start + 25].decode('ascii', errors='ignore').rstrip('\x00')
-                header.creation_date = data[ident_start + 25:ident_start + 32].decode('ascii', errors='ignore').rstrip('\x00')
-                header.creation_time = data[ident_start + 32:ident_start + 38].decode('ascii', errors='ignore').rstrip('\x00')
-                header.expiration_date = data[ident_start + 38:ident_start + 45].decode('ascii', errors='ignore').rstrip('\x00')
+                header.revision_date = bytes(data[ident_start + 12:ident_start + 19]).decode('ascii', errors='ignore').rstrip('\x00')
+                header.revision_time = bytes(data[ident_start + 19:ident_start + 25]).decode('ascii', errors='ignore').rstrip('\x00')
+                header.creation_date = bytes(data[ident_start + 25:ident_start + 32]).decode('ascii', errors='ignore').rstrip('\x00')
+                header.creation_time = bytes(data[ident_start + 32:ident_start + 38]).decode('ascii', errors='ignore').rstrip('\x00')
+                header.expiration_date = bytes(data[ident_start + 38:ident_start + 45]).decode('ascii', errors='ignore').rstrip('\x00')
             
-            # File Map Area (offset specified by H.MPOF, based on SIMH ODS-1 implementation)
-            if map_offset > 0 and map_offset * 2 + 13 <= len(data):
+            # File Map Area (offset specified by H.MPOF)
+            if map_offset > 0 and map_offset * 2 + MAP_AREA.size <= len(data):
                 map_start = map_offset * 2
                 
-                # Map area structure based on SIMH ODS1_Retreval:
-                # Extension info (8 bytes): segnum, rvn, filnum, filseq
-                # Format info (2 bytes): countsize, lbnsize  
-                # Usage info (2 bytes): inuse, avail
-                # Retrieval pointers follow immediately after
-                
-                header.extension_segment = struct.unpack('<H', data[map_start:map_start + 2])[0]
-                header.extension_relative_volume = struct.unpack('<H', data[map_start + 2:map_start + 4])[0]
-                header.extension_file_number = struct.unpack('<H', data[map_start + 4:map_start + 6])[0]
-                header.extension_file_sequence = struct.unpack('<H', data[map_start + 6:map_start + 8])[0]
-                
-                # Extract count_size and lbn_size as separate bytes (SIMH approach)
-                # Based on debugging, lbn_size=204 suggests we're reading wrong offset
-                # According to putr.asm, these should be in M.CTSZ and M.LBSZ
-                # Let's try reading from the correct SIMH ODS-1 structure
-                
-                # In SIMH ODS1_Retreval structure:
-                # M.CTSZ is at offset +8 from start of map area
-                # M.LBSZ is at offset +9 from start of map area  
-                # But according to debug, these seem to be packed differently
-                
-                # Try reading from different offset - debug shows lbn_size=204 is wrong
-                count_size_offset = map_start + 8
-                lbn_size_offset = map_start + 9
-                
-                if count_size_offset < len(data) and lbn_size_offset < len(data):
-                    header.count_size = data[count_size_offset]
-                    header.lbn_size = data[lbn_size_offset]
-                else:
-                    # Fallback to default values if we can't read them
-                    header.count_size = 1
-                    header.lbn_size = 3
-                
-                # Map words in use and available
-                header.map_words_used = data[map_start + 10] if map_start + 10 < len(data) else 0
-                header.map_words_available = data[map_start + 11] if map_start + 11 < len(data) else 0
-                
-                # Debug info for first few files (disabled in production)
-                # if file_number <= 5:
-                #     print(f"  DEBUG File {file_number}: map_offset={map_offset}, count_size={header.count_size}, lbn_size={header.lbn_size}, words_used={header.map_words_used}")
+                # M.ESQN, M.ERVN (bytes), M.EFNU, M.EFSQ (words): extension segment,
+                # relative volume and file ID of the next header of this file;
+                # M.CTSZ, M.LBSZ: pointer format; M.USE, M.MAX: map words in use
+                # and available. Retrieval pointers (M.RTRV) follow.
+                (header.extension_segment, header.extension_relative_volume,
+                 header.extension_file_number, header.extension_file_sequence,
+                 header.count_size, header.lbn_size,
+                 header.map_words_used, header.map_words_available) = MAP_AREA.unpack_from(data, map_start)
                 
-                # Parse retrieval pointers starting at offset 12 (after the 12-byte header)
-                # This matches SIMH's ODS1_Retreval structure where pointers start after the header
                 header.retrieval_pointers = self.parse_retrieval_pointers(
-                    data, map_start + 12, header.count_size, header.lbn_size, header.map_words_used
+                    data, map_start + MAP_AREA.size, header.count_size, header.lbn_size, header.map_words_used
                 )
-                
-                # Debug specific problematic files (disabled in production)
-                # if header.filename in ['001002', '001020', '001024', '001034', '001054', '002054', '003054', '011010', '011024', '011034', '045010', 'USER', '200200']:
-                #     print(f"    DEBUG {header.filename}: Got {len(header.retrieval_pointers)} pointers: {header.retrieval_pointers}")
             
             return header
             
         except Exception as e:
-            print(f"Error parsing file header at LBN {lbn}: {e}")
+            logger.warning("Error parsing file header at LBN %s: %s", lbn, e)
             return None
     
     def parse_retrieval_pointers(self, data: bytes, start: int, count_size: int, lbn_size: int, words_used: int) -> List[Tuple[int, int]]:
@@ -328,7 +370,7 @@ class ODS1Extractor:
             return pointers
             
         # Calculate end of retrieval pointer area
-        # From putr.asm: M.USE words * 2 + 12 (M.RTRV offset)
+        # From putr.asm: M.USE words * 2 past M.RTRV
         end_offset = start + (words_used * 2)
         
         # Special check: if ALL retrieval pointer data is zeros, this is an empty file
@@ -378,71 +420,575 @@ class ODS1Extractor:
                     
                 else:
                     # Unknown format
-                    print(f"Unknown retrieval pointer format: count_size={count_size}, lbn_size={lbn_size}")
+                    logger.warning("Unknown retrieval pointer format: count_size=%s, lbn_size=%s", count_size, lbn_size)
                     break
                 
-                # Validate and add pointer
-                if count > 0 and lbn > 0:
+                # Validate and add pointer (the area is bounded by M.USE, so no cap is
+                # needed). The count field holds the block count minus one and
+                # INDEXF.SYS maps the boot block, so only an all-zero pointer ends the map
+                if lbn > 0 or count > 0:
                     pointers.append((lbn, count))
                 else:
                     # End of valid pointers
                     break
-                
-                # Safety check
-                if len(pointers) > 100:
-                    break
                     
         except Exception as e:
-            print(f"Error parsing retrieval pointers: {e}")
+            logger.warning("Error parsing retrieval pointers: %s", e)
             
         return pointers
     
-    def scan_for_file_headers(self) -> List[FileHeader]:
-        """Scan the disk for valid file headers."""
-        headers = []
+    def scan_for_file_headers(self, verbose: bool = True) -> List[FileHeader]:
+        """
+        Find the valid file headers of the volume.
+        
+        Headers are enumerated through INDEXF.SYS: only the file numbers set
+        in the index file bitmap are read, at the LBNs given by the index
+        file's own retrieval pointers. Volumes whose index file cannot be
+        used fall back to scanning the block ranges where headers usually are.
+        In recovery mode the whole disk is scanned as well, and headers the
+        bitmap does not list are added.
+        
+        Extension headers are kept for extent_map() but not returned: they
+        are further segments of another file's map, not files.
+        """
+        if self._headers is None:
+            self._headers = self._load_cached_headers()
+        if self._headers is None:
+            headers = self.enumerate_file_headers(verbose)
+            if headers is None:
+                headers = [] if self.recover else self._scan_header_ranges(verbose)
+            if self.recover:
+                known = {header.file_number for header in headers}
+                headers += [header for header in self.recover_file_headers(verbose)
+                            if header.file_number not in known]
+            self._headers = headers
+            self._store_cached_headers(headers)
+        elif verbose:
+            print(f"Using {len(self._headers)} cached file headers")
+        return [header for header in self._headers if not header.extension_segment]
+    
+    def directory_tree(self) -> Tuple[Dict[int, str], List[FileHeader]]:
+        """classify_headers() of the volume's headers, computed once per instance."""
+        if self._tree is None:
+            self._tree = self.classify_headers(self.scan_for_file_headers())
+        directories, files = self._tree
+        return dict(directories), list(files)
+    
+    def _header_cache_key(self) -> Optional[Tuple[CatalogCache, str]]:
+        if not self.cache:
+            return None
+        cache = CatalogCache()
+        if not cache.enabled:
+            return None
+        try:
+            suffix = "-ods1-recovered-headers" if self.recover else "-ods1-headers"
+            return cache, image_fingerprint(self.disk_path) + suffix
+        except OSError:
+            return None
+    
+    def _load_cached_headers(self) -> Optional[List[FileHeader]]:
+        """Header table from the on-disk cache, if enabled and current."""
+        key = self._header_cache_key()
+        if key is None:
+            return None
+        cache, fingerprint = key
+        record = cache.load(fingerprint)
+        if (record is None or record.get('fs_type') != "ods1-headers"
+                or record.get('version') != self.HEADER_CACHE_VERSION):
+            return None
+        try:
+            return [FileHeader(**dict(fields, retrieval_pointers=[tuple(pointer) for pointer
+                                                                  in fields['retrieval_pointers']]))
+                    for fields in record['entries']]
+        except (TypeError, KeyError):
+            return None
+    
+    def _store_cached_headers(self, headers: List[FileHeader]) -> None:
+        key = self._header_cache_key()
+        if key is not None:
+            cache, fingerprint = key
+            cache.store(fingerprint, "ods1-headers", self.HEADER_CACHE_VERSION,
+                        [asdict(header) for header in headers])
+    
+    def iter_allocated_file_numbers(self) -> Iterator[int]:
+        """File numbers marked in use in the index file bitmap, ascending."""
+        bitmap = self.device.read_blocks(self.index_file_bitmap_lbn, self.index_file_bitmap_size)
+        limit = self.max_files or len(bitmap) * 8
+        for byte_index, byte in enumerate(bitmap):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte >> bit & 1:
+                    file_number = byte_index * 8 + bit + 1
+                    if file_number > limit:
+                        return
+                    yield file_number
+    
+    def header_lbn(self, file_number: int, index_runs: List[Tuple[int, int]],
+                   run_starts: List[int]) -> Optional[int]:
+        """
+        LBN of a file header, from the INDEXF.SYS retrieval runs.
+        
+        The index file holds the boot and home blocks (VBN 1-2), the index
+        file bitmap and then one header per file number.
+        """
+        index = self.index_file_bitmap_size + 1 + file_number   # 0-based VBN
+        position = bisect_right(run_starts, index) - 1
+        if position >= 0:
+            lbn, count = index_runs[position]
+            if index - run_starts[position] < count:
+                return lbn + index - run_starts[position]
+        return None
+    
+    def _index_file_map(self) -> Optional[Tuple[int, List[Tuple[int, int]], List[int]]]:
+        """
+        (LBN after the bitmap, INDEXF.SYS runs, VBN where each run starts),
+        read once per instance; None when the home block or index file is unusable.
+        """
+        if self._index_map is None:
+            if not self.index_file_bitmap_lbn:
+                try:
+                    if not self.parse_home_block():
+                        return None
+                except Files11Exception:
+                    return None
+            bitmap_end = self.index_file_bitmap_lbn + self.index_file_bitmap_size
+            if bitmap_end + 1 > self.total_blocks:
+                return None
+            
+            # INDEXF.SYS maps itself: its header is the first one after the bitmap
+            index_header = self.parse_file_header(self.read_block(bitmap_end), bitmap_end)
+            if index_header is None or index_header.file_number != self.INDEX_FILE_NUMBER:
+                return None
+            try:
+                index_runs = self._retrieval_runs(index_header)
+            except Files11Exception:
+                index_runs = []
+            run_starts = []
+            position = 0
+            for _, count in index_runs:
+                run_starts.append(position)
+                position += count
+            self._index_map = (bitmap_end, index_runs, run_starts)
+        return self._index_map
+    
+    def _locate_header(self, file_number: int) -> Optional[Tuple[int, FileHeader]]:
+        """(LBN, header) of a file number, read through the index file map."""
+        index_map = self._index_file_map()
+        if index_map is None:
+            return None
+        bitmap_end, index_runs, run_starts = index_map
+        candidates = [self.header_lbn(file_number, index_runs, run_starts)]
+        if file_number <= self.CONTIGUOUS_HEADERS:
+            candidates.append(bitmap_end + file_number - 1)
+        for lbn in candidates:
+            if lbn is None or lbn >= self.total_blocks:
+                continue
+            header = self.parse_file_header(self.read_block(lbn), lbn)
+            if header is not None and header.file_number == file_number:
+                return lbn, header
+        return None
+    
+    def enumerate_file_headers(self, verbose: bool = False) -> Optional[List[FileHeader]]:
+        """
+        Read the headers of the files allocated in the index file bitmap.
+        
+        Returns:
+            Headers in file number order, or None when the home block or
+            the index file is unusable (the caller then scans instead)
+        """
+        if self._index_file_map() is None:
+            return None
         
-        print(f"Scanning {self.total_blocks} blocks for file headers...")
+        if verbose:
+            print(f"Reading file headers through INDEXF.SYS (bitmap at LBN {self.index_file_bitmap_lbn})...")
         
-        # Focus on likely areas for file headers
-        scan_ranges = [
-            (2, min(100, self.total_blocks)),      # Just after home block
-            (self.index_file_bitmap_lbn, min(self.index_file_bitmap_lbn + 50, self.total_blocks)) if self.index_file_bitmap_lbn > 0 else (0, 0),
-        ]
+        headers = []
+        for file_number in self.iter_allocated_file_numbers():
+            located = self._locate_header(file_number)
+            if located is None:
+                continue
+            lbn, header = located
+            if header.filename and header.filename != "UNKNOWN":
+                headers.append(header)
+                if verbose:
+                    print(f"  Found: {header.filename}.{header.filetype};{header.version} "
+                          f"(File {header.file_number}.{header.file_sequence}) @ LBN {lbn}")
         
-        # Add more scan ranges for larger disks
-        if self.total_blocks > 1000:
-            scan_ranges.extend([
-                (100, min(500, self.total_blocks)),
-                (self.total_blocks // 4, min(self.total_blocks // 4 + 100, self.total_blocks)),
-            ])
+        if not headers:
+            return None
+        if verbose:
+            print(f"Found {len(headers)} valid file headers")
+        return headers
+    
+    def header_candidates(self, start: int, end: int, checksum: bool = True) -> List[int]:
+        """
+        LBNs in [start, end) that can hold a file header, without parsing them.
         
-        scanned_count = 0
-        for start, end in scan_ranges:
-            if start == end:
+        Blocks are checked in batches straight from the mapped image: structure
+        level 1.1, a non-zero file number, ident and map area offsets inside the
+        block and in order, and (with checksum) H.CKSM equal to the sum of the
+        first 255 words. Vectorised through NumPy when it is installed.
+        """
+        end = min(end, len(self.device) // self.BLOCK_SIZE)
+        candidates = []
+        for batch in range(max(start, 0), end, SCAN_BATCH_BLOCKS):
+            count = min(SCAN_BATCH_BLOCKS, end - batch)
+            data = self.device.read_blocks(batch, count)
+            if np is not None:
+                words = np.frombuffer(data, dtype='<u2').reshape(count, HEADER_WORDS)
+                ident, map_area = words[:, 0] & 0xFF, words[:, 0] >> 8
+                ok = ((words[:, 3] == STRUCTURE_LEVEL) & (words[:, 1] != 0) &
+                      (ident >= HEADER_AREA_WORDS) & (map_area >= ident) &
+                      (map_area + MAP_AREA_WORDS <= CHECKSUM_WORD))
+                if checksum:
+                    sums = words[:, :CHECKSUM_WORD].sum(axis=1, dtype=np.uint32) & 0xFFFF
+                    ok &= sums == words[:, CHECKSUM_WORD]
+                candidates.extend((np.flatnonzero(ok) + batch).tolist())
                 continue
+            words = array('H')
+            words.frombytes(data)
+            if sys.byteorder == 'big':
+                words.byteswap()
+            # Structure level first: it rejects nearly every data block
+            for index, level in enumerate(words[3::HEADER_WORDS]):
+                if level != STRUCTURE_LEVEL:
+                    continue
+                base = index * HEADER_WORDS
+                ident, map_area = words[base] & 0xFF, words[base] >> 8
+                if (words[base + 1] == 0 or ident < HEADER_AREA_WORDS or map_area < ident
+                        or map_area + MAP_AREA_WORDS > CHECKSUM_WORD):
+                    continue
+                if checksum and (sum(words[base:base + CHECKSUM_WORD]) & 0xFFFF
+                                 != words[base + CHECKSUM_WORD]):
+                    continue
+                candidates.append(batch + index)
+        return candidates
+    
+    def _scan_header_ranges(self, verbose: bool = True,
+                            scan_ranges: Optional[List[Tuple[int, int]]] = None) -> List[FileHeader]:
+        """
+        Scan block ranges for file headers (fallback, and full-disk recovery).
+        
+        Only the blocks passing header_candidates() are parsed. If no block has
+        a valid checksum the ranges are checked again without it, so damaged
+        headers are still found.
+        """
+        headers = []
+        
+        if verbose:
+            print(f"Scanning {self.total_blocks} blocks for file headers...")
+        
+        if scan_ranges is None:
+            # Focus on likely areas for file headers
+            scan_ranges = [
+                (2, min(100, self.total_blocks)),      # Just after home block
+                (self.index_file_bitmap_lbn, min(self.index_file_bitmap_lbn + 50, self.total_blocks)) if self.index_file_bitmap_lbn > 0 else (0, 0),
+            ]
+            
+            # Add more scan ranges for larger disks
+            if self.total_blocks > 1000:
+                scan_ranges.extend([
+                    (100, min(500, self.total_blocks)),
+                    (self.total_blocks // 4, min(self.total_blocks // 4 + 100, self.total_blocks)),
+                ])
+        
+        # Ranges may overlap on small disks: each block is parsed once, in range order
+        candidates = list(dict.fromkeys(lbn for start, end in scan_ranges
+                                        for lbn in self.header_candidates(start, end)))
+        if not candidates:
+            candidates = list(dict.fromkeys(lbn for start, end in scan_ranges
+                                            for lbn in self.header_candidates(start, end, checksum=False)))
+        
+        for lbn in candidates:
+            try:
+                data = self.read_block(lbn)
+                header = self.parse_file_header(data, lbn)
                 
-            for lbn in range(start, end):
-                try:
-                    data = self.read_block(lbn)
-                    header = self.parse_file_header(data, lbn)
-                    
-                    if header and header.filename and header.filename != "UNKNOWN":
-                        headers.append(header)
+                if header and header.filename and header.filename != "UNKNOWN":
+                    headers.append(header)
+                    if verbose:
                         print(f"  Found: {header.filename}.{header.filetype};{header.version} "
                               f"(File {header.file_number}.{header.file_sequence}) @ LBN {lbn}")
                     
-                    scanned_count += 1
-                    if scanned_count % 100 == 0:
-                        print(f"  Scanned {scanned_count} blocks, found {len(headers)} files...")
-                        
-                except Exception:
-                    continue
+            except Exception:
+                continue
         
-        print(f"Found {len(headers)} valid file headers")
+        if verbose:
+            print(f"Found {len(headers)} valid file headers")
         return headers
     
+    def recover_file_headers(self, verbose: bool = True) -> List[FileHeader]:
+        """Scan the whole volume for file headers, for images whose index file is damaged."""
+        return self._scan_header_ranges(verbose, [(0, self.total_blocks)])
+    
+    def parse_directory_records(self, data: bytes) -> List[DirectoryRecord]:
+        """Decode the in-use entries of a directory file's contents."""
+        records = []
+        usable = len(data) - len(data) % DIRECTORY_RECORD.size
+        for number, sequence, rvn, word1, word2, word3, type_word, version in \
+                DIRECTORY_RECORD.iter_unpack(memoryview(data)[:usable]):
+            if number == 0:
+                continue
+            records.append(DirectoryRecord(number, sequence, rvn,
+                                           Radix50.decode_filename(word1, word2, word3),
+                                           Radix50.decode_filetype(type_word), version))
+        return records
+    
+    def read_directory(self, header: FileHeader) -> List[DirectoryRecord]:
+        """Entries of a directory file, read through its extent map."""
+        try:
+            runs = self.extent_map(header)
+        except Files11Exception:
+            return []
+        if not runs:
+            return []
+        return self.parse_directory_records(self.device.read_runs(runs, self._file_size_bytes(header)))
+    
+    def directory_index(self) -> DirectoryIndex:
+        """
+        Hierarchy of the volume from the directory files (built once per instance).
+        
+        The MFD is read first: its DIR entries are the UFDs, and every other
+        entry (the system files of [0,0]) sits at the root. Each UFD is then
+        read once and its entries are indexed by file number and by name,
+        so placing a file or resolving a file specification is a dictionary
+        lookup. Entries whose sequence number does not match the header are
+        stale and ignored. An empty index means the MFD could not be read.
+        """
+        if self._index is not None:
+            return self._index
+        headers = {header.file_number: header for header in self.scan_for_file_headers(verbose=False)}
+        index = DirectoryIndex({}, {}, {}, {"000000": ""}, headers)
+        mfd = headers.get(self.MFD_FILE_NUMBER)
+        pending = [(mfd, "")] if mfd is not None else []
+        while pending:
+            directory, path = pending.pop(0)
+            for record in self.read_directory(directory):
+                header = headers.get(record.file_number)
+                if header is None or header.file_sequence != record.file_sequence:
+                    continue
+                key = (path, record.filename, record.filetype)
+                index.names.setdefault(key, {})[record.version] = record.file_number
+                if record.file_number == directory.file_number:
+                    continue
+                if record.filetype == 'DIR' and record.file_number not in index.directories:
+                    child = f"{path}/{record.filename}" if path else record.filename
+                    index.directories[record.file_number] = child
+                    index.uics.setdefault(record.filename, child)
+                    pending.append((header, child))
+                else:
+                    index.parents.setdefault(record.file_number, path)
+        if index.parents or index.directories:
+            # The MFD keeps its own folder, as in the name-based layout
+            index.directories.setdefault(self.MFD_FILE_NUMBER, mfd.filename)
+        self._index = index
+        return index
+    
+    def lookup(self, spec: str) -> Optional[FileHeader]:
+        """
+        Header of a file specification such as ``[1,54]RSX11.SYS;1``.
+        
+        Without a version the highest one is returned; [0,0] is the MFD.
+        """
+        match = FILE_SPEC.match(spec.strip().upper())
+        if not match:
+            return None
+        group, member, name, filetype, version = match.groups()
+        index = self.directory_index()
+        directory = index.uics.get(f"{int(group):03d}{int(member):03d}")
+        if directory is None:
+            return None
+        versions = index.names.get((directory, name, filetype or ""))
+        if not versions:
+            return None
+        number = versions.get(int(version)) if version else versions[max(versions)]
+        return index.headers.get(number)
+    
+    def is_directory_header(self, header: FileHeader) -> bool:
+        """Check if a header describes a directory file."""
+        index = self.directory_index()
+        if index.directories:
+            return header.file_number in index.directories
+        return (
+            header.filetype.upper() == 'DIR' or 
+            header.filename.endswith('.DIR') or
+            'DIR' in header.filename.upper() or
+            # RSX-11 user directories often have numeric names like 001001, 001002, etc.
+            (len(header.filename) == 6 and header.filename.isdigit()) or
+            # Some directories might be named like 000000, 240001, etc.
+            (len(header.filename) >= 5 and header.filename.isdigit())
+        )
+    
+    def classify_headers(self, headers: List[FileHeader]) -> Tuple[Dict[int, str], List[FileHeader]]:
+        """Split headers into directories (file number -> name) and regular files."""
+        directories = {}
+        files = []
+        
+        index = self.directory_index()
+        for header in headers:
+            if index.directories and header.file_number in index.directories:
+                directories[header.file_number] = index.directories[header.file_number]
+            elif self.is_directory_header(header):
+                dir_name = header.filename.strip().replace('.DIR', '')
+                if not dir_name:
+                    dir_name = f"DIR_{header.file_number}"
+                directories[header.file_number] = dir_name
+            else:
+                files.append(header)
+                
+        return directories, files
+    
+    def directory_for(self, header: FileHeader, directories: Dict[int, str]) -> Optional[str]:
+        """Directory a file belongs to (None for the root)."""
+        index = self.directory_index()
+        if index.directories:
+            # Placement from the directory files themselves
+            return index.parents.get(header.file_number) or None
+        
+        # No readable MFD: files can be associated with directories through UIC or naming patterns
+        filename = header.filename.strip() or f"FILE_{header.file_number}"
+        for dir_num, dir_name in directories.items():
+            if (filename.startswith(dir_name.upper()) or 
+                header.owner_uic == dir_num or
+                filename.startswith(f"{dir_num:03d}")):
+                return dir_name
+        return None
+    
+    def file_names(self, header: FileHeader) -> Tuple[str, str]:
+        """Display name (with version) and filesystem-safe name (without version)."""
+        filename = header.filename.strip()
+        filetype = header.filetype.strip()
+        version = header.version
+        
+        if not filename:
+            filename = f"FILE_{header.file_number}"
+        
+        # Build filename WITHOUT version for extraction
+        if filetype:
+            display_name = f"{filename}.{filetype}"
+            extraction_name = f"{filename}.{filetype}"
+        else:
+            display_name = filename
+            extraction_name = filename
+        if version > 0:
+            display_name += f";{version}"  # For display only
+        
+        # Make filename safe for filesystem
+        safe_name = "".join(c for c in extraction_name if c.isalnum() or c in "._-").strip()
+        if not safe_name:
+            safe_name = f"file_{header.file_number}_{header.file_sequence}.bin"
+            
+        return display_name, safe_name
+    
+    def _retrieval_runs(self, header: FileHeader) -> List[Tuple[int, int]]:
+        """Coalesced (lbn, block count) runs described by the retrieval pointers."""
+        runs = []
+        for lbn, count in header.retrieval_pointers:
+            # Skip unused (all-zero) pointers
+            if lbn == 0 and count == 0:
+                continue
+                
+            # FSX Files11.cs line 82: for (Int32 i = 0; i <= ct; i++)
+            # This means we read count+1 blocks
+            if lbn + count >= self.total_blocks:
+                raise Files11Exception(f"Invalid LBN {lbn + count} (disk has {self.total_blocks} blocks)")
+            runs.append((lbn, count + 1))
+            
+        return coalesce_runs(runs)
+    
+    def _extension_header(self, number: int, sequence: int) -> Optional[FileHeader]:
+        """Extension header of a file, from the index file or else the scanned headers."""
+        located = self._locate_header(number)
+        if located is not None:
+            header = located[1]
+        else:
+            if self._by_number is None and self._headers is not None:
+                self._by_number = {header.file_number: header for header in self._headers}
+            header = (self._by_number or {}).get(number)
+        if header is None or (sequence and header.file_sequence != sequence):
+            return None
+        return header
+    
+    def extent_map(self, header: FileHeader) -> List[Tuple[int, int]]:
+        """
+        Complete (lbn, block count) map of a file, following its extension headers.
+        
+        Every segment of the chain is read once and adjacent runs across
+        segments are coalesced. Raises Files11Exception for pointers outside
+        the image, a missing extension header or a chain that loops.
+        """
+        runs = []
+        seen = set()
+        segment = header
+        while True:
+            seen.add(segment.file_number)
+            runs.extend(self._retrieval_runs(segment))
+            number = segment.extension_file_number
+            if not number:
+                break
+            if number in seen:
+                raise Files11Exception(f"Extension header chain of {header.filename} loops at file {number}")
+            segment = self._extension_header(number, segment.extension_file_sequence)
+            if segment is None:
+                raise Files11Exception(f"Missing extension header {number} of {header.filename}")
+        return coalesce_runs(runs)
+    
+    def _file_size_bytes(self, header: FileHeader) -> Optional[int]:
+        """Byte size from the end-of-file block and first free byte, if known."""
+        if header.end_of_file_block <= 0:
+            return None
+        size = (header.end_of_file_block - 1) * self.BLOCK_SIZE
+        return size + (header.first_free_byte if header.first_free_byte > 0 else self.BLOCK_SIZE)
+    
+    def iter_file_chunks(self, header: FileHeader, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Yield file data as chunks of at most chunk_size bytes.
+        
+        Files mapped by retrieval pointers are streamed straight from the disk
+        image. Files recovered by the contiguous-allocation heuristics are
+        read by extract_file_data() and sliced. Raises Files11Exception when
+        no data can be recovered.
+        """
+        if header.retrieval_pointers and header.retrieval_pointers != [(0, 0)]:
+            runs = self.extent_map(header)
+            if runs:
+                return self.device.iter_runs(runs, self._file_size_bytes(header), chunk_size)
+                
+        data = self.extract_file_data(header)
+        if data is None:
+            raise Files11Exception(f"No data recovered for {header.filename}")
+        view = memoryview(data)
+        return (view[i:i + chunk_size] for i in range(0, len(view), chunk_size))
+    
+    def plan_file_job(self, header: FileHeader, output_path: Path) -> ExtractionJob:
+        """
+        Build the extraction job for one file.
+        
+        Files mapped by retrieval pointers become a list of runs copied
+        straight from the disk image by the scheduler. Files recovered by the
+        contiguous-allocation heuristics are read here, on the calling thread,
+        and carried as data. Raises Files11Exception when no data can be
+        recovered.
+        """
+        if header.retrieval_pointers and header.retrieval_pointers != [(0, 0)]:
+            runs = self.extent_map(header)
+            if runs:
+                return ExtractionJob(output_path, runs, self._file_size_bytes(header), handle=header)
+                
+        data = self.extract_file_data(header)
+        if data is None:
+            raise Files11Exception(f"No data recovered for {header.filename}")
+        return ExtractionJob(output_path, data=bytes(data), handle=header)
+    
     def extract_file_data(self, header: FileHeader) -> bytes:
-        """Extract file data using retrieval pointers or contiguous allocation."""
+        """
+        Extract file data using the extent map, or in recovery mode contiguous allocation.
+        
+        The contiguous-allocation heuristics read blocks at guessed LBNs, so
+        outside recovery mode files without retrieval pointers are treated as
+        empty (no end of file) or unrecoverable.
+        """
         data = b""
         
         # Method 1: Use retrieval pointers if available
@@ -452,38 +998,34 @@ class ODS1Extractor:
                 return b""
                 
             try:
-                for lbn, count in header.retrieval_pointers:
-                    # Skip invalid pointers
-                    if lbn == 0 or count == 0:
-                        continue
-                        
-                    # FSX Files11.cs line 82: for (Int32 i = 0; i <= ct; i++)
-                    # This means we read count+1 blocks
-                    for i in range(count + 1):
-                        block_data = self.read_block(lbn + i)
-                        data += block_data
+                # Adjacent pointers, extension headers included, are merged
+                # and each run is copied once into a preallocated buffer
+                data = self.device.read_runs(self.extent_map(header))
                         
             except Exception as e:
-                print(f"Error reading retrieval pointers for {header.filename}: {e}")
+                logger.debug("Error reading retrieval pointers for %s: %s", header.filename, e)
                 return None
         
         # Method 2: Handle files that appear empty but might be system files or task images
         elif header.end_of_file_block == 0 and header.first_free_byte == 0:
+            if not self.recover:
+                return b""
+            
             # For TSK files, use RSX-11M's special contiguous allocation scheme
             # RSX-11M stores Task Images (TSK files) contiguously for fast loading
             # The location is encoded in F.HIBK (Highest VBN Allocated) field
             # According to Files11.cs specification and our analysis of RSX-11M behavior
             if header.filetype.upper() == 'TSK' and header.highest_vbn > 0:
-                print(f"  Attempting TSK extraction using highest_vbn for {header.filename}")
+                logger.debug("Attempting TSK extraction using highest_vbn for %s", header.filename)
                 try:
                     # Extract LBN from highest_vbn: RSX-11M uses format 0xXXY0000 where XX is LBN
                     # This is a documented but rarely implemented feature of RSX-11M task image storage
                     lbn_from_vbn = (header.highest_vbn >> 16) & 0xFF
                     
                     if lbn_from_vbn > 0 and lbn_from_vbn < self.total_blocks:
-                        print(f"    Trying LBN {lbn_from_vbn} derived from highest_vbn=0x{header.highest_vbn:08x}")
+                        logger.debug("Trying LBN %s derived from highest_vbn=0x%08x", lbn_from_vbn, header.highest_vbn)
                         
-                        test_data = b""
+                        test_data = bytearray()
                         empty_blocks_count = 0
                         
                         # Read up to 100 blocks from the calculated location
@@ -503,7 +1045,7 @@ class ODS1Extractor:
                                 test_data += block_data
                                 
                             except Exception as e:
-                                print(f"      Error reading block {lbn_from_vbn + i}: {e}")
+                                logger.debug("Error reading block %s: %s", lbn_from_vbn + i, e)
                                 break
                         
                         # Validate the data
@@ -511,15 +1053,15 @@ class ODS1Extractor:
                             non_zero_count = sum(1 for b in test_data if b != 0)
                             data_ratio = non_zero_count / len(test_data)
                             
-                            print(f"      Read {len(test_data)} bytes, {non_zero_count} non-zero ({data_ratio:.1%})")
+                            logger.debug("Read %s bytes, %s non-zero (%.1f%%)", len(test_data), non_zero_count, data_ratio * 100)
                             
                             # Accept if we have reasonable amount of data
                             if data_ratio >= 0.1 and len(test_data) >= 1024:  # At least 10% non-zero
-                                print(f"    ✅ Found TSK file {header.filename} at LBN {lbn_from_vbn}: {len(test_data)} bytes")
+                                logger.debug("Found TSK file %s at LBN %s: %s bytes", header.filename, lbn_from_vbn, len(test_data))
                                 return test_data
                             
                 except Exception as e:
-                    print(f"    Error in TSK VBN extraction for {header.filename}: {e}")
+                    logger.debug("Error in TSK VBN extraction for %s: %s", header.filename, e)
             
             # For system files and other task images, try contiguous extraction
             needs_extraction = (
@@ -530,14 +1072,14 @@ class ODS1Extractor:
             )
             
             if needs_extraction:
-                print(f"  Attempting contiguous extraction for {header.filetype.upper()} file {header.filename}")
+                logger.debug("Attempting contiguous extraction for %s file %s", header.filetype.upper(), header.filename)
                 try:
                     data = self.extract_contiguous_file(header)
                     if data and len(data) > 0:
-                        print(f"  ✅ Found data for {header.filename}: {len(data)} bytes")
+                        logger.debug("Found data for %s: %s bytes", header.filename, len(data))
                         return data
                 except Exception as e:
-                    print(f"  Failed to extract {header.filetype.upper()} file {header.filename}: {e}")
+                    logger.debug("Failed to extract %s file %s: %s", header.filetype.upper(), header.filename, e)
             
             # This is a legitimate empty file (common for unused directories)
             return b""
@@ -545,10 +1087,13 @@ class ODS1Extractor:
         # Method 3: Handle system files without retrieval pointers
         # These are often stored contiguously starting at specific locations
         elif header.map_words_used == 0:
+            if not self.recover:
+                logger.debug("%s has no retrieval pointers (recovery mode not enabled)", header.filename)
+                return None
             try:
                 data = self.extract_contiguous_file(header)
             except Exception as e:
-                print(f"Error extracting contiguous file {header.filename}: {e}")
+                logger.debug("Error extracting contiguous file %s: %s", header.filename, e)
                 return None
         
         # If no data was found and it's not an empty file, return None (error)
@@ -559,16 +1104,12 @@ class ODS1Extractor:
         if data and header.end_of_file_block > 0:
             try:
                 # Calculate actual file size in bytes
-                file_size_bytes = (header.end_of_file_block - 1) * self.BLOCK_SIZE
-                if header.first_free_byte > 0:
-                    file_size_bytes += header.first_free_byte
-                else:
-                    file_size_bytes += self.BLOCK_SIZE
+                file_size_bytes = self._file_size_bytes(header)
                     
                 if file_size_bytes < len(data):
                     data = data[:file_size_bytes]
             except Exception as e:
-                print(f"Error truncating file {header.filename}: {e}")
+                logger.debug("Error truncating file %s: %s", header.filename, e)
                     
         return data
     
@@ -582,15 +1123,11 @@ class ODS1Extractor:
                 start_lbn = header.file_number
                 expected_blocks = header.end_of_file_block
                 
-                print(f"  Trying contiguous at LBN {start_lbn} for {expected_blocks} blocks")
+                logger.debug("Trying contiguous at LBN %s for %s blocks", start_lbn, expected_blocks)
                 
-                # Read the expected blocks
-                for i in range(expected_blocks):
-                    try:
-                        block_data = self.read_block(start_lbn + i)
-                        data += block_data
-                    except:
-                        break
+                # Read the expected blocks (up to the end of the disk) as one run
+                available = max(0, min(expected_blocks, self.total_blocks - start_lbn))
+                data = self.device.read_runs([(start_lbn, available)])
                 
                 # Verify this looks like real data
                 if data:
@@ -603,13 +1140,13 @@ class ODS1Extractor:
                     
                     # If we have reasonable data amount, accept it
                     if non_zero_count > expected_size * 0.05:  # At least 5% non-zero
-                        print(f"  ✅ Found contiguous file at LBN {start_lbn}")
+                        logger.debug("Found contiguous file at LBN %s", start_lbn)
                         return data
                     else:
                         data = b""  # Reset for other strategies
                         
             except Exception as e:
-                print(f"  Failed contiguous strategy 1: {e}")
+                logger.debug("Failed contiguous strategy 1: %s", e)
                 data = b""
         
         # Strategy 1.5: Special handling for RSX11.SYS and other large system files
@@ -629,8 +1166,8 @@ class ODS1Extractor:
                     continue
                     
                 try:
-                    print(f"  Trying system file strategy at LBN {start_lbn}")
-                    test_data = b""
+                    logger.debug("Trying system file strategy at LBN %s", start_lbn)
+                    test_data = bytearray()
                     
                     # Read up to 50 blocks to find the file
                     for i in range(50):
@@ -649,16 +1186,16 @@ class ODS1Extractor:
                     if test_data:
                         non_zero_count = sum(1 for b in test_data if b != 0)
                         if non_zero_count > len(test_data) * 0.1:  # At least 10% non-zero
-                            print(f"  ✅ Found system file at LBN {start_lbn}")
+                            logger.debug("Found system file at LBN %s", start_lbn)
                             return test_data
                             
                 except Exception as e:
-                    print(f"  Failed system file strategy at LBN {start_lbn}: {e}")
+                    logger.debug("Failed system file strategy at LBN %s: %s", start_lbn, e)
                     continue
         
         # Strategy 2: Try multiple locations based on SIMH/RSX-11 patterns
         if not data and header.file_number <= 16:
-            print(f"  Trying multiple system file locations for {header.filename} (file #{header.file_number})")
+            logger.debug("Trying multiple system file locations for %s (file #%s)", header.filename, header.file_number)
             
             # Based on SIMH and RSX-11 documentation, system files can be stored in various patterns:
             potential_locations = []
@@ -735,8 +1272,8 @@ class ODS1Extractor:
                     continue
                     
                 try:
-                    print(f"    Trying LBN {start_lbn} for {header.filename}")
-                    test_data = b""
+                    logger.debug("Trying LBN %s for %s", start_lbn, header.filename)
+                    test_data = bytearray()
                     
                     # Read up to 50 blocks, but stop at reasonable boundaries
                     max_blocks = 100 if header.filetype.upper() in ['TSK', 'SAV'] else 50 if header.filename in ['CORIMG', 'RSX11'] else 20
@@ -758,7 +1295,7 @@ class ODS1Extractor:
                             test_data += block_data
                             
                         except Exception as e:
-                            print(f"      Error reading block {start_lbn + i}: {e}")
+                            logger.debug("Error reading block %s: %s", start_lbn + i, e)
                             break
                     
                     # Validate the data
@@ -766,7 +1303,7 @@ class ODS1Extractor:
                         non_zero_count = sum(1 for b in test_data if b != 0)
                         data_ratio = non_zero_count / len(test_data)
                         
-                        print(f"      Read {len(test_data)} bytes, {non_zero_count} non-zero ({data_ratio:.1%})")
+                        logger.debug("Read %s bytes, %s non-zero (%.1f%%)", len(test_data), non_zero_count, data_ratio * 100)
                         
                         # Accept if we have reasonable amount of data
                         # Different thresholds for different file types
@@ -777,17 +1314,17 @@ class ODS1Extractor:
                             min_ratio = 0.001  # Very low for these special files
                         
                         if data_ratio >= min_ratio and len(test_data) >= 512:
-                            print(f"    ✅ Found {header.filename} at LBN {start_lbn}: {len(test_data)} bytes")
+                            logger.debug("Found %s at LBN %s: %s bytes", header.filename, start_lbn, len(test_data))
                             return test_data
                         elif len(test_data) >= 512 and non_zero_count > 10:
                             # Accept even small amounts of data for system files
-                            print(f"    ✅ Found small {header.filename} at LBN {start_lbn}: {len(test_data)} bytes (low density)")
+                            logger.debug("Found small %s at LBN %s: %s bytes (low density)", header.filename, start_lbn, len(test_data))
                             return test_data
                         else:
-                            print(f"      Data quality too low, continuing search")
+                            logger.debug("Data quality too low, continuing search")
                             
                 except Exception as e:
-                    print(f"      Error at LBN {start_lbn}: {e}")
+                    logger.debug("Error at LBN %s: %s", start_lbn, e)
                     continue
         
         # Alternative method: Look near the file header location
@@ -806,7 +1343,7 @@ class ODS1Extractor:
                     # Check if this looks like file data (not all zeros, not a header)
                     non_zero_count = sum(1 for b in block_data if b != 0)
                     if non_zero_count > 100 and not self.looks_like_header(block_data):
-                        data = block_data
+                        data = bytearray(block_data)
                         
                         # Try to read additional blocks
                         for i in range(1, 20):
@@ -916,41 +1453,25 @@ class ODS1Extractor:
         except:
             return False
     
-    def extract_files(self, output_dir: str = "extracted_ods1"):
-        """Extract all files from the ODS-1 volume."""
+    def extract_files(self, output_dir: str = "extracted_ods1", workers: Optional[int] = None,
+                      io_order: str = "plan"):
+        """
+        Extract all files from the ODS-1 volume.
+        
+        Every file is planned first (output path and retrieval runs), then the
+        copies run on a pool of ``workers`` threads (default: one per core)
+        sharing the mapped image, or with io_order="block" in one ascending
+        sweep over the image. Results are reported in plan order.
+        """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             
         print(f"\nExtracting files to {output_dir}/")
         
-        headers = self.scan_for_file_headers()
-        
         # Group headers by directory structure
-        directories = {}
-        files_to_extract = []
-        
-        for header in headers:
-            # Check if this is a directory - improved detection
-            is_directory = (
-                header.filetype.upper() == 'DIR' or 
-                header.filename.endswith('.DIR') or
-                'DIR' in header.filename.upper() or
-                # RSX-11 user directories often have numeric names like 001001, 001002, etc.
-                (len(header.filename) == 6 and header.filename.isdigit()) or
-                # Some directories might be named like 000000, 240001, etc.
-                (len(header.filename) >= 5 and header.filename.isdigit())
-            )
-            
-            if is_directory:
-                # This is a directory - add to directories list
-                dir_name = header.filename.strip().replace('.DIR', '')
-                if not dir_name:
-                    dir_name = f"DIR_{header.file_number}"
-                directories[header.file_number] = dir_name
-                print(f"  Found directory: {dir_name}")
-            else:
-                # Regular file
-                files_to_extract.append(header)
+        directories, files_to_extract = self.directory_tree()
+        for dir_name in directories.values():
+            print(f"  Found directory: {dir_name}")
         
         # Create directory structure first
         for dir_num, dir_name in directories.items():
@@ -958,143 +1479,89 @@ class ODS1Extractor:
             os.makedirs(dir_path, exist_ok=True)
             print(f"  Created directory: {dir_name}/")
         
-        extracted_count = 0
+        jobs = []
+        taken = set()
         for header in files_to_extract:
             try:
                 # Create safe filename (remove version number for filesystem)
-                filename = header.filename.strip()
-                filetype = header.filetype.strip()
-                version = header.version
-                
-                if not filename:
-                    filename = f"FILE_{header.file_number}"
-                
-                # Build filename WITHOUT version for extraction
-                if filetype:
-                    display_name = f"{filename}.{filetype}"
-                    if version > 0:
-                        display_name += f";{version}"  # For display only
-                    extraction_name = f"{filename}.{filetype}"  # Without version for filesystem
-                else:
-                    display_name = filename
-                    if version > 0:
-                        display_name += f";{version}"
-                    extraction_name = filename
-                
-                # Make filename safe for filesystem
-                safe_name = "".join(c for c in extraction_name if c.isalnum() or c in "._-").strip()
-                if not safe_name:
-                    safe_name = f"file_{header.file_number}_{header.file_sequence}.bin"
+                display_name, safe_name = self.file_names(header)
                 
                 # Determine output directory (check if file belongs to a specific directory)
-                # In ODS-1, files can be associated with directories through UIC or naming patterns
                 target_dir = output_dir
-                
-                # Check if filename suggests it belongs to a directory
-                for dir_num, dir_name in directories.items():
-                    if (filename.startswith(dir_name.upper()) or 
-                        header.owner_uic == dir_num or
-                        filename.startswith(f"{dir_num:03d}")):
-                        target_dir = os.path.join(output_dir, dir_name)
-                        print(f"  Placing {safe_name} in directory {dir_name}/")
-                        break
+                dir_name = self.directory_for(header, directories)
+                if dir_name is not None:
+                    target_dir = os.path.join(output_dir, dir_name)
+                    print(f"  Placing {safe_name} in directory {dir_name}/")
                 
                 # Debug: Show header information for system files and TSK files (disabled in production)
                 # if header.filename in ['INDEXF', 'BITMAP', 'BADBLK', 'CORIMG'] or header.filetype.upper() == 'TSK':
                 #     print(f"  DEBUG {header.filename}.{header.filetype}: end_of_file_block={header.end_of_file_block}, first_free_byte={header.first_free_byte}")
                 #     print(f"  DEBUG {header.filename}.{header.filetype}: highest_vbn={header.highest_vbn}, map_words_used={header.map_words_used}")
                 
-                # Extract file data
-                file_data = self.extract_file_data(header)
+                # Several versions of a file share a safe name: later ones get a _N suffix
+                output_path = unique_path(Path(target_dir) / safe_name, taken, check_disk=False)
                 
-                # Handle both non-empty files and legitimate empty files
-                if file_data is not None:  # None means error, b"" means empty file
-                    output_path = os.path.join(target_dir, safe_name)
-                    with open(output_path, 'wb') as f:
-                        f.write(file_data)
-                    
-                    # Determine file type based on extension
-                    file_type = self.get_file_type(header.filetype)
-                    
-                    # Format creation date
-                    creation_date = self.format_date(header.creation_date) if header.creation_date else "N/A"
-                    
-                    # Calculate size in blocks
-                    size_blocks = max(1, (len(file_data) + self.BLOCK_SIZE - 1) // self.BLOCK_SIZE) if file_data else 0
-                    
-                    # Show relative path for files in subdirectories
-                    if target_dir != output_dir:
-                        rel_path = os.path.relpath(output_path, output_dir)
-                        display_path = rel_path
-                    else:
-                        display_path = safe_name
-                    
-                    if len(file_data) == 0:
-                        print(f"  Extracted: {display_path} (empty file) [{file_type}] {creation_date}")
-                    else:
-                        print(f"  Extracted: {display_path} ({len(file_data)} bytes, {size_blocks} blocks) [{file_type}] {creation_date}")
-                    
-                    # Also output detailed info for GUI parsing (use display name with version)
-                    print(f"  FILE_INFO: {display_name}|{size_blocks}|{len(file_data)}|{file_type}|{creation_date}|{display_path}")
-                    
-                    extracted_count += 1
-                else:
+                # Plan file data (None means error, no runs and no data means empty file)
+                try:
+                    jobs.append(self.plan_file_job(header, output_path))
+                except Files11Exception as e:
+                    print(f"  {e}")
                     print(f"  Warning: No data for {display_name}")
                     
             except Exception as e:
                 print(f"  Error extracting {header.filename}: {e}")
         
+        extracted_count = 0
+        scheduler = ExtractionScheduler(self.device, workers, io_order=io_order)
+        for result in scheduler.run(jobs):
+            header = result.job.handle
+            if not result.ok:
+                print(f"  Error extracting {header.filename}: {result.error}")
+                continue
+            
+            display_name, _ = self.file_names(header)
+            file_size = result.bytes_written
+            
+            # Determine file type based on extension
+            file_type = self.get_file_type(header.filetype)
+            
+            # Format creation date
+            creation_date = self.format_date(header.creation_date) if header.creation_date else "N/A"
+            
+            # Calculate size in blocks
+            size_blocks = max(1, (file_size + self.BLOCK_SIZE - 1) // self.BLOCK_SIZE) if file_size else 0
+            
+            # Show relative path for files in subdirectories
+            display_path = os.path.relpath(result.job.output_path, output_dir)
+            
+            if file_size == 0:
+                print(f"  Extracted: {display_path} (empty file) [{file_type}] {creation_date}")
+            else:
+                print(f"  Extracted: {display_path} ({file_size} bytes, {size_blocks} blocks) [{file_type}] {creation_date}")
+            
+            # Also output detailed info for GUI parsing (use display name with version)
+            print(f"  FILE_INFO: {display_name}|{size_blocks}|{file_size}|{file_type}|{creation_date}|{display_path}")
+            
+            extracted_count += 1
+        
         # Also output directory info for GUI
         for dir_num, dir_name in directories.items():
             print(f"  FILE_INFO: {dir_name}|0|0|Directory|N/A|{dir_name}/")
                 
+        if io_order == "block":
+            print(f"  I/O: {scheduler.stats.summary()}")
         print(f"\nExtracted {extracted_count} files and {len(directories)} directories successfully")
     
     def list_files(self):
         """List all files in the volume with FILE_INFO output for GUI parsing."""
-        headers = self.scan_for_file_headers()
-        
         # Group headers by directory structure
-        directories = {}
-        files_to_list = []
-        
-        for header in headers:
-            # Check if this is a directory
-            is_directory = (
-                header.filetype.upper() == 'DIR' or 
-                header.filename.endswith('.DIR') or
-                'DIR' in header.filename.upper() or
-                (len(header.filename) == 6 and header.filename.isdigit()) or
-                (len(header.filename) >= 5 and header.filename.isdigit())
-            )
-            
-            if is_directory:
-                dir_name = header.filename.strip().replace('.DIR', '')
-                if not dir_name:
-                    dir_name = f"DIR_{header.file_number}"
-                directories[header.file_number] = dir_name
-            else:
-                files_to_list.append(header)
+        directories, files_to_list = self.directory_tree()
         
         # Output file information
         for header in files_to_list:
             try:
-                filename = header.filename.strip()
-                filetype = header.filetype.strip()
-                version = header.version
-                
-                if not filename:
-                    filename = f"FILE_{header.file_number}"
-                
                 # Build display filename with version
-                if filetype:
-                    display_name = f"{filename}.{filetype}"
-                    if version > 0:
-                        display_name += f";{version}"
-                else:
-                    display_name = filename
-                    if version > 0:
-                        display_name += f";{version}"
+                display_name, _ = self.file_names(header)
                 
                 # Determine file type
                 file_type = self.get_file_type(header.filetype)
@@ -1111,9 +1578,12 @@ class ODS1Extractor:
                         size_bytes += self.BLOCK_SIZE
                     size_blocks = header.end_of_file_block
                 else:
-                    # For files without size info, estimate from retrieval pointers
+                    # For files without size info, estimate from the extent map
                     if header.retrieval_pointers:
-                        total_blocks = sum(count + 1 for lbn, count in header.retrieval_pointers if lbn > 0 and count > 0)
+                        try:
+                            total_blocks = sum(count for _, count in self.extent_map(header))
+                        except Files11Exception:
+                            total_blocks = 0
                         size_blocks = total_blocks
                         size_bytes = total_blocks * self.BLOCK_SIZE
                     else:
@@ -1122,12 +1592,9 @@ class ODS1Extractor:
                 
                 # Determine display path (check if file belongs to a directory)
                 display_path = display_name
-                for dir_num, dir_name in directories.items():
-                    if (filename.startswith(dir_name.upper()) or 
-                        header.owner_uic == dir_num or
-                        filename.startswith(f"{dir_num:03d}")):
-                        display_path = f"{dir_name}/{display_name}"
-                        break
+                dir_name = self.directory_for(header, directories)
+                if dir_name is not None:
+                    display_path = f"{dir_name}/{display_name}"
                 
                 # Output FILE_INFO for GUI parsing
                 print(f"FILE_INFO: {display_name}|{size_blocks}|{size_bytes}|{file_type}|{creation_date}|{display_path}")
@@ -1170,22 +1637,43 @@ def main():
     parser.add_argument("-a", "--analyze-only", action="store_true", help="Only analyze volume, don't extract files")
     parser.add_argument("-l", "--list", action="store_true", help="List files only (same as --analyze-only)")
     parser.add_argument("-d", "--detailed", action="store_true", help="Show detailed file information (ignored)")
-    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output (ignored for now)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output (data recovery diagnostics)")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text",
+                        help="Listing format: jsonl streams one JSON object per entry (implies -l)")
+    parser.add_argument("--recover", action="store_true",
+                        help="Recovery mode for damaged volumes: scan the whole disk for headers and "
+                             "guess the location of files without retrieval pointers")
     
     args = parser.parse_args()
     
+    # Structured listing: one JSON object per entry, nothing else on stdout
+    if args.format == "jsonl":
+        from dec_extract import open_image, write_jsonl, VolumeError
+        try:
+            with open_image(args.disk_image, "ods1") as volume:
+                write_jsonl(volume)
+        except VolumeError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        return 0
+    
+    configure_logging(args.verbose)
+    
     try:
-        extractor = ODS1Extractor(args.disk_image)
+        extractor = ODS1Extractor(args.disk_image, cache=True, recover=args.recover)
         
-        if not extractor.analyze_volume():
-            print("ERROR: Could not analyze volume")
-            return 1
+        try:
+            if not extractor.analyze_volume():
+                print("ERROR: Could not analyze volume")
+                return 1
             
-        # If list mode (-l) or analyze_only (-a) is specified, list files but don't extract
-        if args.analyze_only or args.list:
-            extractor.list_files()
-        else:
-            extractor.extract_files(args.output)
+            # If list mode (-l) or analyze_only (-a) is specified, list files but don't extract
+            if args.analyze_only or args.list:
+                extractor.list_files()
+            else:
+                extractor.extract_files(args.output)
+        finally:
+            extractor.close()
             
     except Files11Exception as e:
         print(f"ERROR: {e}")
@@ -24,15 +24,36 @@ import time
 import datetime
 import io
 import string
+from array import array
+from collections import Counter, OrderedDict
+from itertools import chain
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Iterator, NamedTuple
+
+try:
+    from utils.block_device import BlockDevice, coalesce_blocks, DEFAULT_CHUNK_SIZE
+    from utils.extract_manifest import ManifestWriter
+    from utils.extract_scheduler import ExtractionJob, ExtractionScheduler, IO_ORDERS, unique_path
+    from utils.fs_detect import detect
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from utils.block_device import BlockDevice, coalesce_blocks, DEFAULT_CHUNK_SIZE
+    from utils.extract_manifest import ManifestWriter
+    from utils.extract_scheduler import ExtractionJob, ExtractionScheduler, IO_ORDERS, unique_path
+    from utils.fs_detect import detect
 
 # Constantes Unix V6/S5 (basadas en PyPDP11 y documentación S5)
 SUPERBLOCK_SIZE = 415
 SUPERBLOCK_S5_SIZE = 512
 BLOCK_SIZE = 512
 INODE_SIZE = 32
+INODES_PER_BLOCK = BLOCK_SIZE // INODE_SIZE
+# Inodo V6 en disco: flag, nlinks, uid, gid, size0, size1, addr[8], actime, modtime
+INODE_STRUCT = struct.Struct('<HBBBBH8HII')
 BIGGEST_NOT_HUGE_SIZE = BLOCK_SIZE * BLOCK_SIZE // 2 * 8
+POINTERS_PER_BLOCK = BLOCK_SIZE // 2
+LARGE_INDIRECT = 7          # addr[0..6]: indirectos simples; addr[7]: doble indirecto
+INDIRECT_CACHE_BLOCKS = 256 # Bloques indirectos decodificados que se conservan (LRU)
 
 # S5 Filesystem constants
 FS_MAGIC = 0xfd187e20  # S5 magic number
@@ -94,10 +115,28 @@ class UnixSuperblock:
 class UnixINode:
     """INode Unix V6 según documentación oficial"""
     
+    __slots__ = ('inode', 'flag', 'nlinks', 'uid', 'gid', 'size', 'addr', 'actime', 'modtime')
+    
     def __init__(self, data: bytes, inode_num: int = 0):
         self.inode = inode_num
         self.parse(data)
     
+    @classmethod
+    def from_fields(cls, inode_num: int, flag: int, nlinks: int, uid: int, gid: int, size: int,
+                    addr: List[int], actime: int, modtime: int) -> 'UnixINode':
+        """Crear un inodo a partir de campos ya decodificados (sin volver a parsear)"""
+        inode = cls.__new__(cls)
+        inode.inode = inode_num
+        inode.flag = flag
+        inode.nlinks = nlinks
+        inode.uid = uid
+        inode.gid = gid
+        inode.size = size
+        inode.addr = addr
+        inode.actime = actime
+        inode.modtime = modtime
+        return inode
+    
     def parse(self, data: bytes):
         """Parse según Unix V6 /usr/man/man5/fs.5 - flexible para diferentes versiones"""
         if len(data) < 16:  # Mínimo para campos básicos
@@ -209,14 +248,102 @@ class UnixINode:
     def __repr__(self):
         return f'UnixINode(uid={self.uid}, gid={self.gid}, size={self.size}, flags={self.flags_string()})'
 
+class UnixINodeTable:
+    """
+    Tabla de inodos V6 decodificada de una sola pasada
+    
+    Toda la zona de inodos (isize bloques desde el bloque 2) se decodifica
+    con un único struct.iter_unpack en columnas compactas (array). Los
+    UnixINode se crean bajo demanda y se memorizan, así que un recorrido
+    del árbol no vuelve a decodificar ni a asignar el mismo inodo.
+    """
+    
+    def __init__(self, device: BlockDevice, isize: int):
+        available = max(0, (device.size - 2 * BLOCK_SIZE) // INODE_SIZE)
+        self.count = min(isize * INODES_PER_BLOCK, available)
+        records = list(INODE_STRUCT.iter_unpack(device.read(2 * BLOCK_SIZE, self.count * INODE_SIZE)))
+        columns = list(zip(*records)) or [()] * 16
+        
+        self.flags = array('H', columns[0])
+        self.nlinks = array('B', columns[1])
+        self.uids = array('B', columns[2])
+        self.gids = array('B', columns[3])
+        self.sizes = array('L', [(high << 16) | low for high, low in zip(columns[4], columns[5])])
+        self.addrs = array('H', chain.from_iterable(record[6:14] for record in records))
+        self.actimes = array('L', columns[14])
+        self.modtimes = array('L', columns[15])
+        self._objects: Dict[int, UnixINode] = {}
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __contains__(self, inode_num: int) -> bool:
+        return 1 <= inode_num <= self.count
+    
+    def get(self, inode_num: int) -> UnixINode:
+        """Inodo memorizado (1..count)"""
+        inode = self._objects.get(inode_num)
+        if inode is None:
+            if inode_num not in self:
+                raise ValueError(f"INode {inode_num} outside the inode table")
+            i = inode_num - 1
+            inode = UnixINode.from_fields(inode_num, self.flags[i], self.nlinks[i], self.uids[i],
+                                          self.gids[i], self.sizes[i],
+                                          self.addrs[i * 8:i * 8 + 8].tolist(),
+                                          self.actimes[i], self.modtimes[i])
+            self._objects[inode_num] = inode
+        return inode
+    
+    def allocated(self) -> List[int]:
+        """Números de todos los inodos asignados"""
+        return [i + 1 for i, flag in enumerate(self.flags) if flag & 0x8000]
+    
+    def directories(self) -> List[int]:
+        """Números de los inodos asignados que son directorios"""
+        return [i + 1 for i, flag in enumerate(self.flags) if flag & 0xE000 == 0xC000]
+    
+    def size_histogram(self) -> Dict[int, int]:
+        """Archivos regulares asignados por tamaño, en potencias de 2 (0 = vacío)"""
+        histogram = Counter((1 << (size - 1).bit_length()) if size else 0
+                            for flag, size in zip(self.flags, self.sizes)
+                            if flag & 0xE000 == 0x8000)
+        return dict(sorted(histogram.items()))
+
+
+class HardLink(NamedTuple):
+    """Nombre adicional de un inodo ya planificado (nlinks > 1)"""
+    target: Path                    # Salida del primer nombre del inodo
+    path: Path                      # Salida de este nombre
+    name: str
+    inode_num: int
+
+
+class WalkEntry(NamedTuple):
+    """Entrada producida por UnixV6FileSystem.walk"""
+    path: str                       # Ruta completa de la entrada
+    parent: str                     # Ruta del directorio que la contiene
+    name: str
+    inode_num: int
+    inode: Optional[UnixINode]      # None si el inodo no se pudo leer
+    error: Optional[str] = None     # Error al leer el inodo o, con inode, al listar el directorio
+
+
 class UnixV6FileSystem:
     """Sistema de archivos Unix V6 para PDP-11"""
     
     def __init__(self, image_path: str, verbose: bool = False):
         self.image_path = Path(image_path)
         self.verbose = verbose
+        self.device = None
         self.image_data = None
         self.superblock = None
+        self._inodes = None
+        # Caché de directorios: inodo -> entradas, inodo -> {nombre: inodo}
+        # y ruta (sin "/" inicial, desde la raíz) -> inodo
+        self._dentries: Dict[int, List[Tuple[int, str]]] = {}
+        self._names: Dict[int, Dict[str, int]] = {}
+        self._paths: Dict[str, int] = {"": 1}
+        self._indirect_cache: 'OrderedDict[int, array]' = OrderedDict()
         
         self._load_image()
         self._load_superblock()
@@ -226,12 +353,24 @@ class UnixV6FileSystem:
         if not self.image_path.exists():
             raise FileNotFoundError(f"Image not found: {self.image_path}")
             
-        with open(self.image_path, 'rb') as f:
-            self.image_data = f.read()
+        # Imagen mapeada en memoria: las lecturas son vistas sin copia
+        self.device = BlockDevice(self.image_path, BLOCK_SIZE)
+        self.image_data = self.device.view
             
         if self.verbose:
             print(f"Loaded Unix image: {len(self.image_data)} bytes")
     
+    def close(self):
+        """Liberar el mapeo de la imagen"""
+        if self.device is not None:
+            self.image_data = None
+            self._inodes = None
+            self._dentries.clear()
+            self._names.clear()
+            self._indirect_cache.clear()
+            self.device.close()
+            self.device = None
+    
     def _load_superblock(self):
         """Cargar y validar superblock"""
         # El superblock está en el bloque 1 (offset 512)
@@ -244,77 +383,128 @@ class UnixV6FileSystem:
         except Exception as e:
             raise ValueError(f"Invalid Unix superblock: {e}")
     
-    def read_block(self, block_num: int) -> bytes:
-        """Leer un bloque del disco"""
-        offset = block_num * BLOCK_SIZE
-        if offset + BLOCK_SIZE > len(self.image_data):
+    def read_block(self, block_num: int) -> memoryview:
+        """Leer un bloque del disco (vista sobre la imagen mapeada)"""
+        data = self.device.read_block(block_num)
+        if len(data) < BLOCK_SIZE:
             raise ValueError(f"Block {block_num} beyond image size")
-        return self.image_data[offset:offset + BLOCK_SIZE]
+        return data
+    
+    @property
+    def inodes(self) -> UnixINodeTable:
+        """Tabla de inodos completa (decodificada en el primer uso)"""
+        if self._inodes is None:
+            self._inodes = UnixINodeTable(self.device, self.superblock.isize)
+        return self._inodes
     
     def read_inode(self, inode_num: int) -> UnixINode:
         """Leer un inode específico"""
         if inode_num < 1:
             raise ValueError("Invalid inode number")
+        if inode_num in self.inodes:
+            return self.inodes.get(inode_num)
             
+        # Fuera de la tabla (isize inconsistente): lectura directa
         # Los inodos empiezan en el bloque 2
         offset = BLOCK_SIZE * 2 + (inode_num - 1) * INODE_SIZE
         if offset + INODE_SIZE > len(self.image_data):
             raise ValueError(f"INode {inode_num} beyond image size")
             
-        inode_data = self.image_data[offset:offset + INODE_SIZE]
+        inode_data = self.device.read(offset, INODE_SIZE)
         return UnixINode(inode_data, inode_num)
     
+    def _indirect(self, block_num: int) -> array:
+        """Punteros (256 palabras) de un bloque indirecto, con caché LRU acotada"""
+        pointers = self._indirect_cache.get(block_num)
+        if pointers is not None:
+            self._indirect_cache.move_to_end(block_num)
+            return pointers
+        pointers = array('H')
+        pointers.frombytes(self.read_block(block_num))
+        if sys.byteorder == 'big':
+            pointers.byteswap()
+        self._indirect_cache[block_num] = pointers
+        if len(self._indirect_cache) > INDIRECT_CACHE_BLOCKS:
+            self._indirect_cache.popitem(last=False)
+        return pointers
+    
     def get_file_blocks(self, inode: UnixINode) -> List[int]:
-        """Obtener lista de bloques que contienen el archivo"""
-        blocks = []
+        """
+        Obtener lista de bloques que contienen el archivo
         
-        if inode.size == 0:
-            return blocks
+        Como bmap() de V6: en archivos grandes addr[0..6] apuntan a bloques
+        indirectos y addr[7] a un doble indirecto (archivos "huge"). La lista
+        se limita al tamaño del archivo y termina en el primer bloque 0.
+        """
+        needed = (inode.size + BLOCK_SIZE - 1) // BLOCK_SIZE
+        if needed == 0:
+            return []
             
         if not inode.is_large():
             # Archivo pequeño - direcciones directas
-            for addr in inode.addr:
-                if addr == 0:
-                    break
-                blocks.append(addr)
+            blocks = array('H', inode.addr[:needed])
         else:
             # Archivo grande - direcciones indirectas
-            for indirect_block_addr in inode.addr:
-                if indirect_block_addr == 0:
+            blocks = array('H')
+            for indirect_block_addr in inode.addr[:LARGE_INDIRECT]:
+                if indirect_block_addr == 0 or len(blocks) >= needed:
                     break
-                    
-                # Leer bloque indirecto
-                indirect_data = self.read_block(indirect_block_addr)
-                
-                # Cada entrada es de 2 bytes (16-bit address)
-                for i in range(0, BLOCK_SIZE, 2):
-                    if i + 2 <= len(indirect_data):
-                        block_addr = struct.unpack('<H', indirect_data[i:i+2])[0]
-                        if block_addr == 0:
-                            break
-                        blocks.append(block_addr)
+                blocks.extend(self._indirect(indirect_block_addr)[:needed - len(blocks)])
+            
+            # Archivo "huge": el resto cuelga del doble indirecto addr[7]
+            single = LARGE_INDIRECT * POINTERS_PER_BLOCK
+            if len(blocks) == single and needed > single and inode.addr[LARGE_INDIRECT]:
+                for indirect_block_addr in self._indirect(inode.addr[LARGE_INDIRECT]):
+                    if indirect_block_addr == 0 or len(blocks) >= needed:
+                        break
+                    blocks.extend(self._indirect(indirect_block_addr)[:needed - len(blocks)])
         
-        return blocks
+        if 0 in blocks:
+            del blocks[blocks.index(0):]
+        return blocks.tolist()
+    
+    def extent_map(self, inode: UnixINode) -> List[Tuple[int, int]]:
+        """Bloques del archivo agrupados en tramos (bloque inicial, cantidad)"""
+        return coalesce_blocks(self.get_file_blocks(inode))
     
     def read_file_data(self, inode: UnixINode) -> bytes:
         """Leer contenido completo de un archivo"""
         if inode.size == 0:
             return b''
-            
-        blocks = self.get_file_blocks(inode)
-        file_data = b''
-        
-        for block_num in blocks:
-            file_data += self.read_block(block_num)
         
-        # Truncar al tamaño real del archivo
-        return file_data[:inode.size]
+        # Un slice por tramo, copiado a un buffer preasignado y truncado al
+        # tamaño real del archivo
+        return self.device.read_runs(self._file_runs(inode), inode.size)
+    
+    def iter_file_chunks(self, inode: UnixINode, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """Leer un archivo por fragmentos (memoryview de como máximo chunk_size bytes)"""
+        if inode.size == 0:
+            return iter(())
+        return self.device.iter_runs(self._file_runs(inode), inode.size, chunk_size)
     
     def list_directory(self, inode: UnixINode) -> List[Tuple[int, str]]:
-        """Listar contenido de un directorio"""
+        """Listar contenido de un directorio (cada directorio se lee una sola vez)"""
         if not inode.is_dir():
             return []
-            
+        entries = self._dentries.get(inode.inode)
+        if entries is None:
+            entries = self._read_directory(inode)
+            if inode.inode:
+                self._dentries[inode.inode] = entries
+        return list(entries)
+    
+    def _lookup(self, inode: UnixINode, name: str) -> Optional[int]:
+        """Inodo de un nombre en un directorio (la primera entrada si se repite)"""
+        names = self._names.get(inode.inode)
+        if names is None:
+            names = {}
+            for inode_num, entry_name in self.list_directory(inode):
+                names.setdefault(entry_name, inode_num)
+            if inode.inode:
+                self._names[inode.inode] = names
+        return names.get(name)
+    
+    def _read_directory(self, inode: UnixINode) -> List[Tuple[int, str]]:
         dir_data = self.read_file_data(inode)
         entries = []
         
@@ -332,109 +522,265 @@ class UnixV6FileSystem:
         return entries
     
     def find_path(self, path: str, start_inode: int = 1) -> Optional[UnixINode]:
-        """Buscar un archivo/directorio por ruta"""
+        """
+        Buscar un archivo/directorio por ruta
+        
+        Las rutas desde la raíz ya resueltas (aquí o en walk) se recuerdan, y
+        cada componente se busca en la caché de directorios.
+        """
         if path.startswith('/'):
             path = path[1:]  # Remover / inicial
-            
+        path = path.rstrip('/')
+        
+        paths = self._paths if start_inode == 1 else {}
+        inode_num = paths.get(path)
+        if inode_num is not None:
+            return self.read_inode(inode_num)
+        
         if not path:
             # Directorio raíz
             return self.read_inode(start_inode)
-            
-        current_inode = self.read_inode(start_inode)
         
-        for component in path.split('/'):
+        # Partir del ancestro más cercano ya resuelto
+        components = path.split('/')
+        depth = len(components) - 1
+        while depth > 0 and '/'.join(components[:depth]) not in paths:
+            depth -= 1
+        current_inode = self.read_inode(paths['/'.join(components[:depth])] if depth else start_inode)
+        
+        for index in range(depth, len(components)):
+            component = components[index]
             if not current_inode.is_dir():
                 if self.verbose:
                     print(f"DEBUG: {component} is not a directory")
                 return None
-                
-            # Buscar en el directorio actual
-            found = False
-            entries = self.list_directory(current_inode)
             
-            if self.verbose:
-                print(f"DEBUG: Looking for '{component}' in directory with {len(entries)} entries:")
-                for inum, name in entries:
-                    print(f"  - {name} (inode {inum})")
-                    
-            for inode_num, name in entries:
-                if name == component:
-                    current_inode = self.read_inode(inode_num)
-                    found = True
-                    break
-                    
-            if not found:
+            # Buscar en el directorio actual
+            inode_num = self._lookup(current_inode, component)
+            if inode_num is None:
                 if self.verbose:
                     print(f"DEBUG: Component '{component}' not found")
                 return None
+            current_inode = self.read_inode(inode_num)
+            paths['/'.join(components[:index + 1])] = inode_num
         
         return current_inode
     
+    def walk(self, path: str = "/", sort: bool = True) -> Iterator[WalkEntry]:
+        """
+        Recorrer el árbol bajo una ruta, en preorden y sin recursión
+        
+        Los inodos se pasan directamente de cada directorio a sus hijos (no
+        se vuelve a resolver la ruta desde la raíz). Un directorio que es
+        ancestro de sí mismo se produce pero no se recorre otra vez.
+        
+        Args:
+            path: Directorio inicial
+            sort: Entradas de cada directorio por nombre (si no, en orden de disco)
+        """
+        root = self.find_path(path)
+        if not root or not root.is_dir():
+            return
+        for entry in self._walk_from(path, root, sort):
+            if entry.error is None and entry.inode.is_dir() and entry.path.startswith('/'):
+                self._paths.setdefault(entry.path[1:], entry.inode_num)
+            yield entry
+    
+    def _walk_from(self, path: str, root: UnixINode, sort: bool) -> Iterator[WalkEntry]:
+        """Recorrido de walk desde un inodo de directorio ya resuelto"""
+        def children(dir_path: str, dir_inode: UnixINode) -> Iterator[WalkEntry]:
+            entries = self.list_directory(dir_inode)
+            if sort:
+                entries.sort(key=lambda entry: entry[1])
+            prefix = dir_path if dir_path.endswith('/') else dir_path + '/'
+            for inode_num, name in entries:
+                if name in ('.', '..'):
+                    continue
+                full_path = prefix + name
+                try:
+                    yield WalkEntry(full_path, dir_path, name, inode_num, self.read_inode(inode_num))
+                except Exception as e:
+                    yield WalkEntry(full_path, dir_path, name, inode_num, None, str(e))
+        
+        # Pila de (entrada del directorio, iterador de sus entradas)
+        top = WalkEntry(path, path, '', root.inode, root)
+        stack = [(top, children(path, root))]
+        ancestors = {root.inode}
+        while stack:
+            directory, pending = stack[-1]
+            try:
+                entry = next(pending)
+            except StopIteration:
+                stack.pop()
+                ancestors.discard(directory.inode_num)
+                continue
+            except Exception as e:
+                # El directorio no se pudo leer
+                stack.pop()
+                ancestors.discard(directory.inode_num)
+                yield directory._replace(error=str(e))
+                continue
+            
+            yield entry
+            inode = entry.inode
+            if inode is not None and inode.is_dir():
+                if entry.inode_num not in ancestors:
+                    ancestors.add(entry.inode_num)
+                    stack.append((entry, children(entry.path, inode)))
+    
+    def _file_runs(self, inode: UnixINode) -> List[Tuple[int, int]]:
+        """Tramos (bloque inicial, cantidad) de un archivo, validados contra la imagen"""
+        if inode.size == 0:
+            return []
+        runs = self.extent_map(inode)
+        last = max((start + count - 1 for start, count in runs), default=-1)
+        if last >= self.device.block_count:
+            raise ValueError(f"Block {last} beyond image size")
+        return runs
+    
+    def _plan_file(self, inode: UnixINode, output_path: Path, filename: str,
+                   taken: set, check_disk: bool = True) -> ExtractionJob:
+        """Planificar la extracción de un archivo (nombre de salida y tramos)"""
+        # Manejar conflictos de nombres (archivos existentes y ya planificados)
+        output_file = unique_path(output_path / filename, taken, check_disk)
+        return ExtractionJob(output_file, self._file_runs(inode), inode.size, handle=filename)
+    
+    def _run_jobs(self, jobs: List[ExtractionJob], workers: Optional[int] = None,
+                  io_order: str = "plan", links: Optional[List[HardLink]] = None,
+                  output_root: Optional[Path] = None) -> int:
+        """Copiar los archivos planificados y crear sus enlaces; devuelve cuántos se extrajeron"""
+        extracted_count = 0
+        written = set()
+        scheduler = ExtractionScheduler(self.device, workers, io_order=io_order)
+        for result in scheduler.run(jobs):
+            if result.ok:
+                extracted_count += 1
+                written.add(result.job.output_path)
+                if self.verbose:
+                    print(f"Extracted: {result.job.handle} ({result.bytes_written} bytes)")
+            elif self.verbose:
+                print(f"Error extracting {result.job.handle}: {result.error}")
+        if self.verbose and io_order == "block":
+            print(f"I/O: {scheduler.stats.summary()}")
+        if links:
+            extracted_count += self._make_links(links, written, output_root)
+        return extracted_count
+    
+    def _make_links(self, links: List[HardLink], written: set, output_root: Optional[Path]) -> int:
+        """
+        Crear los nombres adicionales de inodos ya extraídos con os.link
+        
+        Si el sistema de archivos de destino no admite enlaces duros, el
+        nombre queda como referencia en el manifiesto de la extracción en
+        lugar de copiar los datos otra vez.
+        """
+        linked = 0
+        manifest = None
+        try:
+            for link in links:
+                if link.target not in written:
+                    if self.verbose:
+                        print(f"Error extracting {link.name}: link target was not extracted")
+                    continue
+                try:
+                    os.link(link.target, link.path)
+                    if self.verbose:
+                        print(f"Linked: {link.name} -> {link.target.name}")
+                except OSError as e:
+                    root = output_root or link.target.parent
+                    if manifest is None:
+                        manifest = ManifestWriter(root, self.image_path, "unix", append=True)
+                    manifest.add({'path': os.path.relpath(link.path, root),
+                                  'link_to': os.path.relpath(link.target, root),
+                                  'inode': link.inode_num, 'error': str(e)})
+                    if self.verbose:
+                        print(f"Link recorded in manifest: {link.name} -> {link.target.name} ({e})")
+                linked += 1
+        finally:
+            if manifest is not None:
+                manifest.close()
+        return linked
+    
     def extract_file(self, inode: UnixINode, output_path: Path, filename: str) -> bool:
         """Extraer un archivo al sistema de archivos local"""
         try:
-            file_data = self.read_file_data(inode)
-            
-            output_file = output_path / filename
-            
-            # Manejar conflictos de nombres
-            counter = 1
-            while output_file.exists():
-                stem = Path(filename).stem
-                suffix = Path(filename).suffix
-                output_file = output_path / f"{stem}_{counter}{suffix}"
-                counter += 1
-            
-            with open(output_file, 'wb') as f:
-                f.write(file_data)
-            
-            if self.verbose:
-                print(f"Extracted: {filename} ({len(file_data)} bytes)")
-            
-            # Skip metadata file creation for cleaner extraction
-            # (Metadata generation disabled by user request)
-            
-            return True
-            
+            job = self._plan_file(inode, output_path, filename, set())
         except Exception as e:
             if self.verbose:
                 print(f"Error extracting {filename}: {e}")
             return False
+        
+        # Skip metadata file creation for cleaner extraction
+        # (Metadata generation disabled by user request)
+        return self._run_jobs([job], workers=1) == 1
     
-    def extract_directory(self, inode: UnixINode, output_path: Path, dirname: str = "") -> int:
-        """Extraer un directorio recursivamente"""
-        extracted_count = 0
+    def plan_directory(self, inode: UnixINode, output_path: Path, dirname: str = "",
+                       jobs: Optional[List[ExtractionJob]] = None,
+                       taken: Optional[set] = None,
+                       links: Optional[List[HardLink]] = None) -> List[ExtractionJob]:
+        """
+        Crear el árbol de directorios y planificar la copia de cada archivo
         
-        # Crear directorio si no existe
-        if dirname:
-            dir_path = output_path / dirname
-            dir_path.mkdir(exist_ok=True)
-        else:
-            dir_path = output_path
+        El recorrido (walk, en orden de disco) es secuencial, así que los
+        nombres de salida (incluidos los sufijos _N por conflicto) son
+        deterministas. Con ``links``, un inodo con varios nombres se copia
+        solo para el primero y los demás se añaden a ``links`` como HardLink.
+        """
+        jobs = [] if jobs is None else jobs
+        taken = set() if taken is None else taken
+        first_output: Dict[int, Path] = {}
         
-        # Listar contenido
-        entries = self.list_directory(inode)
+        def enter(path: Path) -> Path:
+            # Crear directorio si no existe; sus archivos previos cuentan como
+            # conflictos (una sola lectura del directorio en lugar de exists())
+            path.mkdir(exist_ok=True)
+            taken.update(Path(item.path) for item in os.scandir(path))
+            return path
         
-        for inode_num, name in entries:
-            if name in ['.', '..']:
+        dir_path = enter(output_path / dirname if dirname else output_path)
+        
+        # Rutas del recorrido relativas al inodo dado ("" es el propio directorio)
+        output_dirs = {"": dir_path}
+        for entry in self._walk_from("", inode, sort=False):
+            if entry.error is not None:
+                if self.verbose:
+                    print(f"Error processing {entry.name}: {entry.error}")
                 continue
-                
             try:
-                entry_inode = self.read_inode(inode_num)
-                
-                if entry_inode.is_dir():
-                    # Extraer subdirectorio recursivamente
-                    extracted_count += self.extract_directory(entry_inode, dir_path, name)
+                parent = output_dirs[entry.parent]
+                if entry.inode.is_dir():
+                    output_dirs[entry.path] = enter(parent / entry.name)
+                elif links is not None and entry.inode_num in first_output:
+                    link_path = unique_path(parent / entry.name, taken, check_disk=False)
+                    links.append(HardLink(first_output[entry.inode_num], link_path,
+                                          entry.name, entry.inode_num))
                 else:
-                    # Extraer archivo
-                    if self.extract_file(entry_inode, dir_path, name):
-                        extracted_count += 1
-                        
+                    job = self._plan_file(entry.inode, parent, entry.name, taken, check_disk=False)
+                    jobs.append(job)
+                    if entry.inode.nlinks > 1:
+                        first_output[entry.inode_num] = job.output_path
             except Exception as e:
                 if self.verbose:
-                    print(f"Error processing {name}: {e}")
+                    print(f"Error processing {entry.name}: {e}")
         
-        return extracted_count
+        return jobs
+    
+    def extract_directory(self, inode: UnixINode, output_path: Path, dirname: str = "",
+                          workers: Optional[int] = None, io_order: str = "plan") -> int:
+        """
+        Extraer un directorio recursivamente
+        
+        Primero se planifica todo el árbol y luego los archivos se copian en
+        un pool de ``workers`` hilos (por defecto, uno por núcleo) que comparten
+        la imagen mapeada. Con io_order="block" la imagen se lee en un solo
+        barrido por orden ascendente de bloque.
+        
+        Los datos de cada inodo se escriben una sola vez: los demás nombres
+        de un archivo con enlaces duros se crean después con os.link.
+        """
+        links: List[HardLink] = []
+        jobs = self.plan_directory(inode, output_path, dirname, links=links)
+        return self._run_jobs(jobs, workers, io_order, links, output_path)
     
     def list_files(self, path: str = "/", detailed: bool = False) -> None:
         """Listar archivos de manera similar a ls -la"""
@@ -528,146 +874,39 @@ class UnixV6FileSystem:
             print(f"{'Full Path':<60} {'Type':<10} {'Size':<12}")
             print("-" * 85)
         
-        self._recursive_walk(path, detailed)
-    
-    def _recursive_walk(self, current_path: str, detailed: bool, _visited=None):
-        """Recorrer recursivamente el árbol de directorios"""
-        if _visited is None:
-            _visited = set()
-        
-        # Encontrar el inode del directorio actual
-        inode = self.find_path(current_path)
-        if not inode or not inode.is_dir():
-            return
-        
-        # Evitar bucles infinitos
-        if inode.inode in _visited:
-            return
-        _visited.add(inode.inode)
-        
-        try:
-            dir_entries = self.list_directory(inode)
+        for entry in self.walk(path):
+            if entry.error is not None:
+                if entry.inode is None:
+                    width = 40 if detailed else 60
+                    print(f"{entry.path:<{width}} ERROR: {entry.error}")
+                elif detailed:
+                    print(f"{entry.path:<40} ERROR reading directory: {entry.error}")
+                continue
             
-            for inode_num, name in sorted(dir_entries, key=lambda x: x[1]):
-                if name in ['.', '..']: # Saltar . y ..
-                    continue
-                    
-                try:
-                    entry_inode = self.read_inode(inode_num)
-                    
-                    # Construir path completo
-                    if current_path.endswith('/'):
-                        full_path = current_path + name
-                    else:
-                        full_path = current_path + '/' + name
-                    
-                    if entry_inode.is_dir():
-                        file_type = "Directory"
-                    else:
-                        file_type = "File"
-                    
-                    if detailed:
-                        unix_time = entry_inode.get_unix_time()
-                        time_str = unix_time.strftime("%Y-%m-%d %H:%M:%S") if unix_time else "Unknown"
-                        
-                        print(f"{full_path:<40} {file_type:<10} {entry_inode.size:<9} {time_str:<19} {entry_inode.flags_string()}")
-                    else:
-                        print(f"{full_path:<60} {file_type:<10} {entry_inode.size:<12}")
-                    
-                    # Si es directorio, recorrer recursivamente
-                    if entry_inode.is_dir():
-                        self._recursive_walk(full_path, detailed, _visited)
-                        
-                except Exception as e:
-                    if detailed:
-                        print(f"{full_path:<40} ERROR: {str(e)}")
-                    else:
-                        print(f"{full_path:<60} ERROR: {str(e)}")
-                    
-        except Exception as e:
+            inode = entry.inode
+            file_type = "Directory" if inode.is_dir() else "File"
             if detailed:
-                print(f"{current_path:<40} ERROR reading directory: {str(e)}")
-        finally:
-            _visited.discard(inode.inode)
+                unix_time = inode.get_unix_time()
+                time_str = unix_time.strftime("%Y-%m-%d %H:%M:%S") if unix_time else "Unknown"
+                
+                print(f"{entry.path:<40} {file_type:<10} {inode.size:<9} {time_str:<19} {inode.flags_string()}")
+            else:
+                print(f"{entry.path:<60} {file_type:<10} {inode.size:<12}")
 
 def detect_unix_filesystem(image_path: str) -> Tuple[bool, str]:
-    """Detectar si es un filesystem Unix válido (V5, V6, V7)"""
+    """
+    Detectar si es un filesystem Unix válido
+
+    Usa la sonda Unix del detector común (utils/fs_detect.py): superblock en
+    el bloque 1 e inode raíz de tipo directorio, o patrones típicos de Unix.
+    """
     try:
-        with open(image_path, 'rb') as f:
-            file_size = f.seek(0, 2)
-            f.seek(0)
-            
-            # Probar diferentes offsets para el superblock
-            # V5/V6: bloque 1 (offset 512)
-            # V7: puede estar en diferentes posiciones
-            superblock_offsets = [BLOCK_SIZE, 0, BLOCK_SIZE * 2]
-            
-            for sb_offset in superblock_offsets:
-                if sb_offset + SUPERBLOCK_SIZE > file_size:
-                    continue
-                    
-                f.seek(sb_offset)
-                sb_data = f.read(SUPERBLOCK_SIZE)
-                
-                if len(sb_data) < 16:  # Mínimo para leer isize, fsize, nfree
-                    continue
-                
-                # Probar little endian y big endian
-                for endian in ['<', '>']:
-                    try:
-                        isize, fsize, nfree = struct.unpack(f'{endian}HHH', sb_data[:6])
-                        
-                        # Validaciones más flexibles para diferentes versiones Unix
-                        if (1 <= isize <= 2000 and          # Área de inodos razonable
-                            fsize > isize and               # Tamaño total mayor
-                            0 <= nfree <= 200 and           # Bloques libres razonables
-                            fsize < 200000 and              # No demasiado grande
-                            isize * INODE_SIZE <= file_size): # Inodos caben en imagen
-                            
-                            # Buscar inode root en diferentes posiciones
-                            root_positions = [
-                                BLOCK_SIZE * 2,              # V6 estándar
-                                sb_offset + SUPERBLOCK_SIZE, # Inmediatamente después del superblock
-                                BLOCK_SIZE * (2 + isize),    # Después del área de inodos
-                            ]
-                            
-                            for root_pos in root_positions:
-                                if root_pos + INODE_SIZE <= file_size:
-                                    try:
-                                        f.seek(root_pos)
-                                        root_data = f.read(INODE_SIZE)
-                                        
-                                        if len(root_data) == INODE_SIZE:
-                                            # Probar parsear como inode
-                                            params = struct.unpack(f'{endian}HBBBBH8HHHH', root_data)
-                                            flag = params[0]
-                                            
-                                            # Verificar si parece un directorio root válido
-                                            is_allocated = bool(flag & 0x8000)
-                                            is_directory = bool((flag & 0x4000) == 0x4000)
-                                            
-                                            if is_allocated and is_directory:
-                                                version = "V6" if sb_offset == BLOCK_SIZE else "V5/V7"
-                                                return True, f"Unix {version} filesystem detected (isize={isize}, fsize={fsize}, endian={endian})" 
-                                                
-                                    except:
-                                        continue
-                                        
-                    except:
-                        continue
-            
-            # Detección alternativa: buscar patrones típicos de Unix
-            f.seek(0)
-            header = f.read(4096)
-            
-            # Buscar strings típicos de Unix en los primeros bloques
-            if any(pattern in header for pattern in [b'bin', b'etc', b'usr', b'dev', b'tmp']):
-                return True, "Unix filesystem detected (pattern-based detection)"
-                        
-        return False, "Not a valid Unix filesystem"
-        
-    except Exception as e:
+        results = detect(image_path, fs_types=("unix",))
+    except OSError as e:
         return False, f"Error reading image: {e}"
+    if results:
+        return True, results[0].description
+    return False, "Not a valid Unix filesystem"
 
 def main():
     parser = argparse.ArgumentParser(
@@ -697,6 +936,14 @@ Examples:
                        help="Verbose output")
     parser.add_argument("--detect-only", action="store_true",
                        help="Only detect filesystem type")
+    parser.add_argument("--format", choices=["text", "jsonl"], default="text",
+                       help="Listing format: jsonl streams one JSON object per entry "
+                            "of the whole volume (implies -l)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                       help="Files copied in parallel (default: one per CPU)")
+    parser.add_argument("--io-order", choices=IO_ORDERS, default="plan",
+                       help="Order of image reads: 'plan' copies file by file, 'block' reads "
+                            "all extents in ascending block order (fewer seeks on slow media)")
     
     args = parser.parse_args()
     
@@ -717,44 +964,55 @@ Examples:
             print("This image does not contain a valid Unix PDP-11 filesystem")
             return 1
         
-        if args.verbose:
+        if args.verbose and args.format != "jsonl":
             print(f"✅ {description}")
         
+        # Listado estructurado: un objeto JSON por entrada, a medida que se recorre el árbol
+        if args.format == "jsonl":
+            from dec_extract import open_image, write_jsonl
+            with open_image(args.image, "unix") as volume:
+                write_jsonl(volume)
+            return 0
+        
         # Cargar filesystem
         fs = UnixV6FileSystem(args.image, args.verbose)
         
-        if args.list:
-            # Listar archivos
-            if args.recursive:
-                # Listado recursivo - mostrar todos los archivos con paths completos
-                fs.list_files_recursive(args.path, args.detailed)
+        try:
+            if args.list:
+                # Listar archivos
+                if args.recursive:
+                    # Listado recursivo - mostrar todos los archivos con paths completos
+                    fs.list_files_recursive(args.path, args.detailed)
+                else:
+                    fs.list_files(args.path, args.detailed)
             else:
-                fs.list_files(args.path, args.detailed)
-        else:
-            # Extraer archivos
-            output_path = Path(args.output)
-            output_path.mkdir(exist_ok=True)
+                # Extraer archivos
+                output_path = Path(args.output)
+                output_path.mkdir(exist_ok=True)
             
-            target_inode = fs.find_path(args.path)
-            if not target_inode:
-                print(f"❌ Path not found: {args.path}")
-                return 1
+                target_inode = fs.find_path(args.path)
+                if not target_inode:
+                    print(f"❌ Path not found: {args.path}")
+                    return 1
             
-            print(f"[EXTRACT] Extracting Unix files from {args.path} to {output_path}")
+                print(f"[EXTRACT] Extracting Unix files from {args.path} to {output_path}")
             
-            if target_inode.is_dir():
-                extracted = fs.extract_directory(target_inode, output_path)
-                print(f"✅ Extracted {extracted} files successfully")
-            else:
-                # Extraer archivo individual
-                filename = Path(args.path).name
-                if fs.extract_file(target_inode, output_path, filename):
-                    print(f"✅ Extracted 1 file successfully")
+                if target_inode.is_dir():
+                    extracted = fs.extract_directory(target_inode, output_path, workers=args.jobs,
+                                                         io_order=args.io_order)
+                    print(f"✅ Extracted {extracted} files successfully")
                 else:
-                    print(f"❌ Failed to extract file")
-                    return 1
+                    # Extraer archivo individual
+                    filename = Path(args.path).name
+                    if fs.extract_file(target_inode, output_path, filename):
+                        print(f"✅ Extracted 1 file successfully")
+                    else:
+                        print(f"❌ Failed to extract file")
+                        return 1
         
-        return 0
+            return 0
+        finally:
+            fs.close()
         
     except KeyboardInterrupt:
         print("\\n❌ Operation cancelled")
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Block Device Layer for DEC Disk Images
+======================================
+
+A single read-only, memory-mapped view of a disk image shared by all the
+filesystem engines (RT-11, Unix V6, ODS-1, OS/8).
+
+Reads return ``memoryview`` slices into the mapping, so no data is copied
+until a caller actually needs ``bytes`` and the resident memory is the
+working set instead of the whole image.
+
+Whole-image properties that engines used to check on every read, such as
+which blocks are entirely zero, are computed in one pass on first use.
+
+Extents are written to output files by the kernel where it can
+(``copy_file_range``, else ``sendfile``), so contiguous file data never
+passes through Python buffers and can be reflinked by filesystems that
+support it. Padding past the end of the image, and any platform without
+those calls, goes through the ordinary byte copy. Set
+``DEC_EXTRACT_ZERO_COPY=0`` to always use the byte copy.
+"""
+
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_BLOCK_SIZE = 512
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_KERNEL_COPY = 1 << 30       # Bytes per copy_file_range/sendfile call
+
+ZERO_COPY = os.environ.get("DEC_EXTRACT_ZERO_COPY", "1").lower() not in ("0", "off", "no", "false")
+
+
+def _kernel_copy_method() -> Optional[str]:
+    """Best in-kernel file-to-file copy call of this platform, or None"""
+    if not ZERO_COPY:
+        return None
+    if hasattr(os, 'copy_file_range'):
+        return 'copy_file_range'
+    if hasattr(os, 'sendfile'):
+        return 'sendfile'
+    return None
+
+
+def _write_all(fd: int, data) -> None:
+    view = memoryview(data)
+    while len(view):
+        view = view[os.write(fd, view):]
+
+
+class BlockSet:
+    """Immutable set of block numbers with sorted range queries"""
+
+    def __init__(self, blocks: Iterable[int] = ()):
+        self._sorted = array('q', sorted(blocks))
+        self._members = frozenset(self._sorted)
+
+    def __contains__(self, block_num: int) -> bool:
+        return block_num in self._members
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._sorted)
+
+    def in_range(self, start_block: int, count: int) -> List[int]:
+        """Members in [start_block, start_block + count), in ascending order"""
+        low = bisect_left(self._sorted, start_block)
+        high = bisect_left(self._sorted, start_block + count, low)
+        return self._sorted[low:high].tolist()
+
+
+class BlockDevice:
+    """Read-only, zero-copy access to a disk image through ``mmap``"""
+
+    def __init__(self, path: Union[str, Path], block_size: int = DEFAULT_BLOCK_SIZE):
+        self.path = Path(path)
+        self.block_size = block_size
+        self._file = open(self.path, 'rb')
+        self._mmap = None
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._buffer = self._mmap
+        except (ValueError, OSError):
+            # Empty files and some special files cannot be mapped
+            self._buffer = self._file.read()
+        self._view = memoryview(self._buffer)
+        self.size = len(self._view)
+        self._zero_blocks: Optional[BlockSet] = None
+        self._copy_method = _kernel_copy_method()
+
+    def __enter__(self) -> 'BlockDevice':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def block_count(self) -> int:
+        """Number of complete blocks in the image"""
+        return self.size // self.block_size
+
+    @property
+    def buffer(self):
+        """The underlying buffer (``mmap`` or ``bytes``), for ``find`` and friends"""
+        return self._buffer
+
+    @property
+    def view(self) -> memoryview:
+        """A ``memoryview`` over the whole image"""
+        return self._view
+
+    def read(self, offset: int, length: int) -> memoryview:
+        """
+        Return a view of ``length`` bytes at ``offset``
+
+        The view is shorter than requested when it runs past the end of the
+        image, and empty when ``offset`` is out of range.
+        """
+        if offset < 0:
+            return self._view[0:0]
+        return self._view[offset:offset + length]
+
+    def read_block(self, block_num: int) -> memoryview:
+        """Return a view of block ``block_num`` (short or empty past the end)"""
+        return self.read(block_num * self.block_size, self.block_size)
+
+    def zero_blocks(self) -> BlockSet:
+        """
+        Blocks whose contents are entirely zero (computed once per device)
+
+        The scan is a single pass over the image: vectorised through NumPy
+        when it is installed, otherwise one ``memcmp`` per block.
+        """
+        if self._zero_blocks is None:
+            count = self.block_count
+            if np is not None and count and self.block_size % 8 == 0:
+                words = np.frombuffer(self._buffer, dtype=np.uint64,
+                                      count=count * self.block_size // 8)
+                used = words.reshape(count, self.block_size // 8).any(axis=1)
+                zero = np.flatnonzero(~used).tolist()
+                del words, used
+            else:
+                buffer, size = self._buffer, self.block_size
+                empty = bytes(size)
+                zero = [block for block, offset in enumerate(range(0, count * size, size))
+                        if buffer[offset:offset + size] == empty]
+            self._zero_blocks = BlockSet(zero)
+        return self._zero_blocks
+
+    def read_blocks(self, start_block: int, count: int) -> memoryview:
+        """Return a view of ``count`` consecutive blocks starting at ``start_block``"""
+        return self.read(start_block * self.block_size, count * self.block_size)
+
+    def read_runs(self, runs: Iterable[Tuple[int, int]],
+                  length: Optional[int] = None) -> bytearray:
+        """
+        Assemble ``(start_block, count)`` runs into one preallocated buffer
+
+        Each run is copied with a single slice assignment, so the cost is
+        linear in the file size. Blocks past the end of the image read as
+        zeros.
+
+        Args:
+            runs: Extents in file order, as returned by coalesce_blocks()
+            length: Optional byte length to truncate the result to
+
+        Returns:
+            bytearray holding the file contents
+        """
+        runs = list(runs)
+        total = sum(count for _, count in runs) * self.block_size
+        if length is not None:
+            total = min(total, max(length, 0))
+        buffer = bytearray(total)
+        position = 0
+        for start, count in runs:
+            if position >= total:
+                break
+            wanted = min(count * self.block_size, total - position)
+            chunk = self.read(start * self.block_size, wanted)
+            buffer[position:position + len(chunk)] = chunk
+            position += wanted
+        return buffer
+
+    def iter_runs(self, runs: Iterable[Tuple[int, int]], length: Optional[int] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[memoryview]:
+        """
+        Stream ``(start_block, count)`` runs as views of at most ``chunk_size`` bytes
+
+        Nothing is copied: every chunk is a slice of the mapping, so memory
+        use is bounded by the chunk size whatever the file size. Blocks past
+        the end of the image are yielded as zeros.
+
+        Args:
+            runs: Extents in file order
+            length: Optional byte length to stop after
+            chunk_size: Maximum size of each yielded chunk
+
+        Returns:
+            Iterator of memoryview chunks
+        """
+        chunk_size = max(chunk_size, 1)
+        remaining = None if length is None else max(length, 0)
+        for start, count in runs:
+            offset = start * self.block_size
+            run_bytes = count * self.block_size
+            if remaining is not None:
+                run_bytes = min(run_bytes, remaining)
+                remaining -= run_bytes
+            while run_bytes > 0:
+                wanted = min(chunk_size, run_bytes)
+                chunk = self.read(offset, wanted)
+                if len(chunk) < wanted:
+                    chunk = memoryview(bytes(chunk) + bytes(wanted - len(chunk)))
+                yield chunk
+                offset += wanted
+                run_bytes -= wanted
+            if remaining == 0:
+                return
+
+    def _kernel_copy(self, out_fd: int, offset: int, count: int) -> int:
+        """
+        Copy ``count`` image bytes at ``offset`` to ``out_fd`` inside the kernel
+
+        Returns the number of bytes copied, which is short (possibly zero)
+        when the platform or the filesystems involved refuse the call; the
+        method that failed is not tried again on this device.
+        """
+        copied = 0
+        while copied < count and self._copy_method is not None:
+            wanted = min(count - copied, MAX_KERNEL_COPY)
+            try:
+                if self._copy_method == 'copy_file_range':
+                    done = os.copy_file_range(self._file.fileno(), out_fd, wanted, offset + copied)
+                else:
+                    done = os.sendfile(out_fd, self._file.fileno(), offset + copied, wanted)
+            except OSError:
+                # EXDEV, ENOSYS, EINVAL...: fall back to sendfile, then to the byte copy
+                if self._copy_method == 'copy_file_range' and hasattr(os, 'sendfile'):
+                    self._copy_method = 'sendfile'
+                else:
+                    self._copy_method = None
+                continue
+            if done <= 0:
+                break
+            copied += done
+        return copied
+
+    def copy_runs(self, runs: Iterable[Tuple[int, int]], out_fd: int,
+                  length: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Write ``(start_block, count)`` runs to a file descriptor at its current position
+
+        The part of each run inside the image is copied by the kernel when
+        possible; whatever it does not copy, and blocks past the end of the
+        image (written as zeros), go through the byte copy of ``iter_runs``.
+
+        Args:
+            runs: Extents in file order
+            out_fd: Output file descriptor, opened for writing
+            length: Optional byte length to stop after
+            chunk_size: Size of each write of the byte copy
+
+        Returns:
+            Number of bytes written
+        """
+        chunk_size = max(chunk_size, 1)
+        remaining = None if length is None else max(length, 0)
+        written = 0
+        for start, count in runs:
+            offset = start * self.block_size
+            run_bytes = count * self.block_size
+            if remaining is not None:
+                run_bytes = min(run_bytes, remaining)
+                remaining -= run_bytes
+            in_image = min(run_bytes, self.size - offset) if offset >= 0 else 0
+            position = offset
+            if in_image > 0 and self._copy_method is not None:
+                position += self._kernel_copy(out_fd, offset, in_image)
+            end = offset + run_bytes
+            while position < end:
+                wanted = min(chunk_size, end - position)
+                chunk = self.read(position, wanted)
+                if len(chunk) < wanted:
+                    chunk = bytes(chunk) + bytes(wanted - len(chunk))
+                _write_all(out_fd, chunk)
+                position += wanted
+            written += run_bytes
+            if remaining == 0:
+                break
+        return written
+
+    def close(self) -> None:
+        """Release the mapping and the file handle"""
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                pass
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Slices handed out to callers are still alive; the mapping
+                # is released together with the last of them.
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def coalesce_blocks(blocks: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Merge a file's block list into ``(start_block, count)`` runs
+
+    Adjacent block numbers collapse into one run; order is preserved, so a
+    fragmented file keeps its logical layout.
+
+    Args:
+        blocks: Block numbers in file order
+
+    Returns:
+        List of (start_block, count) tuples
+    """
+    runs: List[Tuple[int, int]] = []
+    start = previous = None
+    for block in blocks:
+        if previous is not None and block == previous + 1:
+            previous = block
+            continue
+        if start is not None:
+            runs.append((start, previous - start + 1))
+        start = previous = block
+    if start is not None:
+        runs.append((start, previous - start + 1))
+    return runs
+
+
+def coalesce_runs(runs: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Merge consecutive ``(start_block, count)`` runs that touch each other
+
+    Args:
+        runs: Extents in file order
+
+    Returns:
+        List of (start_block, count) tuples with adjacent extents joined
+    """
+    merged: List[Tuple[int, int]] = []
+    for start, count in runs:
+        if count <= 0:
+            continue
+        if merged and merged[-1][0] + merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], merged[-1][1] + count)
+        else:
+            merged.append((start, count))
+    return merged
+
+
+@contextmanager
+def open_device(source: Union[str, Path, BlockDevice],
+                block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[BlockDevice]:
+    """
+    Yield a BlockDevice for ``source``
+
+    An already open BlockDevice is passed through untouched; a path is mapped
+    for the duration of the ``with`` block.
+
+    Args:
+        source: Image path or an open BlockDevice
+        block_size: Block size used when opening a new device
+
+    Returns:
+        Context manager yielding the BlockDevice
+    """
+    if isinstance(source, BlockDevice):
+        yield source
+        return
+    device = BlockDevice(os.fspath(source), block_size)
+    try:
+        yield device
+    finally:
+        device.close()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Persistent Volume Catalog Cache
+===============================
+
+Parsed catalogs (detected filesystem type and every entry with its extents
+and dates) are stored as one JSON file per image in a central cache
+directory, so reopening an image that was already listed skips detection
+and directory parsing entirely.
+
+Images are keyed by a fingerprint that is cheap to compute on large
+images: size, modification time and a BLAKE2 hash of a sample of blocks
+(the head, where boot/home blocks, superblocks and directories live, plus
+blocks spread evenly across the rest of the image).
+
+Invalidation is versioned: a record is only used when its CATALOG_FORMAT
+matches this module and its engine version matches the ``catalog_version``
+of the volume type that produced it, so a parser fix is shipped by bumping
+that number.
+
+The cache lives in ``$DEC_EXTRACT_CACHE_DIR``, or
+``$XDG_CACHE_HOME/dec-image-extractor/catalogs`` (``~/.cache`` by default).
+Set ``DEC_EXTRACT_CACHE=0`` to disable it.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+CATALOG_FORMAT = 1          # Layout of the cache records themselves
+HEAD_BLOCKS = 64            # Leading blocks always hashed
+SAMPLE_BLOCKS = 16          # Further blocks hashed, evenly spread over the image
+MAX_RECORDS = 512           # Oldest records are pruned beyond this many
+
+BLOCK_SIZE = 512
+
+
+def default_cache_dir() -> Optional[Path]:
+    """Cache directory from the environment, or None when caching is disabled"""
+    if os.environ.get("DEC_EXTRACT_CACHE", "1").lower() in ("0", "off", "no", "false"):
+        return None
+    override = os.environ.get("DEC_EXTRACT_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "dec-image-extractor" / "catalogs"
+
+
+def image_fingerprint(path: Union[str, Path], head_blocks: int = HEAD_BLOCKS,
+                      samples: int = SAMPLE_BLOCKS) -> str:
+    """
+    Fast content fingerprint of an image: size + mtime + sampled-block hash
+
+    At most head_blocks + samples + 1 blocks are read, whatever the image size.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    total_blocks = (stat.st_size + BLOCK_SIZE - 1) // BLOCK_SIZE
+    with open(path, "rb") as f:
+        digest.update(f.read(min(head_blocks, total_blocks) * BLOCK_SIZE))
+        if total_blocks > head_blocks:
+            step = max(1, (total_blocks - head_blocks) // (samples + 1))
+            picks = list(range(head_blocks + step, total_blocks, step))[:samples]
+            for block in picks + [total_blocks - 1]:
+                f.seek(block * BLOCK_SIZE)
+                digest.update(f.read(BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+class CatalogCache:
+    """One JSON catalog record per image fingerprint in a cache directory"""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        self.directory = Path(directory) if directory else default_cache_dir()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _record_path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.json"
+
+    def load(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached record for a fingerprint, or None
+
+        Records written by another CATALOG_FORMAT, or unreadable ones, are misses.
+        The caller checks the engine version in record['version'].
+        """
+        if not self.enabled:
+            return None
+        try:
+            with open(self._record_path(fingerprint), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or record.get("format") != CATALOG_FORMAT:
+            return None
+        if record.get("fingerprint") != fingerprint:
+            return None
+        return record
+
+    def store(self, fingerprint: str, fs_type: str, version: int, entries: list) -> bool:
+        """
+        Write the catalog of an image (atomically; failures are not fatal)
+
+        Args:
+            fingerprint: image_fingerprint() of the image
+            fs_type: Filesystem type the entries were parsed as
+            version: catalog_version of the engine that parsed them
+            entries: JSON-serialisable entry dictionaries
+
+        Returns:
+            True if the record was written
+        """
+        if not self.enabled:
+            return False
+        record = {
+            "format": CATALOG_FORMAT,
+            "fingerprint": fingerprint,
+            "fs_type": fs_type,
+            "version": version,
+            "entries": entries,
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(record, f, separators=(",", ":"))
+                os.replace(tmp_name, self._record_path(fingerprint))
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError:
+            return False
+        self._prune()
+        return True
+
+    def invalidate(self, fingerprint: str) -> None:
+        """Drop the record of one image"""
+        if self.enabled:
+            try:
+                self._record_path(fingerprint).unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Drop every record"""
+        if self.enabled and self.directory.is_dir():
+            for record_path in self.directory.glob("*.json"):
+                try:
+                    record_path.unlink()
+                except OSError:
+                    pass
+
+    def _prune(self) -> None:
+        try:
+            records = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for record_path in records[:max(0, len(records) - MAX_RECORDS)]:
+            try:
+                record_path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Extraction Manifest
+===================
+
+One JSON Lines file per extraction, written next to the extracted files,
+holding the metadata of every file that used to go to a per-file sidecar:
+
+    {"type": "volume", "format": 1, "source": "disk.dsk", "filesystem": "rt11", ...}
+    {"type": "file", "path": "PIP.SAV", "status_word": 1024, "segment": 1, ...}
+    ...
+
+Records are buffered and written in batches, so an extraction of hundreds
+of files costs one extra file and a handful of writes. Front ends read it
+back with ``read_manifest`` / ``manifest_index`` and skip it when listing
+extracted files with ``is_manifest_file``.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+MANIFEST_NAME = "extraction_manifest.jsonl"
+MANIFEST_FORMAT = 1
+BATCH_RECORDS = 256     # File records buffered between writes
+
+
+def is_manifest_file(path: Union[str, Path]) -> bool:
+    """True for the manifest itself, so file listings can leave it out"""
+    return Path(path).name == MANIFEST_NAME
+
+
+class ManifestWriter:
+    """Streaming writer for the manifest of one output directory"""
+
+    def __init__(self, output_dir: Union[str, Path], source: Optional[Union[str, Path]] = None,
+                 filesystem: Optional[str] = None, append: bool = False,
+                 batch_records: int = BATCH_RECORDS, **volume_info: Any):
+        """
+        Args:
+            output_dir: Extraction directory; the manifest is MANIFEST_NAME inside it
+            source: Image the files come from
+            filesystem: Filesystem type of the image
+            append: Add to an existing manifest instead of starting a new one
+            batch_records: File records buffered before each write
+            volume_info: Extra fields for the volume record
+        """
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.batch_records = batch_records
+        self._pending: List[str] = []
+        self.count = 0
+
+        write_header = not (append and self.path.exists() and self.path.stat().st_size)
+        self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        if write_header:
+            header = {'type': 'volume', 'format': MANIFEST_FORMAT,
+                      'source': str(source) if source is not None else None,
+                      'filesystem': filesystem, 'created': datetime.now().isoformat()}
+            header.update(volume_info)
+            self._pending.append(json.dumps(header) + "\n")
+
+    def __enter__(self) -> 'ManifestWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Queue one file record (written with the next batch)"""
+        self._pending.append(json.dumps(dict(record, type='file')) + "\n")
+        self.count += 1
+        if len(self._pending) >= self.batch_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the queued records"""
+        if self._pending and self._file is not None:
+            self._file.write("".join(self._pending))
+            self._file.flush()
+            self._pending.clear()
+
+    def close(self) -> None:
+        """Write the remaining records and close the manifest"""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def read_manifest(location: Union[str, Path]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Read a manifest back
+
+    Args:
+        location: The manifest file, or the extraction directory holding it
+
+    Returns:
+        (last volume record or None, file records in order); a missing
+        manifest gives (None, [])
+    """
+    path = Path(location)
+    if path.is_dir():
+        path = path / MANIFEST_NAME
+    volume, files = None, []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                if record.get('type') == 'volume':
+                    volume = record
+                elif record.get('type') == 'file':
+                    files.append(record)
+    except FileNotFoundError:
+        pass
+    return volume, files
+
+
+def manifest_index(location: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """File records of a manifest keyed by their path relative to the output directory"""
+    return {record['path']: record for record in read_manifest(location)[1] if 'path' in record}
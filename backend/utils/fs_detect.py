@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Filesystem Detection for DEC Disk Images
+========================================
+
+One detector for every front end. The first DETECT_BLOCKS blocks of the
+image are read once, every registered probe inspects that buffer, and the
+results come back ranked by confidence. Detection therefore costs one
+bounded read whatever the size of the image.
+
+Probes are plain functions registered per filesystem type:
+
+    @register_probe("mytype")
+    def probe_mytype(head: bytes, image_size: int) -> Optional[Detection]:
+        ...
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+BLOCK_SIZE = 512
+DETECT_BLOCKS = 100          # 50 KB: covers the RT-11 directory search window
+MIN_CONFIDENCE = 0.1
+
+
+@dataclass
+class Detection:
+    """One probe's verdict on an image"""
+    fs_type: str             # 'rt11', 'unix', 'ods1', 'os8'
+    confidence: float        # 0.0 - 1.0
+    description: str
+
+
+Probe = Callable[[bytes, int], Optional[Detection]]
+
+PROBES: Dict[str, Probe] = {}
+
+
+def register_probe(fs_type: str, probe: Optional[Probe] = None):
+    """
+    Register a probe for a filesystem type (usable as a decorator)
+
+    A probe receives the head of the image and the full image size, and
+    returns a Detection or None. Registering a type again replaces its probe.
+    """
+    def decorator(func: Probe) -> Probe:
+        PROBES[fs_type] = func
+        return func
+    if probe is not None:
+        return decorator(probe)
+    return decorator
+
+
+def _word(head: bytes, offset: int) -> int:
+    """Little-endian 16-bit word at offset (0 past the end of the buffer)"""
+    if offset + 2 > len(head):
+        return 0
+    return head[offset] | (head[offset + 1] << 8)
+
+
+@register_probe("ods1")
+def probe_ods1(head: bytes, image_size: int) -> Optional[Detection]:
+    """Files-11 ODS-1 home block at LBN 1"""
+    home = head[BLOCK_SIZE:2 * BLOCK_SIZE]
+    if len(home) < BLOCK_SIZE:
+        return None
+
+    bitmap_size = _word(home, 0)
+    bitmap_lbn = (_word(home, 2) << 16) | _word(home, 4)
+    max_files = _word(home, 6)
+    structure_level = _word(home, 12)
+
+    if structure_level not in (0x0101, 0x0102):
+        return None
+    if bitmap_size == 0 or bitmap_lbn == 0 or max_files == 0:
+        return None
+    if bitmap_lbn >= image_size // BLOCK_SIZE:
+        return None
+
+    confidence = 0.9
+    # First home block checksum: sum of the words before it
+    if sum(struct.unpack('<29H', home[:58])) & 0xFFFF == _word(home, 58):
+        confidence = 0.99
+
+    volume_name = bytes(home[14:26]).rstrip(b'\x00 ').decode('ascii', errors='ignore')
+    if volume_name:
+        description = f"ODS-1/Files-11 filesystem (Volume: {volume_name})"
+    else:
+        description = "ODS-1/Files-11 filesystem (RSX-11 or early VMS)"
+    return Detection("ods1", confidence, description)
+
+
+@register_probe("unix")
+def probe_unix(head: bytes, image_size: int) -> Optional[Detection]:
+    """Unix V6 superblock in block 1 and root directory inode"""
+    if len(head) >= 3 * BLOCK_SIZE:
+        isize, fsize, nfree = struct.unpack('<3H', head[BLOCK_SIZE:BLOCK_SIZE + 6])
+        root_flag = _word(head, 2 * BLOCK_SIZE)
+        root_is_dir = bool(root_flag & 0x8000) and (root_flag & 0x6000) == 0x4000
+
+        if (1 <= isize and fsize > isize + 2 and nfree <= 100 and
+                (2 + isize) * BLOCK_SIZE <= image_size and root_is_dir):
+            confidence = 0.9
+            # "." of the root directory, when its first block is in the buffer
+            root_block = _word(head, 2 * BLOCK_SIZE + 8)
+            entry = root_block * BLOCK_SIZE
+            if root_block and entry + 16 <= len(head):
+                if _word(head, entry) == 1 and head[entry + 2:entry + 4] == b'.\x00':
+                    confidence = 0.95
+            if fsize > image_size // BLOCK_SIZE:
+                confidence -= 0.2    # Truncated image or inconsistent superblock
+            return Detection("unix", confidence,
+                             f"Unix V6 filesystem detected (isize={isize}, fsize={fsize})")
+
+    # Weak evidence: typical Unix names in the first blocks
+    if any(pattern in head[:4096] for pattern in (b'bin', b'etc', b'usr', b'dev', b'tmp')):
+        return Detection("unix", 0.2, "Unix filesystem detected (pattern-based detection)")
+    return None
+
+
+def _rt11_segment_ok(head: bytes, offset: int) -> Optional[bool]:
+    """
+    Validate an RT-11 directory segment at offset
+
+    Returns None if the header is not plausible, False if the header is
+    plausible but the entries are not, True if the entries run cleanly to
+    an end-of-segment marker.
+    """
+    if offset + 10 > len(head):
+        return None
+    total, next_seg, highest, extra, start = struct.unpack('<5H', head[offset:offset + 10])
+    if not (1 <= total <= 31 and next_seg <= 31 and highest <= total and
+            extra % 2 == 0 and extra <= 100 and 0 < start < 10000):
+        return None
+
+    entry_size = 14 + extra
+    position = offset + 10
+    end = min(offset + 1024, len(head))
+    while position + 2 <= end:
+        status = _word(head, position)
+        if status & 0o4000:
+            return True
+        if not status & 0o3400:
+            return False
+        position += entry_size
+    return False
+
+
+@register_probe("rt11")
+def probe_rt11(head: bytes, image_size: int) -> Optional[Detection]:
+    """RT-11 home block and directory segment header"""
+    system_id = bytes(head[BLOCK_SIZE + 0o760:BLOCK_SIZE + 0o774])
+    has_signature = system_id.startswith(b'DECRT11')
+
+    # Standard layout: first directory segment named by the home block (block 6)
+    directory_block = _word(head, BLOCK_SIZE + 0o724) or 6
+    if directory_block * BLOCK_SIZE + 10 > len(head):
+        directory_block = 6
+    segment = _rt11_segment_ok(head, directory_block * BLOCK_SIZE)
+    if segment:
+        return Detection("rt11", 0.98 if has_signature else 0.85,
+                         "RT-11 filesystem detected (directory at block "
+                         f"{directory_block})")
+
+    # Other sector layouts (RX01, 256-byte sectors): search like the extractor does
+    for offset in range(0, min(len(head), 50000), 128):
+        if _rt11_segment_ok(head, offset):
+            return Detection("rt11", 0.6, f"RT-11 filesystem detected (directory at offset {offset})")
+
+    if has_signature or segment is False:
+        return Detection("rt11", 0.4, "RT-11 filesystem (directory not validated)")
+    if b'RT11' in head[:2 * BLOCK_SIZE] or b'RT-11' in head[:2 * BLOCK_SIZE]:
+        return Detection("rt11", 0.3, "RT-11 filesystem (pattern-based detection)")
+    return None
+
+
+@register_probe("os8")
+def probe_os8(head: bytes, image_size: int) -> Optional[Detection]:
+    """OS/8 directory in block 1, 12-bit words stored one per 16-bit word"""
+    block = head[BLOCK_SIZE:2 * BLOCK_SIZE]
+    if len(block) < BLOCK_SIZE:
+        return None
+
+    words = struct.unpack('<256H', block)
+    if any(word > 0o7777 for word in words):
+        return None
+
+    entries = (-words[0]) & 0o7777
+    first_block = words[1]
+    next_segment = words[2]
+    extra_words = (-words[4]) & 0o7777
+    if not (1 <= entries <= 64 and 0 < first_block < 0o7777 and
+            next_segment <= 6 and extra_words <= 16):
+        return None
+    return Detection("os8", 0.7, f"OS/8 filesystem detected ({entries} directory entries)")
+
+
+def read_head(image_path: Union[str, Path], blocks: int = DETECT_BLOCKS) -> Tuple[bytes, int]:
+    """Read the first blocks of an image in one call; returns (head, image size)"""
+    with open(image_path, 'rb') as f:
+        image_size = os.fstat(f.fileno()).st_size
+        return f.read(blocks * BLOCK_SIZE), image_size
+
+
+def detect(image_path: Union[str, Path], fs_types: Optional[Iterable[str]] = None,
+           blocks: int = DETECT_BLOCKS) -> List[Detection]:
+    """
+    Run the registered probes against the head of an image
+
+    Args:
+        image_path: Disk image file
+        fs_types: Restrict detection to these filesystem types
+        blocks: Number of blocks read for probing
+
+    Returns:
+        Detections ranked by decreasing confidence (empty if nothing matched)
+    """
+    head, image_size = read_head(image_path, blocks)
+    wanted = set(fs_types) if fs_types is not None else None
+
+    results = []
+    for fs_type, probe in PROBES.items():
+        if wanted is not None and fs_type not in wanted:
+            continue
+        try:
+            detection = probe(head, image_size)
+        except (struct.error, ValueError, IndexError):
+            continue
+        if detection and detection.confidence >= MIN_CONFIDENCE:
+            results.append(detection)
+
+    results.sort(key=lambda d: d.confidence, reverse=True)
+    return results
+
+
+def detect_filesystem(image_path: Union[str, Path]) -> Tuple[str, str]:
+    """
+    Most likely filesystem of an image
+
+    Returns:
+        (fs_type, description); fs_type is 'unknown' if no probe matched
+    """
+    try:
+        results = detect(image_path)
+    except OSError as e:
+        return "unknown", f"Error reading image: {e}"
+    if not results:
+        return "unknown", "Unknown filesystem type"
+    return results[0].fs_type, results[0].description
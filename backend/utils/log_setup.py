@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Logging Setup for the Extractors
+================================
+
+All engines log under the ``dec_extract`` logger hierarchy, configured once
+per process by ``configure_logging``:
+
+- console output goes to stdout (or a given stream) with a short format
+- a log file is only written when asked for, through the ``log_file``
+  argument or the ``DEC_EXTRACT_LOG_FILE`` environment variable
+- later calls only raise the verbosity or add a requested file; they never
+  stack up handlers
+
+Per-entry messages should use lazy ``%`` arguments (``logger.debug("%s",
+name)``) so nothing is formatted when the level discards them, and events
+that repeat per block or per entry are tallied in an ``EventCounter`` and
+reported once.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Dict, Optional, TextIO
+
+ROOT_LOGGER = "dec_extract"
+LOG_FILE_ENV = "DEC_EXTRACT_LOG_FILE"
+CONSOLE_FORMAT = "%(levelname)s - %(message)s"
+FILE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_lock = threading.Lock()
+_console: Optional[logging.Handler] = None
+_log_files: Dict[str, logging.Handler] = {}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger ``dec_extract.<name>``"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def configure_logging(verbose: bool = False, log_file: Optional[str] = None,
+                      stream: Optional[TextIO] = None) -> logging.Logger:
+    """
+    Configure the dec_extract loggers (idempotent)
+
+    Args:
+        verbose: Log DEBUG messages instead of INFO and above
+        log_file: Also write the log to this file (default: $DEC_EXTRACT_LOG_FILE, if set)
+        stream: Console stream for the first configuration (default: stdout)
+
+    Returns:
+        The root dec_extract logger
+    """
+    global _console
+    root = logging.getLogger(ROOT_LOGGER)
+    with _lock:
+        if _console is None:
+            _console = logging.StreamHandler(stream or sys.stdout)
+            _console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            root.addHandler(_console)
+            # Records stop here instead of reaching handlers of the application
+            root.propagate = False
+            root.setLevel(logging.INFO)
+        if verbose:
+            root.setLevel(logging.DEBUG)
+
+        log_file = log_file or os.environ.get(LOG_FILE_ENV)
+        if log_file and log_file not in _log_files:
+            handler = logging.FileHandler(log_file)
+            handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            root.addHandler(handler)
+            _log_files[log_file] = handler
+    return root
+
+
+class EventCounter:
+    """Tally of repetitive events, reported as one line per kind"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.first: Dict[str, str] = {}
+
+    def add(self, kind: str, count: int = 1, example: Optional[str] = None) -> None:
+        """Count occurrences of an event; the first example given is kept for the report"""
+        self.counts[kind] += count
+        if example is not None and kind not in self.first:
+            self.first[kind] = example
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def report(self, logger: logging.Logger, level: int = logging.WARNING) -> None:
+        """Log one line per event kind, then reset the counts"""
+        if logger.isEnabledFor(level):
+            for kind, count in self.counts.items():
+                example = self.first.get(kind)
+                if example:
+                    logger.log(level, "%s: %d (first: %s)", kind, count, example)
+                else:
+                    logger.log(level, "%s: %d", kind, count)
+        self.counts.clear()
+        self.first.clear()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Radix-50 Decoding for DEC Directory Structures
+==============================================
+
+Shared by the RT-11 and ODS-1 engines. Every 16-bit word is decoded through
+a 64K-entry lookup table built once per character set on first use, and
+directory segments are unpacked in one pass with ``struct.iter_unpack``
+instead of entry by entry.
+"""
+
+import struct
+from typing import Dict, Iterator, Tuple
+
+# RT-11 uses '?' for code 29 (unused in DEC's tables), Files-11 uses '_'
+RT11_CHARSET = ' ABCDEFGHIJKLMNOPQRSTUVWXYZ$.?0123456789'
+ODS1_CHARSET = ' ABCDEFGHIJKLMNOPQRSTUVWXYZ$._0123456789'
+
+RADIX50_LIMIT = 40 ** 3      # Words at or above 0o175000 are not valid Radix-50
+
+_tables: Dict[str, Tuple[str, ...]] = {}
+
+# RT-11 directory entry: status, name (3 words), length, job/channel, date
+RT11_ENTRY = struct.Struct('<7H')
+RT11_ENTRY_SIZE = RT11_ENTRY.size
+
+
+def decode_table(charset: str = RT11_CHARSET) -> Tuple[str, ...]:
+    """
+    The word -> 3-character table for a character set, built on first use
+
+    Words of 64000 and above wrap each character index modulo 40, which is
+    what the per-character loops this table replaces produced.
+    """
+    table = _tables.get(charset)
+    if table is None:
+        triples = [a + b + c for a in charset for b in charset for c in charset]
+        wrapped = [charset[(w // 1600) % 40] + charset[(w // 40) % 40] + charset[w % 40]
+                   for w in range(RADIX50_LIMIT, 0x10000)]
+        table = _tables[charset] = tuple(triples + wrapped)
+    return table
+
+
+def encode(text: str, charset: str = RT11_CHARSET) -> int:
+    """Encode up to 3 characters as a Radix-50 word (unknown characters become spaces)"""
+    result = 0
+    for char in text.upper().ljust(3)[:3]:
+        index = charset.find(char)
+        result = result * 40 + (index if index >= 0 else 0)
+    return result
+
+
+def decode_name(word1: int, word2: int, word3: int,
+                charset: str = RT11_CHARSET) -> Tuple[str, str]:
+    """RT-11 style 6.3 name from three words: (name, type), trailing spaces removed"""
+    table = decode_table(charset)
+    return ((table[word1] + table[word2]).rstrip(), table[word3].rstrip())
+
+
+def iter_rt11_entries(segment, entry_size: int = RT11_ENTRY_SIZE,
+                      offset: int = 10) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+    """
+    Unpack every directory entry of an RT-11 segment in one pass
+
+    The entries are read with ``struct.iter_unpack`` over the whole segment;
+    extra bytes per entry are skipped with pad bytes in the format.
+
+    Args:
+        segment: Segment data (bytes or memoryview), header included
+        entry_size: 14 plus the segment's extra bytes
+        offset: Offset of the first entry (after the 5-word header)
+
+    Returns:
+        Iterator of (offset, (status, name1, name2, type, length, job, date));
+        callers stop at the end-of-segment status themselves
+    """
+    count = (len(segment) - offset) // entry_size
+    if count <= 0:
+        return
+    if entry_size == RT11_ENTRY_SIZE:
+        unpacker = RT11_ENTRY
+    else:
+        unpacker = struct.Struct(f'<7H{entry_size - RT11_ENTRY_SIZE}x')
+    end = offset + count * entry_size
+    for words in unpacker.iter_unpack(segment[offset:end]):
+        yield offset, words
+        offset += entry_size
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+File Assembly Benchmark
+=======================
+
+Compares the old per-block ``data += block`` assembly with the coalesced
+run reader in backend/utils/block_device.py on a synthetic 10k-block file.
+
+Usage:
+    python3 benchmarks/bench_file_assembly.py [--blocks N] [--repeat N]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from utils.block_device import BlockDevice, coalesce_blocks
+
+BLOCK_SIZE = 512
+
+
+def make_image(path: Path, blocks: int) -> None:
+    """Write an image of ``blocks`` blocks with a distinct pattern per block"""
+    with open(path, 'wb') as f:
+        for block in range(blocks):
+            f.write(block.to_bytes(4, 'little') * (BLOCK_SIZE // 4))
+
+
+def fragmented_layout(blocks: int, seed: int = 11) -> list:
+    """Block list for a file split into short runs scattered over the image"""
+    rng = random.Random(seed)
+    runs = []
+    start = 0
+    while start < blocks:
+        length = min(rng.randint(1, 16), blocks - start)
+        runs.append(list(range(start, start + length)))
+        start += length
+    rng.shuffle(runs)
+    return [block for run in runs for block in run]
+
+
+def assemble_concat(device: BlockDevice, blocks: list) -> bytes:
+    """Old behaviour: one read and one bytes concatenation per block"""
+    data = b''
+    for block in blocks:
+        data += device.read_block(block)
+    return data
+
+
+def assemble_runs(device: BlockDevice, blocks: list) -> bytearray:
+    """New behaviour: coalesce into runs, copy each run once"""
+    return device.read_runs(coalesce_blocks(blocks))
+
+
+def best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark file assembly strategies")
+    parser.add_argument("--blocks", type=int, default=10000, help="File size in blocks (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions, best time is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image = Path(tmp) / 'synthetic.dsk'
+        make_image(image, args.blocks)
+
+        with BlockDevice(image) as device:
+            layouts = {
+                'contiguous': list(range(args.blocks)),
+                'fragmented': fragmented_layout(args.blocks),
+            }
+
+            print(f"Synthetic file: {args.blocks} blocks ({args.blocks * BLOCK_SIZE:,} bytes)")
+            print(f"{'Layout':<12} {'Runs':>6} {'concat (s)':>12} {'runs (s)':>12} {'Speedup':>9}")
+            print("-" * 55)
+
+            for name, blocks in layouts.items():
+                if assemble_concat(device, blocks) != assemble_runs(device, blocks):
+                    print(f"{name}: MISMATCH between strategies")
+                    return 1
+                concat = best_of(lambda: assemble_concat(device, blocks), args.repeat)
+                runs = best_of(lambda: assemble_runs(device, blocks), args.repeat)
+                print(f"{name:<12} {len(coalesce_blocks(blocks)):>6} {concat:>12.4f} {runs:>12.4f} "
+                      f"{concat / runs:>8.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -129,6 +129,21 @@ backend_path = setup_backend_path()
 rt11extract_path = get_rt11extract_cli_path()
 imd2raw_path = get_imd2raw_path()
 
+# API de extracción en proceso; el CLI queda como alternativa si no está disponible
+try:
+    from dec_extract import open_image
+except ImportError:
+    open_image = None
+
+try:
+    from utils.extract_manifest import is_manifest_file, manifest_index
+except ImportError:
+    def is_manifest_file(path):
+        return Path(path).name == "extraction_manifest.jsonl"
+    
+    def manifest_index(location):
+        return {}
+
 # Set script directory
 if getattr(sys, 'frozen', False):
     script_dir = Path(sys.executable).parent
@@ -325,7 +340,7 @@ class RT11ExtractGUI:
             messagebox.showerror("Error", "Please select a valid disk image file.")
             return
             
-        if not rt11extract_path.exists():
+        if open_image is None and not rt11extract_path.exists():
             messagebox.showerror("Error", "rt11extract not found.")
             return
         
@@ -348,6 +363,17 @@ class RT11ExtractGUI:
                 shutil.rmtree(self.temp_dir, ignore_errors=True)
             self.temp_dir = Path(tempfile.mkdtemp())
             
+            # Extraer en proceso: una sola lectura de la imagen, sin subprocesos
+            if open_image is not None:
+                try:
+                    with open_image(self.current_file) as volume:
+                        self.log(f"Detected filesystem: {volume.description}")
+                        extracted = volume.extract_all(self.temp_dir)
+                    self._load_entries(extracted, self.temp_dir)
+                    return
+                except Exception as e:
+                    self.log(f"In-process extraction failed ({e}), falling back to rt11extract")
+            
             # Use the rt11extract_path that was already configured correctly
             if not rt11extract_path or not rt11extract_path.exists():
                 raise FileNotFoundError(f"RT11 extractor not found at: {rt11extract_path}")
@@ -393,30 +419,88 @@ class RT11ExtractGUI:
             self.root.after(0, lambda: self.progress_bar.stop())
             self.root.after(0, lambda: self.progress_var.set("Ready"))
     
+    def _load_entries(self, extracted, output_dir):
+        """Build the file list from the (entry, path) pairs of Volume.extract_all()"""
+        files = []
+        directories = []
+        listed = set()
+        for entry, path in extracted:
+            if path is None:
+                self.log(f"Warning: Could not extract {entry.path}")
+                continue
+            
+            if entry.is_dir:
+                directories.append({
+                    'name': entry.path + '/',  # Agregar / para indicar directorio
+                    'size': '',
+                    'date': entry.date or '',
+                    'path': path,
+                    'type': 'directory'
+                })
+            else:
+                # Ruta real de salida (las versiones repetidas llevan sufijo _N); un
+                # enlace duro registrado en el manifiesto comparte los datos de otro
+                # archivo ya listado y se muestra con su propio nombre
+                name = entry.path if path in listed else path.relative_to(output_dir).as_posix()
+                listed.add(path)
+                size = path.stat().st_size
+                files.append({
+                    'name': name,  # Ruta completa para preservar estructura
+                    'size': f"{size:,} bytes",
+                    'date': entry.date or '',
+                    'path': path,
+                    'type': 'file'
+                })
+        
+        # Update UI (directorios al final)
+        self.current_files = files + directories
+        self.root.after(0, self._update_files_ui)
+    
     def _parse_extracted_files(self):
         """Parse the extracted files preserving directory structure"""
         if not self.temp_dir or not self.temp_dir.exists():
             return
 
+        # Registros del manifiesto de extracción: fechas originales, estado y enlaces
+        records = manifest_index(self.temp_dir)
+        
         files = []
         # Primero procesar archivos
         for path in self.temp_dir.rglob('*'):
-            if path.is_file():
+            if path.is_file() and not is_manifest_file(path):
                 # Calcular ruta relativa desde temp_dir para preservar estructura
                 rel_path = path.relative_to(self.temp_dir)
                 display_name = str(rel_path)  # Mostrar ruta completa para preservar estructura
+                record = records.get(rel_path.as_posix(), {})
+                if record.get('blocks_failed'):
+                    self.log(f"Warning: {display_name}: {record['blocks_failed']} unreadable blocks")
                 
                 size = path.stat().st_size
-                date = datetime.fromtimestamp(path.stat().st_mtime)
+                dates = record.get('dates') or {}
+                date = dates.get('created') or dates.get('modified')
+                if not date:
+                    date = datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
                 
                 files.append({
                     'name': display_name,
                     'size': f"{size:,} bytes",
-                    'date': date.strftime("%Y-%m-%d %H:%M:%S"),
+                    'date': date,
                     'path': path,
                     'type': 'file'
                 })
         
+        # Enlaces duros que el destino no admitió: el nombre apunta a los datos ya extraídos
+        for rel_name, record in records.items():
+            target = self.temp_dir / record.get('link_to', '')
+            if 'link_to' in record and target.is_file() and not (self.temp_dir / rel_name).exists():
+                files.append({
+                    'name': rel_name,
+                    'size': f"{target.stat().st_size:,} bytes",
+                    'date': datetime.fromtimestamp(target.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+                    'path': target,
+                    'type': 'file'
+                })
+        
         # Luego procesar directorios para mantenerlos al final
         for path in self.temp_dir.rglob('*'):
             if path.is_dir():
@@ -499,6 +583,22 @@ class RT11ExtractGUI:
             self.progress_bar.config(mode='indeterminate')
             self.progress_bar.start()
             
+            # Extraer en proceso si la API está disponible
+            if open_image is not None:
+                try:
+                    with open_image(self.current_file) as volume:
+                        extracted = volume.extract_all(self.output_dir)
+                    failed = [entry.path for entry, path in extracted if path is None]
+                    if failed:
+                        self.root.after(0, lambda: messagebox.showwarning("Warning",
+                            f"Files extracted to:\n{self.output_dir}\n\nCould not extract: {', '.join(failed)}"))
+                    else:
+                        self.root.after(0, lambda: messagebox.showinfo("Success", 
+                            f"Files extracted to:\n{self.output_dir}"))
+                    return
+                except Exception as e:
+                    self.log(f"In-process extraction failed ({e}), falling back to rt11extract")
+            
             # Use the rt11extract_path that was already configured correctly
             if not rt11extract_path or not rt11extract_path.exists():
                 raise FileNotFoundError(f"RT11 extractor not found at: {rt11extract_path}")
@@ -4,7 +4,6 @@ import http.server
 import socketserver
 import urllib.parse
 import json
-import subprocess
 import os
 import sys
 import tempfile
@@ -24,16 +23,11 @@ backend_path = script_dir / "backend"
 sys.path.insert(0, str(backend_path))
 
 from image_converters.imd2raw import IMDConverter, DiskImageValidator
+from dec_extract import open_image, VolumeError
 
 # Global variables
 current_operations = {}
 
-# Use same rt11extract path as GUI desktop
-if sys.platform.startswith('win'):
-    rt11extract_path = script_dir / "backend" / "extractors" / "RT11Extract.exe"
-else:
-    rt11extract_path = script_dir / "backend" / "extractors" / "rt11extract"
-
 # HTML Template (same as before but updated)
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en">
@@ -452,21 +446,6 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
 '''
 
 
-def get_subprocess_kwargs():
-    """Get subprocess kwargs for platform compatibility (same as GUI)"""
-    kwargs = {
-        'capture_output': True,
-        'text': True,
-        'cwd': str(script_dir)
-    }
-    
-    # Windows-specific: hide console
-    if sys.platform == "win32":
-        kwargs['creationflags'] = 0x08000000  # CREATE_NO_WINDOW
-    
-    return kwargs
-
-
 def get_file_description_with_path(filename, rel_path):
     """Get file type description based on extension and path (for Unix files)"""
     # Check if it's in a Unix system directory
@@ -523,378 +502,113 @@ def get_file_description_with_path(filename, rel_path):
     return descriptions.get(ext, f'{ext} File' if ext else 'Unknown Type')
 
 
-def parse_extracted_files(scan_dir, output, list_result=None):
-    """Parse extracted files - exact copy of GUI logic"""
+def build_file_list(extracted, output_dir):
+    """Build the file table from the (entry, path) pairs returned by Volume.extract_all()"""
     files = []
+    directories = []
+    listed = set()
     
-    # Parse the extraction output to get dates (RT-11 style)
-    date_map = {}
-    # Parse FILE_INFO lines for ODS-1 format
-    ods1_info_map = {}
-    
-    if output:
-        lines = output.split('\n')
-        for line in lines:
-            line = line.strip()
-            
-            # Parse ODS-1 FILE_INFO lines: "FILE_INFO: filename|size_blocks|size_bytes|file_type|creation_date|display_path"
-            if "FILE_INFO:" in line:
-                try:
-                    parts = line.split("FILE_INFO:", 1)
-                    if len(parts) == 2:
-                        info_str = parts[1].strip()
-                        info_parts = info_str.split('|')
-                        
-                        if len(info_parts) >= 5:
-                            filename = info_parts[0]
-                            size_blocks = int(info_parts[1]) if info_parts[1].isdigit() else 0
-                            size_bytes = int(info_parts[2]) if info_parts[2].isdigit() else 0
-                            file_type = info_parts[3]
-                            creation_date = info_parts[4]
-                            
-                            ods1_info_map[filename] = {
-                                'size_blocks': size_blocks,
-                                'size_bytes': size_bytes,
-                                'file_type': file_type,
-                                'creation_date': creation_date,
-                                'display_path': info_parts[5] if len(info_parts) > 5 else filename
-                            }
-                            
-                except (ValueError, IndexError) as e:
-                    continue
-            
-            # Look for lines that show "Applied date YYYY-MM-DD to FILENAME" (RT-11 style)
-            elif "Applied date" in line and " to " in line:
-                try:
-                    parts = line.split()
-                    if len(parts) >= 5 and parts[0] == "Applied" and parts[1] == "date":
-                        date_str = parts[2]  # Should be YYYY-MM-DD format
-                        filename = parts[4]  # Should be the filename
-                        
-                        # Validate date format
-                        if '-' in date_str and len(date_str.split('-')) == 3:
-                            year, month, day = date_str.split('-')
-                            if (len(year) == 4 and len(month) == 2 and len(day) == 2 and
-                                year.isdigit() and month.isdigit() and day.isdigit()):
-                                date_map[filename] = date_str
-                except (ValueError, IndexError):
-                    continue
-    
-    # Parse Unix detailed listing if available (same as GUI)
-    unix_info_map = {}
-    if list_result and list_result.stdout:
-        lines = list_result.stdout.split('\n')
-        parsing_directory_data = False
+    for entry, path in extracted:
+        if path is None:
+            continue
         
-        for line in lines:
-            line = line.strip()
-            
-            # Skip header and separator lines
-            if ('Directory Listing:' in line or 
-                '================' in line or 
-                '----------------' in line or
-                'Permissions  Links' in line or
-                'Summary:' in line or
-                'Total size:' in line or
-                'Superblock info:' in line or
-                not line):
-                if 'Permissions  Links' in line:
-                    parsing_directory_data = True
-                continue
-            
-            # Look for actual file/directory entries in Unix format
-            if not parsing_directory_data:
-                if 'Full Path' in line and 'Type' in line and 'Size' in line and 'ModTime' in line:
-                    parsing_directory_data = True
-                continue
-            
-            if parsing_directory_data and line and not line.startswith('-'):
-                try:
-                    # Check if this is a valid data line (starts with /)
-                    if not line.startswith('/'):
-                        continue
-                        
-                    # Use regex-like parsing for the fixed-width format
-                    if len(line) >= 79:  # Minimum length for all fields
-                        full_path = line[:40].strip()      # e.g., "/bin/cat"
-                        file_type_raw = line[40:50].strip() # e.g., "File" or "Directory"
-                        size_str = line[50:59].strip()     # e.g., "152"
-                        modtime_str = line[59:78].strip()  # e.g., "1988-11-28 05:07:21"
-                        permissions = line[78:].strip()    # e.g., "aF...rwxr-xr-x"
-                        
-                        # Extract date and time from modtime_str
-                        if ' ' in modtime_str:
-                            date_part, time_part = modtime_str.split(' ', 1)
-                        else:
-                            date_part = modtime_str
-                            time_part = '00:00:00'
-                        
-                        # Extract just the filename from full path
-                        filename = full_path.split('/')[-1]
-                        
-                        # Parse size
-                        try:
-                            unix_size = int(size_str.replace(',', ''))
-                        except ValueError:
-                            unix_size = 0
-                        
-                        # Map file type
-                        if file_type_raw == 'Directory':
-                            file_type = 'Directory'
-                        elif file_type_raw == 'File':
-                            if 'x' in permissions:
-                                file_type = 'Executable'
-                            else:
-                                file_type = 'Regular File'
-                        else:
-                            file_type = file_type_raw
-                        
-                        # Parse date - already in good format (YYYY-MM-DD)
-                        date_str = date_part if date_part else 'N/A'
-                        
-                        # Store both simple filename and full path
-                        unix_info_map[filename] = {
-                            'type': file_type,
-                            'date': date_str,
-                            'size': unix_size,
-                            'permissions': permissions,
-                            'time': time_part,
-                            'full_path': full_path
-                        }
-                        
-                        # Also store by full path for better matching
-                        unix_info_map[full_path] = unix_info_map[filename]
-                        
-                except Exception as e:
-                    continue
-    
-    # Get files AND directories from directory - preserve directory structure for Unix filesystems
-    for file_path in scan_dir.rglob('*'):
-        if file_path.is_file() and not file_path.name.endswith('.rt11info'):
-            size_bytes = file_path.stat().st_size
-            size_blocks = (size_bytes + 511) // 512
-            
-            # Calculate relative path from scan_dir to preserve directory structure
-            rel_path = file_path.relative_to(scan_dir)
-            display_name = str(rel_path)  # Show full path for Unix files
-            simple_name = file_path.name
-            
-            # Check if we have ODS-1 info first (highest priority)
-            file_type = 'Unknown Type'
-            creation_date = 'N/A'
-            ods1_info = None
-            
-            # Try multiple matching strategies for ODS-1
-            if simple_name in ods1_info_map:
-                ods1_info = ods1_info_map[simple_name]
-            elif display_name in ods1_info_map:
-                ods1_info = ods1_info_map[display_name]
-            else:
-                # Try matching without version (ODS-1 files have versions like FILENAME.EXT;1)
-                for ods1_filename in ods1_info_map.keys():
-                    # Remove version from ODS-1 filename (everything after ';')
-                    ods1_name_no_version = ods1_filename.split(';')[0]
-                    if simple_name == ods1_name_no_version or display_name == ods1_name_no_version:
-                        ods1_info = ods1_info_map[ods1_filename]
-                        break
-            
-            if ods1_info:
-                # Use ODS-1 detailed information
-                file_type = ods1_info['file_type']
-                creation_date = ods1_info['creation_date']
-                # Use ODS-1 reported size ONLY if it's greater than 0, otherwise use actual file size
-                # This is critical for TSK files which show size 0 in FILE_INFO but have actual content
-                if ods1_info['size_bytes'] > 0:
-                    size_blocks = ods1_info['size_blocks']
-                    size_bytes = ods1_info['size_bytes']
-            else:
-                # Check if we have Unix detailed info by trying multiple matches
-                parent_dir = rel_path.parent.name if rel_path.parent != Path('.') else ''
-                
-                unix_info = None
-                # Try different matching strategies
-                if simple_name in unix_info_map:
-                    unix_info = unix_info_map[simple_name]
-                elif parent_dir and parent_dir in unix_info_map:
-                    # Use parent directory info but mark as file in directory
-                    parent_info = unix_info_map[parent_dir]
-                    if parent_info['type'] == 'Directory':
-                        unix_info = {
-                            'type': get_file_description_with_path(simple_name, str(rel_path)),
-                            'date': parent_info['date'],
-                            'size': size_bytes,
-                            'permissions': 'inherited'
-                        }
-                elif display_name in unix_info_map:
-                    unix_info = unix_info_map[display_name]
-                
-                if unix_info:
-                    file_type = unix_info['type']
-                    creation_date = unix_info['date']
-                else:
-                    # Fallback to path-based detection and RT-11 date map
-                    file_type = get_file_description_with_path(file_path.name, str(rel_path))
-                    creation_date = date_map.get(file_path.name, 'N/A')
-            
-            files.append({
-                'filename': display_name,  # Use full relative path
-                'size_blocks': size_blocks,
-                'size_bytes': size_bytes,
-                'file_type': file_type,
-                'creation_date': creation_date,
-                'full_path': file_path  # Store full path for extraction
-            })
-    
-    # After processing files, also process directories for ODS-1
-    for dir_path in scan_dir.rglob('*'):
-        if dir_path.is_dir():
-            # Handle directories (especially ODS-1 user directories)
-            rel_path = dir_path.relative_to(scan_dir)
-            display_name = str(rel_path)  # Show full path for directories
-            simple_name = dir_path.name
-            
-            # Check if we have ODS-1 directory info
-            dir_type = 'Directory'
-            creation_date = 'N/A'
-            ods1_info = None
-            
-            # Try multiple matching strategies for ODS-1 directories
-            if simple_name in ods1_info_map:
-                ods1_info = ods1_info_map[simple_name]
-            elif display_name in ods1_info_map:
-                ods1_info = ods1_info_map[display_name]
-            else:
-                # Check for directory entries with DIR extension or ;1 version
-                for ods1_filename in ods1_info_map.keys():
-                    # Remove version from ODS-1 filename and check for .DIR extension
-                    ods1_name_no_version = ods1_filename.split(';')[0]
-                    ods1_base_name = ods1_name_no_version.replace('.DIR', '')
-                    
-                    if (simple_name == ods1_name_no_version or 
-                        simple_name == ods1_base_name or
-                        display_name == ods1_name_no_version or 
-                        display_name == ods1_base_name):
-                        ods1_info = ods1_info_map[ods1_filename]
-                        break
-            
-            if ods1_info:
-                # Use ODS-1 detailed information for directories
-                dir_type = ods1_info['file_type']
-                creation_date = ods1_info['creation_date']
+        if entry.is_dir:
+            simple_name = path.name
+            dir_type = entry.file_type or 'Directory'
             
             # For ODS-1, numeric directory names are UIC (User Identification Code) directories
-            if simple_name.isdigit() and len(simple_name) == 6:
+            if simple_name == '000000':
+                dir_type = 'Root Directory [UIC 0,0]'
+            elif simple_name.isdigit() and len(simple_name) == 6:
                 # Format like 001054 is UIC group 1, user 54 in octal
                 group = int(simple_name[:3], 8)  # First 3 digits are group (octal)
                 user = int(simple_name[3:], 8)   # Last 3 digits are user (octal)
                 dir_type = f'User Directory [UIC {group},{user}]'
-            elif simple_name == '000000':
-                dir_type = 'Root Directory [UIC 0,0]'
             
-            files.append({
-                'filename': display_name + '/',  # Add slash to indicate directory
+            directories.append({
+                'filename': entry.path + '/',  # Add slash to indicate directory
                 'size_blocks': 0,  # Directories don't have size
                 'size_bytes': 0,
                 'file_type': dir_type,
-                'creation_date': creation_date,
-                'full_path': dir_path  # Store full path for browsing
+                'creation_date': entry.date or 'N/A',
+                'full_path': path  # Store full path for browsing
+            })
+        else:
+            # Size of the data actually extracted (ODS-1 files recovered by
+            # heuristics have no size in their header)
+            size_bytes = path.stat().st_size
+            
+            # Real output path (repeated ODS-1 versions get a _N suffix); a hard
+            # link recorded in the manifest shares an earlier file's data and
+            # keeps its own name
+            filename = entry.path if path in listed else path.relative_to(output_dir).as_posix()
+            listed.add(path)
+            
+            files.append({
+                'filename': filename,  # Use full relative path
+                'size_blocks': (size_bytes + 511) // 512,
+                'size_bytes': size_bytes,
+                'file_type': entry.file_type or get_file_description_with_path(entry.name, entry.path),
+                'creation_date': entry.date or 'N/A',
+                'full_path': path  # Store full path for extraction
             })
     
-    return files
+    return files + directories
 
 
 def perform_scan(disk_file: str, operation):
-    """Perform the actual scan operation - exact copy of GUI logic"""
+    """Perform the actual scan operation in-process through dec_extract"""
     try:
         # Create temporary directory
         temp_dir = Path(tempfile.mkdtemp(prefix="rt11extract_"))
         operation['temp_dir'] = temp_dir
         operation['logs'].append(f"Created temporary directory: {temp_dir}")
         
-        # Create temporary directory for list operation
-        list_dir = temp_dir / 'list_output'
-        list_dir.mkdir(exist_ok=True)
-        
-        # First, try to get detailed listing for Unix files (using -l -d flags)
-        list_result = None
-        try:
-            if getattr(sys, 'frozen', False):
-                # Running as bundled executable
-                list_cmd = [str(rt11extract_path), disk_file, '-l', '-d', '-r', '-v']
-            else:
-                # Running as script
-                list_cmd = [sys.executable, str(rt11extract_path), disk_file, '-l', '-d', '-r', '-v']
-            
-            operation['logs'].append(f"Getting detailed file list: {' '.join(list_cmd)}")
-            list_result = subprocess.run(list_cmd, **get_subprocess_kwargs())
-            
-            if list_result.stdout:
-                operation['logs'].append("List output received")
-                
-        except Exception as e:
-            operation['logs'].append(f"Warning: Could not get detailed listing: {e}")
-        
-        # Then run rt11extract to actually extract files for verification
+        # Files are extracted for the download endpoints
         scan_dir = temp_dir / 'scan_output'
         scan_dir.mkdir(exist_ok=True)
         operation['output_dir'] = scan_dir
         
-        if getattr(sys, 'frozen', False):
-            # Running as bundled executable - run rt11extract directly
-            cmd = [str(rt11extract_path), disk_file, '-o', str(scan_dir), '-v']
-        else:
-            # Running as script - run rt11extract with python
-            cmd = [sys.executable, str(rt11extract_path), disk_file, '-o', str(scan_dir), '-v']
+        operation['logs'].append(f"Opening image: {disk_file}")
+        with open_image(disk_file) as volume:
+            filesystem_type = volume.description
+            operation['logs'].append(f"Detected filesystem: {filesystem_type}")
+            operation['status'] = "Extracting files..."
+            operation['progress'] = 50
+            
+            extracted = volume.extract_all(scan_dir)
         
-        operation['logs'].append(f"Running: {' '.join(cmd)}")
-        operation['status'] = "Extracting files..."
-        operation['progress'] = 50
+        for entry, path in extracted:
+            if path is None:
+                operation['logs'].append(f"Warning: Could not extract {entry.path}")
         
-        result = subprocess.run(cmd, **get_subprocess_kwargs())
+        operation['status'] = "Parsing extracted files..."
+        operation['progress'] = 75
         
-        if result.stdout:
-            operation['logs'].append("Extraction output received")
+        files = build_file_list(extracted, scan_dir)
+        operation['files'] = files
+        operation['logs'].append(f"Found {len(files)} files")
         
-        if result.stderr:
-            operation['logs'].append(f"Stderr: {result.stderr}")
+        # Calculate total size
+        total_size = sum(f['size_bytes'] for f in files if f['size_bytes'] > 0)
         
-        if result.returncode == 0:
-            operation['status'] = "Parsing extracted files..."
-            operation['progress'] = 75
-            
-            # Parse extracted files with detailed listing info
-            files = parse_extracted_files(scan_dir, result.stdout, list_result)
-            operation['files'] = files
-            operation['logs'].append(f"Found {len(files)} files")
-            
-            # Detect filesystem type from output
-            filesystem_type = "Unknown"
-            if "RT-11" in (result.stdout or ""):
-                filesystem_type = "RT-11"
-            elif "ODS-1" in (result.stdout or "") or "Files-11" in (result.stdout or ""):
-                filesystem_type = "RSX-11 (ODS-1)"
-            elif "Unix" in (result.stdout or ""):
-                filesystem_type = "Unix PDP-11"
-            
-            # Calculate total size
-            total_size = sum(f['size_bytes'] for f in files if f['size_bytes'] > 0)
-            
-            operation['file_info'] = {
-                'filesystem': filesystem_type,
-                'file_count': len(files),
-                'total_size': f"{total_size:,} bytes"
-            }
-            
-            operation['status'] = f"Scan completed successfully! Found {len(files)} files."
-            operation['progress'] = 100
-            operation['success'] = True
-            operation['completed'] = True
-            
-        else:
-            operation['status'] = f"Extraction failed with return code {result.returncode}"
-            operation['error'] = f"rt11extract failed with return code {result.returncode}"
-            operation['success'] = False
-            operation['completed'] = True
+        operation['file_info'] = {
+            'filesystem': filesystem_type,
+            'file_count': len(files),
+            'total_size': f"{total_size:,} bytes"
+        }
+        
+        operation['status'] = f"Scan completed successfully! Found {len(files)} files."
+        operation['progress'] = 100
+        operation['success'] = True
+        operation['completed'] = True
+        
+    except VolumeError as e:
+        operation['status'] = f"Extraction failed: {e}"
+        operation['error'] = str(e)
+        operation['success'] = False
+        operation['completed'] = True
+        operation['logs'].append(f"Error: {e}")
             
     except Exception as e:
         operation['status'] = f"Exception during scan: {str(e)}"
@@ -912,7 +626,8 @@ def create_zip_archive(operation):
     output_dir = operation['output_dir']
     zip_path = operation['temp_dir'] / 'extracted_files.zip'
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    # Original dates of PDP-11 files often predate 1980, the ZIP epoch
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, strict_timestamps=False) as zipf:
         for file_info in operation['files']:
             file_path = file_info['full_path']
             if file_path.is_file():
@@ -1085,15 +800,14 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
             return
         
         try:
-            with open(file_path, 'rb') as f:
-                file_data = f.read()
-            
+            # Stream the file instead of loading it into memory
             self.send_response(200)
             self.send_header('Content-type', 'application/octet-stream')
             self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-            self.send_header('Content-Length', str(len(file_data)))
+            self.send_header('Content-Length', str(file_path.stat().st_size))
             self.end_headers()
-            self.wfile.write(file_data)
+            with open(file_path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile)
             
         except Exception as e:
             self.send_error(500, f"Download error: {str(e)}")
@@ -1111,15 +825,13 @@ class RequestHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error(500, "Failed to create ZIP archive")
                 return
             
-            with open(zip_path, 'rb') as f:
-                zip_data = f.read()
-            
             self.send_response(200)
             self.send_header('Content-type', 'application/zip')
             self.send_header('Content-Disposition', 'attachment; filename="extracted_files.zip"')
-            self.send_header('Content-Length', str(len(zip_data)))
+            self.send_header('Content-Length', str(zip_path.stat().st_size))
             self.end_headers()
-            self.wfile.write(zip_data)
+            with open(zip_path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile)
             
         except Exception as e:
             self.send_error(500, f"ZIP creation error: {str(e)}")
@@ -1133,7 +845,7 @@ def main():
     print(f"🖥️ DEC Disk Image Extractor - Web Interface")
     print(f"📊 Supports: RT-11, RSX-11 (ODS-1), Unix PDP-11")
     print(f"🌐 Server starting on http://{HOST}:{PORT}")
-    print(f"🔧 Using extractor: {rt11extract_path}")
+    print(f"🔧 Using extraction API: {backend_path / 'dec_extract.py'}")
     print(f"\n🚀 Server ready on port {PORT}")
     print(f"📝 Press Ctrl+C to stop the server\n")
     
@@ -1144,510 +856,5 @@ def main():
             print("\n🛑 Server stopped")
 
 
-if __name__ == "__main__":
-    main()
-
-#!/usr/bin/env python3
-"""
-RT-11 Extract Simple - Replicates GUI logic without FUSE
-
-This script replicates the exact same logic as the GUI rt11extract_gui.py
-for scanning disk images and parsing file information, but without FUSE support.
-"""
-
-import sys
-import os
-import tempfile
-import subprocess
-from pathlib import Path
-import shutil
-from datetime import datetime
-
-# Add backend path to Python path for imports
-script_dir = Path(__file__).parent.parent.parent  # Go up to root from gui/web/
-backend_path = script_dir / "backend"
-sys.path.insert(0, str(backend_path))
-
-# Use same rt11extract path as GUI
-if sys.platform.startswith('win'):
-    rt11extract_path = script_dir / "backend" / "extractors" / "RT11Extract.exe"
-else:
-    rt11extract_path = script_dir / "backend" / "extractors" / "rt11extract"
-
-
-def get_subprocess_kwargs():
-    """Get subprocess kwargs for platform compatibility (same as GUI)"""
-    kwargs = {
-        'capture_output': True,
-        'text': True,
-        'cwd': str(script_dir)
-    }
-    
-    # Windows-specific: hide console
-    if sys.platform == "win32":
-        kwargs['creationflags'] = 0x08000000  # CREATE_NO_WINDOW
-    
-    return kwargs
-
-
-def get_file_description_with_path(filename, rel_path):
-    """Get file type description based on extension and path (for Unix files)"""
-    # Check if it's in a Unix system directory
-    path_lower = rel_path.lower()
-    
-    # Unix system directories
-    if path_lower.startswith('bin/'):
-        return 'Executable (bin)'
-    elif path_lower.startswith('etc/'):
-        return 'Configuration File'
-    elif path_lower.startswith('dev/'):
-        return 'Device File'
-    elif path_lower.startswith('lib/'):
-        return 'Library File'
-    elif path_lower.startswith('usr/'):
-        return 'User Program'
-    elif path_lower.startswith('tmp/'):
-        return 'Temporary File'
-    elif path_lower.startswith('man/'):
-        return 'Manual Page'
-    elif path_lower.startswith('doc/'):
-        return 'Documentation'
-    
-    # Extension-based descriptions
-    ext = filename.split('.')[-1].upper() if '.' in filename else ''
-    descriptions = {
-        'SAV': 'Executable Program',
-        'SYS': 'System File',
-        'TSK': 'Task Image',
-        'MAC': 'Macro Source',
-        'FOR': 'FORTRAN Source',
-        'BAS': 'BASIC Program',
-        'TXT': 'Text File',
-        'DAT': 'Data File',
-        'OBJ': 'Object File',
-        'REL': 'Relocatable Object',
-        'COM': 'Command File',
-        'CMD': 'Command File',
-        'OLB': 'Object Library',
-        'MLB': 'Macro Library',
-        'MAP': 'Map File',
-        'LST': 'Listing File',
-        'DIR': 'Directory'
-    }
-    return descriptions.get(ext, f'{ext} File' if ext else 'Unknown Type')
-
-
-def parse_extracted_files(scan_dir, output, list_result=None):
-    """Parse extracted files - exact copy of GUI logic"""
-    files = []
-    
-    # Parse the extraction output to get dates (RT-11 style)
-    date_map = {}
-    # Parse FILE_INFO lines for ODS-1 format
-    ods1_info_map = {}
-    
-    if output:
-        lines = output.split('\n')
-        for line in lines:
-            line = line.strip()
-            
-            # Parse ODS-1 FILE_INFO lines: "FILE_INFO: filename|size_blocks|size_bytes|file_type|creation_date|display_path"
-            if "FILE_INFO:" in line:
-                try:
-                    parts = line.split("FILE_INFO:", 1)
-                    if len(parts) == 2:
-                        info_str = parts[1].strip()
-                        info_parts = info_str.split('|')
-                        
-                        if len(info_parts) >= 5:
-                            filename = info_parts[0]
-                            size_blocks = int(info_parts[1]) if info_parts[1].isdigit() else 0
-                            size_bytes = int(info_parts[2]) if info_parts[2].isdigit() else 0
-                            file_type = info_parts[3]
-                            creation_date = info_parts[4]
-                            
-                            ods1_info_map[filename] = {
-                                'size_blocks': size_blocks,
-                                'size_bytes': size_bytes,
-                                'file_type': file_type,
-                                'creation_date': creation_date,
-                                'display_path': info_parts[5] if len(info_parts) > 5 else filename
-                            }
-                            
-                            print(f"Parsed ODS-1 info for {filename}: {file_type}, {creation_date}")
-                            
-                except (ValueError, IndexError) as e:
-                    print(f"Could not parse FILE_INFO line: '{line}' - {e}")
-                    continue
-            
-            # Look for lines that show "Applied date YYYY-MM-DD to FILENAME" (RT-11 style)
-            elif "Applied date" in line and " to " in line:
-                try:
-                    parts = line.split()
-                    if len(parts) >= 5 and parts[0] == "Applied" and parts[1] == "date":
-                        date_str = parts[2]  # Should be YYYY-MM-DD format
-                        filename = parts[4]  # Should be the filename
-                        
-                        # Validate date format
-                        if '-' in date_str and len(date_str.split('-')) == 3:
-                            year, month, day = date_str.split('-')
-                            if (len(year) == 4 and len(month) == 2 and len(day) == 2 and
-                                year.isdigit() and month.isdigit() and day.isdigit()):
-                                date_map[filename] = date_str
-                                print(f"Parsed RT-11 date for {filename}: {date_str}")
-                except (ValueError, IndexError):
-                    continue
-    
-    # Parse Unix detailed listing if available (same as GUI)
-    unix_info_map = {}
-    if list_result and list_result.stdout:
-        print("Parsing Unix detailed listing...")
-        lines = list_result.stdout.split('\n')
-        parsing_directory_data = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip header and separator lines
-            if ('Directory Listing:' in line or 
-                '================' in line or 
-                '----------------' in line or
-                'Permissions  Links' in line or
-                'Summary:' in line or
-                'Total size:' in line or
-                'Superblock info:' in line or
-                not line):
-                if 'Permissions  Links' in line:
-                    parsing_directory_data = True
-                continue
-            
-            # Look for actual file/directory entries in Unix format
-            if not parsing_directory_data:
-                if 'Full Path' in line and 'Type' in line and 'Size' in line and 'ModTime' in line:
-                    parsing_directory_data = True
-                continue
-            
-            if parsing_directory_data and line and not line.startswith('-'):
-                try:
-                    # Check if this is a valid data line (starts with /)
-                    if not line.startswith('/'):
-                        continue
-                        
-                    # Use regex-like parsing for the fixed-width format
-                    if len(line) >= 79:  # Minimum length for all fields
-                        full_path = line[:40].strip()      # e.g., "/bin/cat"
-                        file_type_raw = line[40:50].strip() # e.g., "File" or "Directory"
-                        size_str = line[50:59].strip()     # e.g., "152"
-                        modtime_str = line[59:78].strip()  # e.g., "1988-11-28 05:07:21"
-                        permissions = line[78:].strip()    # e.g., "aF...rwxr-xr-x"
-                        
-                        # Extract date and time from modtime_str
-                        if ' ' in modtime_str:
-                            date_part, time_part = modtime_str.split(' ', 1)
-                        else:
-                            date_part = modtime_str
-                            time_part = '00:00:00'
-                        
-                        # Extract just the filename from full path
-                        filename = full_path.split('/')[-1]
-                        
-                        # Parse size
-                        try:
-                            unix_size = int(size_str.replace(',', ''))
-                        except ValueError:
-                            unix_size = 0
-                        
-                        # Map file type
-                        if file_type_raw == 'Directory':
-                            file_type = 'Directory'
-                        elif file_type_raw == 'File':
-                            if 'x' in permissions:
-                                file_type = 'Executable'
-                            else:
-                                file_type = 'Regular File'
-                        else:
-                            file_type = file_type_raw
-                        
-                        # Parse date - already in good format (YYYY-MM-DD)
-                        date_str = date_part if date_part else 'N/A'
-                        
-                        # Store both simple filename and full path
-                        unix_info_map[filename] = {
-                            'type': file_type,
-                            'date': date_str,
-                            'size': unix_size,
-                            'permissions': permissions,
-                            'time': time_part,
-                            'full_path': full_path
-                        }
-                        
-                        # Also store by full path for better matching
-                        unix_info_map[full_path] = unix_info_map[filename]
-                        
-                        print(f"Parsed Unix file: {full_path} ({file_type}, {date_str}, {unix_size} bytes)")
-                        
-                except Exception as e:
-                    print(f"Could not parse Unix listing line: '{line}' - {e}")
-                    continue
-    
-    # Get files AND directories from directory - preserve directory structure for Unix filesystems
-    for file_path in scan_dir.rglob('*'):
-        if file_path.is_file() and not file_path.name.endswith('.rt11info'):
-            size_bytes = file_path.stat().st_size
-            size_blocks = (size_bytes + 511) // 512
-            
-            # Calculate relative path from scan_dir to preserve directory structure
-            rel_path = file_path.relative_to(scan_dir)
-            display_name = str(rel_path)  # Show full path for Unix files
-            simple_name = file_path.name
-            
-            # Check if we have ODS-1 info first (highest priority)
-            file_type = 'Unknown Type'
-            creation_date = 'N/A'
-            ods1_info = None
-            
-            # Try multiple matching strategies for ODS-1
-            if simple_name in ods1_info_map:
-                ods1_info = ods1_info_map[simple_name]
-            elif display_name in ods1_info_map:
-                ods1_info = ods1_info_map[display_name]
-            else:
-                # Try matching without version (ODS-1 files have versions like FILENAME.EXT;1)
-                for ods1_filename in ods1_info_map.keys():
-                    # Remove version from ODS-1 filename (everything after ';')
-                    ods1_name_no_version = ods1_filename.split(';')[0]
-                    if simple_name == ods1_name_no_version or display_name == ods1_name_no_version:
-                        ods1_info = ods1_info_map[ods1_filename]
-                        print(f"Matched {simple_name} to ODS-1 file {ods1_filename} (version removed)")
-                        break
-            
-            if ods1_info:
-                # Use ODS-1 detailed information
-                file_type = ods1_info['file_type']
-                creation_date = ods1_info['creation_date']
-                # Use ODS-1 reported size ONLY if it's greater than 0, otherwise use actual file size
-                # This is critical for TSK files which show size 0 in FILE_INFO but have actual content
-                if ods1_info['size_bytes'] > 0:
-                    size_blocks = ods1_info['size_blocks']
-                    size_bytes = ods1_info['size_bytes']
-                print(f"Using ODS-1 info for {display_name}: {file_type}, {creation_date}")
-            else:
-                # Check if we have Unix detailed info by trying multiple matches
-                parent_dir = rel_path.parent.name if rel_path.parent != Path('.') else ''
-                
-                unix_info = None
-                # Try different matching strategies
-                if simple_name in unix_info_map:
-                    unix_info = unix_info_map[simple_name]
-                elif parent_dir and parent_dir in unix_info_map:
-                    # Use parent directory info but mark as file in directory
-                    parent_info = unix_info_map[parent_dir]
-                    if parent_info['type'] == 'Directory':
-                        unix_info = {
-                            'type': get_file_description_with_path(simple_name, str(rel_path)),
-                            'date': parent_info['date'],
-                            'size': size_bytes,
-                            'permissions': 'inherited'
-                        }
-                elif display_name in unix_info_map:
-                    unix_info = unix_info_map[display_name]
-                
-                if unix_info:
-                    file_type = unix_info['type']
-                    creation_date = unix_info['date']
-                    print(f"Using Unix info for {display_name}: {file_type}, {creation_date}")
-                else:
-                    # Fallback to path-based detection and RT-11 date map
-                    file_type = get_file_description_with_path(file_path.name, str(rel_path))
-                    creation_date = date_map.get(file_path.name, 'N/A')
-                    print(f"Using fallback info for {display_name}: {file_type}, {creation_date}")
-            
-            files.append({
-                'filename': display_name,  # Use full relative path
-                'size_blocks': size_blocks,
-                'size_bytes': size_bytes,
-                'file_type': file_type,
-                'creation_date': creation_date,
-                'full_path': file_path  # Store full path for extraction
-            })
-    
-    # After processing files, also process directories for ODS-1
-    for dir_path in scan_dir.rglob('*'):
-        if dir_path.is_dir():
-            # Handle directories (especially ODS-1 user directories)
-            rel_path = dir_path.relative_to(scan_dir)
-            display_name = str(rel_path)  # Show full path for directories
-            simple_name = dir_path.name
-            
-            # Check if we have ODS-1 directory info
-            dir_type = 'Directory'
-            creation_date = 'N/A'
-            ods1_info = None
-            
-            # Try multiple matching strategies for ODS-1 directories
-            if simple_name in ods1_info_map:
-                ods1_info = ods1_info_map[simple_name]
-            elif display_name in ods1_info_map:
-                ods1_info = ods1_info_map[display_name]
-            else:
-                # Check for directory entries with DIR extension or ;1 version
-                for ods1_filename in ods1_info_map.keys():
-                    # Remove version from ODS-1 filename and check for .DIR extension
-                    ods1_name_no_version = ods1_filename.split(';')[0]
-                    ods1_base_name = ods1_name_no_version.replace('.DIR', '')
-                    
-                    if (simple_name == ods1_name_no_version or 
-                        simple_name == ods1_base_name or
-                        display_name == ods1_name_no_version or 
-                        display_name == ods1_base_name):
-                        ods1_info = ods1_info_map[ods1_filename]
-                        print(f"Matched directory {simple_name} to ODS-1 directory {ods1_filename}")
-                        break
-            
-            if ods1_info:
-                # Use ODS-1 detailed information for directories
-                dir_type = ods1_info['file_type']
-                creation_date = ods1_info['creation_date']
-                print(f"Using ODS-1 info for directory {display_name}: {dir_type}, {creation_date}")
-            
-            # For ODS-1, numeric directory names are UIC (User Identification Code) directories
-            if simple_name.isdigit() and len(simple_name) == 6:
-                # Format like 001054 is UIC group 1, user 54 in octal
-                group = int(simple_name[:3], 8)  # First 3 digits are group (octal)
-                user = int(simple_name[3:], 8)   # Last 3 digits are user (octal)
-                dir_type = f'User Directory [UIC {group},{user}]'
-            elif simple_name == '000000':
-                dir_type = 'Root Directory [UIC 0,0]'
-            
-            files.append({
-                'filename': display_name + '/',  # Add slash to indicate directory
-                'size_blocks': 0,  # Directories don't have size
-                'size_bytes': 0,
-                'file_type': dir_type,
-                'creation_date': creation_date,
-                'full_path': dir_path  # Store full path for browsing
-            })
-    
-    print(f"Final files count: {len(files)}")
-    return files
-
-
-def perform_scan(disk_file: str):
-    """Perform the actual scan operation - exact copy of GUI logic"""
-    # Create temporary directory
-    temp_dir = Path(tempfile.mkdtemp(prefix="rt11extract_"))
-    
-    try:
-        # Create temporary directory for list operation
-        list_dir = temp_dir / 'list_output'
-        list_dir.mkdir(exist_ok=True)
-        
-        # First, try to get detailed listing for Unix files (using -l -d flags)
-        list_result = None
-        try:
-            if getattr(sys, 'frozen', False):
-                # Running as bundled executable
-                list_cmd = [str(rt11extract_path), disk_file, '-l', '-d', '-r', '-v']
-            else:
-                # Running as script
-                list_cmd = [sys.executable, str(rt11extract_path), disk_file, '-l', '-d', '-r', '-v']
-            
-            print(f"Getting detailed file list: {' '.join(list_cmd)}")
-            list_result = subprocess.run(list_cmd, **get_subprocess_kwargs())
-            
-            if list_result.stdout:
-                print("List STDOUT:")
-                for line in list_result.stdout.split('\n'):
-                    if line.strip():
-                        print(f"  {line}")
-        except Exception as e:
-            print(f"Warning: Could not get detailed listing: {e}")
-        
-        # Then run rt11extract to actually extract files for verification
-        scan_dir = temp_dir / 'scan_output'
-        scan_dir.mkdir(exist_ok=True)
-        
-        if getattr(sys, 'frozen', False):
-            # Running as bundled executable - run rt11extract directly
-            cmd = [str(rt11extract_path), disk_file, '-o', str(scan_dir), '-v']
-        else:
-            # Running as script - run rt11extract with python
-            cmd = [sys.executable, str(rt11extract_path), disk_file, '-o', str(scan_dir), '-v']
-        print(f"Running: {' '.join(cmd)}")
-        
-        result = subprocess.run(cmd, **get_subprocess_kwargs())
-        
-        if result.stdout:
-            print("STDOUT:")
-            for line in result.stdout.split('\n'):
-                if line.strip():
-                    print(f"  {line}")
-        
-        if result.stderr:
-            print("STDERR:")
-            for line in result.stderr.split('\n'):
-                if line.strip():
-                    print(f"  {line}")
-        
-        if result.returncode == 0:
-            # Parse extracted files with detailed listing info
-            files = parse_extracted_files(scan_dir, result.stdout, list_result)
-            print(f"\nScan completed successfully! Found {len(files)} files.")
-            
-            # Display files in a nice table
-            print("\n" + "="*100)
-            print(f"{'Filename':<40} {'Type':<25} {'Size (bytes)':<12} {'Date':<12}")
-            print("="*100)
-            
-            for file_info in files:
-                filename = file_info['filename'][:39]  # Truncate if too long
-                file_type = file_info['file_type'][:24]  # Truncate if too long
-                size_bytes = f"{file_info['size_bytes']:,}"
-                date = file_info['creation_date']
-                print(f"{filename:<40} {file_type:<25} {size_bytes:<12} {date:<12}")
-            
-            print("="*100)
-            print(f"Total: {len(files)} files")
-            
-            return temp_dir, files
-        else:
-            print(f"Error: rt11extract failed with return code {result.returncode}")
-            return None, None
-        
-    except Exception as e:
-        print(f"Exception during scan: {str(e)}")
-        # Cleanup on error
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        return None, None
-
-
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: rt11extract_simple.py <disk_image_path>")
-        print("\nSupported formats: RT-11, RSX-11 (ODS-1), Unix PDP-11")
-        print("This script replicates the exact logic of the GUI without FUSE support.")
-        sys.exit(1)
-
-    disk_image_path = sys.argv[1]
-
-    if not os.path.exists(disk_image_path):
-        print(f"Error: File '{disk_image_path}' not found")
-        sys.exit(1)
-    
-    print(f"RT-11 Extract Simple - Processing: {disk_image_path}")
-    print(f"Using extractor: {rt11extract_path}")
-    print("\nStarting scan...")
-    
-    temp_dir, files = perform_scan(disk_image_path)
-    
-    if temp_dir and files:
-        print(f"\nAll operations completed. Temporary files are located in: {temp_dir}")
-        print("Note: Temporary files contain extracted files for verification.")
-    else:
-        print("\nScan failed.")
-        sys.exit(1)
-
-
 if __name__ == "__main__":
     main()
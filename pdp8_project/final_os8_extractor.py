@@ -10,10 +10,17 @@ posible de las imágenes OS/8 locales.
 import struct
 import sys
 import os
+from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Set
 from dataclasses import dataclass
 from collections import defaultdict
 
+try:
+    from utils.block_device import BlockDevice
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+    from utils.block_device import BlockDevice
+
 @dataclass
 class OS8File:
     """Archivo encontrado"""
@@ -39,8 +46,9 @@ class FinalOS8Extractor:
         self.BYTES_PER_SECTOR = 128
         self.SECTORS_PER_TRACK = 26
         
-        with open(image_path, 'rb') as f:
-            self.disk_data = f.read()
+        # Imagen mapeada en memoria (mismo acceso que los motores PDP-11)
+        self.device = BlockDevice(image_path, self.BYTES_PER_SECTOR)
+        self.disk_data = self.device.buffer
         
         print(f"Extractor Final OS/8")
         print(f"Imagen: {len(self.disk_data)} bytes")